@@ -0,0 +1,62 @@
+"""ASGI Middleware"""
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+# Allowance for multipart boundaries and part headers on top of the file bytes
+MULTIPART_OVERHEAD = 1024 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized upload requests before the multipart form is parsed
+
+    Starlette spools the whole form to disk before a route runs, so the
+    limit has to be enforced here. A request whose Content-Length exceeds
+    the route's limit gets 413 without its body being read; a request
+    without one (chunked) is counted as it streams and stopped with 413
+    as soon as it passes the limit.
+    """
+
+    def __init__(self, app, prefix: str = "/api/v1"):
+        self.app = app
+        self.prefix = prefix
+
+    def limit_for(self, path: str) -> Optional[int]:
+        """Byte limit for a request path, or None if it is not an upload route"""
+        if path == f"{self.prefix}/analyze":
+            return settings.MAX_FILE_SIZE_MB * 1024 * 1024 + MULTIPART_OVERHEAD
+        if path == f"{self.prefix}/analyze/batch":
+            return settings.MAX_BATCH_REQUEST_MB * 1024 * 1024 + MULTIPART_OVERHEAD
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+
+        limit = self.limit_for(scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        detail = f"Request too large. Max size: {limit // (1024 * 1024)}MB"
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(status_code=413, content={"detail": detail})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,27 +1,61 @@
 """Document Analysis API Routes"""
+import asyncio
+import json
 import os
+import re
+import shutil
+import traceback
 import uuid
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+import zipfile
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 
 from app.core.config import settings
-from app.core.schemas import AnalyzeResponse, ExtractionItem
-from app.services.document_parser import parse_document
-from app.services.classifier import classify_document
-from app.services.extractor import extract_insights
-from app.services.report_generator import generate_pdf_report
-from app.utils.file_handler import save_upload_file, cleanup_old_files
+from app.core.schemas import (
+    AnalyzeResponse, BatchRejection, BatchStatusResponse, JobAcceptedResponse, JobRecord, JobState,
+    JobStatusResponse, StageState
+)
+from app.services.job_events import job_events, format_sse
+from app.services.job_manager import job_manager, terminal_event, QueueFullError
+from app.services.job_store import get_job_store
+from app.services.pipeline import run_analysis, DocumentTooShortError, STAGES
+from app.services.report_generator import RenderBudgetExceeded
+from app.services.report_formats import FORMATS
+from app.services.report_renderer import report_renderer, load_report_request, REQUEST_FILE
+from app.services.llm_cache import get_llm_cache
+from app.services.result_cache import get_result_cache
+from app.utils.file_handler import (
+    job_dir, remove_job_files, save_upload_file, save_archive_members, BatchTooLargeError, FileTooLargeError
+)
 
 router = APIRouter()
 
+# Job IDs are UUID4 strings; anything else never names a job directory
+_JOB_ID = re.compile(r"[0-9a-f-]+")
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_document(file: UploadFile = File(...)):
+
+@router.post(
+    "/analyze",
+    response_model=AnalyzeResponse,
+    responses={202: {"model": JobAcceptedResponse}}
+)
+async def analyze_document(
+    file: UploadFile = File(...),
+    background: bool = Query(False, description="Enqueue the analysis and return 202 with a job ID"),
+    stream: bool = Query(False, description="Stream NDJSON progress and per-chunk extractions, then the result"),
+    use_cache: bool = Query(True, description="Set false to bypass cached results and Gemini responses")
+):
     """
     Analyze uploaded document and extract intelligent insights
     
     - Accepts PDF, DOCX, TXT files
     - Returns structured analysis with PDF report and JSONL data
+    - With background=true, returns 202 immediately; poll /jobs/{job_id}
+    - With stream=true, returns application/x-ndjson: one line per stage
+      transition and per finished chunk (extractions with char offsets),
+      then a "result" line with the deduplicated AnalyzeResponse
     """
     
     # Validate file extension
@@ -32,98 +66,361 @@ async def analyze_document(file: UploadFile = File(...)):
             detail=f"Unsupported file type. Allowed: {', '.join(settings.ALLOWED_EXTENSIONS)}"
         )
     
-    # Validate file size
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    file.file.seek(0)
-    
-    max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB"
-        )
-    
     # Generate job ID
     job_id = str(uuid.uuid4())
     
     try:
-        # Save uploaded file
-        file_path = await save_upload_file(file, job_id)
-        
-        # Parse document
-        text = parse_document(file_path, file_ext)
+        # Stream uploaded file to disk (size is enforced while writing)
+        upload = await save_upload_file(file, job_id)
+        file_path = upload.path
+        content_hash = upload.sha256
         
-        if not text or len(text.strip()) < 50:
-            raise HTTPException(
-                status_code=400,
-                detail="Document appears to be empty or too short"
+        if background:
+            job = await job_manager.submit(
+                job_id, file_path, file_ext, file.filename,
+                content_hash=content_hash, use_cache=use_cache
             )
+            accepted = JobAcceptedResponse(
+                job_id=job_id,
+                status=job.status,
+                status_url=f"/api/v1/jobs/{job_id}"
+            )
+            return JSONResponse(status_code=202, content=accepted.model_dump(mode="json"))
         
-        # Classify document type
-        classification = classify_document(text)
-        
-        # Extract insights
-        extraction_result = extract_insights(text, classification.document_type)
-        
-        # Generate PDF report
-        report_path = generate_pdf_report(
-            extractions=extraction_result.extractions,
-            doc_type=classification.document_type,
-            job_id=job_id,
-            filename=file.filename,
-            classification=classification,
-            document_text=text[:1000]  # First 1000 chars for context
-        )
+        if stream:
+            return StreamingResponse(
+                _stream_analysis(job_id, file_path, file_ext, file.filename, content_hash, use_cache),
+                media_type="application/x-ndjson"
+            )
         
-        # Save JSONL data
-        jsonl_path = os.path.join(settings.REPORT_DIR, job_id, "data.jsonl")
-        import langextract as lx
-        lx.io.save_annotated_documents(
-            [extraction_result],
-            output_name="data.jsonl",
-            output_dir=os.path.join(settings.REPORT_DIR, job_id)
+        response = await run_analysis(
+            job_id, file_path, file_ext, file.filename,
+            content_hash=content_hash, use_cache=use_cache
         )
         
-        # Generate summary
-        summary = _generate_summary(extraction_result.extractions, classification.document_type)
-        
-        # Cleanup old files
-        await cleanup_old_files()
-        
-        return AnalyzeResponse(
-            job_id=job_id,
-            document_type=classification.document_type,
-            confidence=classification.confidence,
-            summary=summary,
-            extraction_count=len(extraction_result.extractions),
-            extractions=[
-                ExtractionItem(
-                    extraction_class=e.extraction_class,
-                    extraction_text=e.extraction_text,
-                    attributes=e.attributes or {}
-                )
-                for e in extraction_result.extractions
-            ],
-            pdf_url=f"/api/v1/report/{job_id}",
-            jsonl_url=f"/api/v1/data/{job_id}"
-        )
+        return response
         
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except DocumentTooShortError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        remove_job_files(job_id)
+        raise HTTPException(status_code=503, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         error_detail = f"Analysis failed: {str(e)}\n{traceback.format_exc()}"
         print(error_detail)  # Log to console
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+async def _stream_analysis(
+    job_id: str,
+    file_path: str,
+    file_ext: str,
+    filename: str,
+    content_hash: str,
+    use_cache: bool
+) -> AsyncIterator[str]:
+    """
+    Run the pipeline and yield its progress as NDJSON lines
+    
+    Line types: stage, pages, chunk (extractions of one finished chunk,
+    in document offsets, not yet deduplicated), then result or error.
+    The analysis is cancelled if the client disconnects.
+    """
+    messages: asyncio.Queue = asyncio.Queue()
+    
+    def on_stage(stage: str, state):
+        messages.put_nowait({"type": "stage", "stage": stage, "state": state.value})
+    
+    def on_event(event: str, data: dict):
+        messages.put_nowait({"type": event, **data})
+    
+    task = asyncio.ensure_future(run_analysis(
+        job_id, file_path, file_ext, filename,
+        content_hash=content_hash, use_cache=use_cache,
+        on_stage=on_stage, on_event=on_event
+    ))
+    task.add_done_callback(lambda _: messages.put_nowait(None))
+    
+    try:
+        while True:
+            message = await messages.get()
+            if message is None:
+                break
+            yield json.dumps(message) + "\n"
+        
+        try:
+            response = task.result()
+        except DocumentTooShortError as e:
+            yield json.dumps({"type": "error", "status_code": 400, "detail": str(e)}) + "\n"
+            return
+        except Exception as e:
+            print(f"Analysis failed: {e}\n{traceback.format_exc()}")
+            yield json.dumps({"type": "error", "status_code": 500, "detail": f"Analysis failed: {str(e)}"}) + "\n"
+            return
+        
+        yield json.dumps({"type": "result", "result": response.model_dump(mode="json")}) + "\n"
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+@router.post("/analyze/batch", status_code=202, response_model=BatchStatusResponse)
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    use_cache: bool = Query(True, description="Set false to bypass cached results and Gemini responses")
+):
+    """
+    Analyze many documents in one request
+    
+    - Accepts several PDF, DOCX, TXT files and/or ZIP archives of them
+    - ZIP members are streamed to disk one at a time
+    - Every document becomes a background job on the shared worker pool;
+      poll /batches/{batch_id} or the per-document job URLs
+    - Unsupported or oversized members are listed under "rejected"
+    """
+    batch_id = str(uuid.uuid4())
+    documents = []  # (job_id, file_path, file_ext, filename)
+    content_hashes = {}
+    rejected = []
+    
+    try:
+        for file in files:
+            file_ext = os.path.splitext(file.filename)[1].lower()
+            
+            if file_ext == ".zip":
+                archive = await save_upload_file(
+                    file, batch_id, max_size_mb=settings.MAX_ARCHIVE_SIZE_MB, content_addressed=False
+                )
+                try:
+                    members = await asyncio.to_thread(
+                        save_archive_members, archive.path, settings.MAX_BATCH_FILES - len(documents)
+                    )
+                finally:
+                    shutil.rmtree(os.path.dirname(archive.path), ignore_errors=True)
+                
+                for member in members:
+                    name = f"{file.filename}/{member.filename}"
+                    if member.error:
+                        rejected.append(BatchRejection(filename=name, reason=member.error))
+                        continue
+                    member_ext = os.path.splitext(member.filename)[1].lower()
+                    documents.append((member.job_id, member.upload.path, member_ext, os.path.basename(member.filename)))
+                    content_hashes[member.job_id] = member.upload.sha256
+                continue
+            
+            if file_ext not in settings.ALLOWED_EXTENSIONS:
+                rejected.append(BatchRejection(filename=file.filename, reason="Unsupported file type"))
+                continue
+            
+            if len(documents) >= settings.MAX_BATCH_FILES:
+                raise BatchTooLargeError(f"Too many documents. Max per batch: {settings.MAX_BATCH_FILES}")
+            
+            job_id = str(uuid.uuid4())
+            try:
+                upload = await save_upload_file(file, job_id)
+            except FileTooLargeError as e:
+                rejected.append(BatchRejection(filename=file.filename, reason=str(e)))
+                continue
+            documents.append((job_id, upload.path, file_ext, file.filename))
+            content_hashes[job_id] = upload.sha256
+        
+        if not documents:
+            raise HTTPException(status_code=400, detail="No supported documents in batch")
+        
+        batch = await job_manager.submit_batch(
+            batch_id, documents, rejected,
+            content_hashes=content_hashes, use_cache=use_cache
+        )
+        return batch
+    
+    except HTTPException:
+        _discard_uploads(documents)
+        raise
+    except zipfile.BadZipFile:
+        _discard_uploads(documents)
+        raise HTTPException(status_code=400, detail="Invalid ZIP archive")
+    except FileTooLargeError as e:
+        _discard_uploads(documents)
+        raise HTTPException(status_code=413, detail=str(e))
+    except BatchTooLargeError as e:
+        _discard_uploads(documents)
+        raise HTTPException(status_code=413, detail=str(e))
+    except QueueFullError as e:
+        _discard_uploads(documents)
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/batches/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch_status(batch_id: str):
+    """Get per-document status of a batch"""
+    batch = job_manager.get_batch(batch_id)
+    
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    return batch
+
+
+def _discard_uploads(documents: list):
+    """Remove saved uploads of a batch that was not accepted"""
+    for job_id, _, _, _ in documents:
+        remove_job_files(job_id)
+
+
+@router.get("/jobs", response_model=List[JobRecord])
+async def list_jobs(
+    content_hash: Optional[str] = Query(None, description="Only jobs for this upload SHA-256"),
+    since: Optional[datetime] = Query(None, description="Only jobs created after this time"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Recorded jobs, most recent first"""
+    store = _require_job_store()
+    
+    if content_hash:
+        return await asyncio.to_thread(store.find_by_hash, content_hash, limit)
+    return await asyncio.to_thread(store.list, since, limit)
+
+
+@router.get("/jobs/stats")
+async def get_job_stats():
+    """Recorded job counts by status and document type"""
+    store = _require_job_store()
+    return await asyncio.to_thread(store.stats)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Get per-stage status of an analysis job"""
+    job = job_manager.get(job_id)
+    if job is not None:
+        return job
+    
+    # Synchronous jobs and jobs from before a restart are only in the store
+    store = get_job_store()
+    record = await asyncio.to_thread(store.get, job_id) if store else None
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return _status_from_record(record)
+
+
+def _require_job_store():
+    store = get_job_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Job store is disabled")
+    return store
+
+
+def _require_job_id(job_id: str, detail: str):
+    """404 for IDs that are not job IDs, before they reach a path"""
+    if not _JOB_ID.fullmatch(job_id):
+        raise HTTPException(status_code=404, detail=detail)
+
+
+def _status_from_record(record: JobRecord) -> JobStatusResponse:
+    """Stage view of a stored job: stages with a timing completed"""
+    unfinished = StageState.FAILED if record.status == JobState.FAILED else StageState.RUNNING
+    stages = {}
+    for stage in STAGES:
+        if stage in record.stage_timings:
+            stages[stage] = StageState.COMPLETED
+        else:
+            stages[stage] = unfinished
+            unfinished = StageState.PENDING
+    
+    return JobStatusResponse(
+        job_id=record.job_id,
+        status=record.status,
+        stages=stages,
+        created_at=record.created_at,
+        updated_at=record.updated_at,
+        error=record.error
+    )
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Stream progress of a background job as Server-Sent Events
+    
+    Events: status, stage, pages (PDF pages done/total), chunk (chunks
+    done/total with that chunk's extractions), then completed or failed,
+    after which the stream ends. Reconnects with Last-Event-ID resume
+    after the last event received.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        after = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        after = 0
+    
+    async def stream():
+        if job.status in (JobState.COMPLETED, JobState.FAILED) and not job_events.has_history(job_id):
+            # History is dropped a grace period after the job ends; replay only the outcome
+            yield format_sse((after + 1, *terminal_event(job)))
+            return
+        async for item in job_events.subscribe(job_id, after, heartbeat=settings.SSE_HEARTBEAT_SECONDS):
+            yield format_sse(item)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Result and LLM cache hit/miss counters and sizes"""
+    result_cache = get_result_cache()
+    llm_cache = get_llm_cache()
+    
+    return {
+        "results": {"enabled": True, **result_cache.stats()} if result_cache else {"enabled": False},
+        "llm": {"enabled": True, **llm_cache.stats()} if llm_cache else {"enabled": False},
+    }
+
+
+@router.get("/reports/metrics")
+async def get_report_metrics():
+    """Render queue depth, outcome counters and render/queue-wait timings"""
+    return report_renderer.metrics.snapshot()
+
+
 @router.get("/report/{job_id}")
-async def get_report(job_id: str):
-    """Download PDF report for a job"""
-    report_path = os.path.join(settings.REPORT_DIR, job_id, "report.pdf")
+async def get_report(
+    job_id: str,
+    format: str = Query("pdf", pattern="^(pdf|html|md)$", description="pdf, or html/md for a lightweight report"),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Download the report for a job
+    
+    The PDF is rendered on the first request and served from disk
+    afterwards; concurrent first requests share one render. HTML and
+    Markdown are rendered from templates on every request, streamed, and
+    can be revalidated with their ETag.
+    """
+    _require_job_id(job_id, "Report not found")
+    if format != "pdf":
+        return await _text_report(job_id, format, if_none_match)
+    
+    try:
+        report_path = await report_renderer.get(job_id)
+    except RenderBudgetExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        print(f"Report rendering failed: {e}\n{traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Report rendering failed: {str(e)}")
     
-    if not os.path.exists(report_path):
+    if report_path is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
     return FileResponse(
@@ -133,12 +430,43 @@ async def get_report(job_id: str):
     )
 
 
+async def _text_report(job_id: str, format: str, if_none_match: Optional[str]) -> Response:
+    request_path = os.path.join(job_dir(settings.REPORT_DIR, job_id), REQUEST_FILE)
+    try:
+        stat = await asyncio.to_thread(os.stat, request_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    # The render request never changes after analysis, so its mtime and
+    # the layout settings identify the output
+    etag = (f'"{job_id}-{format}-{stat.st_mtime_ns:x}-'
+            f'{settings.REPORT_DETAIL_LIMIT}-{settings.REPORT_OVERFLOW_ROWS}"')
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    
+    inputs = await asyncio.to_thread(_load_report_inputs, request_path)
+    render, media_type = FORMATS[format]
+    chunks = render(inputs, job_id, settings.REPORT_DETAIL_LIMIT or None, settings.REPORT_OVERFLOW_ROWS)
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def _load_report_inputs(path: str):
+    with open(path, "rb") as f:
+        return load_report_request(f.read())
+
+
 @router.get("/data/{job_id}")
 async def get_data(job_id: str):
     """Download JSONL data for a job"""
-    data_path = os.path.join(settings.REPORT_DIR, job_id, "data.jsonl")
+    _require_job_id(job_id, "Data not found")
+    record = await _job_record(job_id)
+    if record is not None:
+        data_path = record.jsonl_path
+    else:
+        data_path = os.path.join(job_dir(settings.REPORT_DIR, job_id), "data.jsonl")
     
-    if not os.path.exists(data_path):
+    if not data_path or not os.path.exists(data_path):
         raise HTTPException(status_code=404, detail="Data not found")
     
     return FileResponse(
@@ -148,19 +476,9 @@ async def get_data(job_id: str):
     )
 
 
-def _generate_summary(extractions: list, doc_type: str) -> str:
-    """Generate a brief summary from extractions"""
-    if not extractions:
-        return "No significant insights extracted from the document."
-    
-    count_by_class = {}
-    for e in extractions:
-        count_by_class[e.extraction_class] = count_by_class.get(e.extraction_class, 0) + 1
-    
-    summary_parts = [f"Analyzed as {doc_type.upper()} document."]
-    summary_parts.append(f"Extracted {len(extractions)} entities:")
-    
-    for cls, count in count_by_class.items():
-        summary_parts.append(f"• {count} {cls}(s)")
-    
-    return " ".join(summary_parts)
+async def _job_record(job_id: str) -> Optional[JobRecord]:
+    """Stored record of a job, if the store is enabled and knows it"""
+    store = get_job_store()
+    if store is None:
+        return None
+    return await asyncio.to_thread(store.get, job_id)
@@ -16,14 +16,100 @@ class Settings(BaseSettings):
     # Gemini API
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "")
+    GEMINI_BASE_URL: str = os.getenv("GEMINI_BASE_URL", "")
+    
+    # Gemini connection pool (shared by all clients in the process)
+    GEMINI_POOL_MAX_CONNECTIONS: int = int(os.getenv("GEMINI_POOL_MAX_CONNECTIONS", "32"))
+    GEMINI_POOL_MAX_KEEPALIVE: int = int(os.getenv("GEMINI_POOL_MAX_KEEPALIVE", "16"))
+    GEMINI_POOL_KEEPALIVE_SECONDS: float = float(os.getenv("GEMINI_POOL_KEEPALIVE_SECONDS", "60"))
+    GEMINI_TIMEOUT_SECONDS: float = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "120"))
     
     # File handling
     MAX_FILE_SIZE_MB: int = int(os.getenv("MAX_FILE_SIZE_MB", "10"))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "outputs/uploads")
     REPORT_DIR: str = os.getenv("REPORT_DIR", "outputs/reports")
     
+    # Content-addressed upload storage ("local" or "s3")
+    ARTIFACT_STORE_BACKEND: str = os.getenv("ARTIFACT_STORE_BACKEND", "local")
+    ARTIFACT_DIR: str = os.getenv("ARTIFACT_DIR", "")
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+    S3_PREFIX: str = os.getenv("S3_PREFIX", "uploads")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")
+    
+    # Batch uploads
+    MAX_BATCH_FILES: int = int(os.getenv("MAX_BATCH_FILES", "1000"))
+    MAX_ARCHIVE_SIZE_MB: int = int(os.getenv("MAX_ARCHIVE_SIZE_MB", "500"))
+    MAX_ARCHIVE_EXPANDED_MB: int = int(os.getenv("MAX_ARCHIVE_EXPANDED_MB", "2000"))
+    MAX_BATCH_REQUEST_MB: int = int(os.getenv("MAX_BATCH_REQUEST_MB", "1000"))
+    
+    # Background jobs
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_QUEUE_SIZE: int = int(os.getenv("JOB_QUEUE_SIZE", "10000"))
+    JOB_RETENTION_SECONDS: float = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+    JOB_MAX_FINISHED: int = int(os.getenv("JOB_MAX_FINISHED", "10000"))
+    SSE_HEARTBEAT_SECONDS: float = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    SSE_EVENT_GRACE_SECONDS: float = float(os.getenv("SSE_EVENT_GRACE_SECONDS", "300"))
+    
+    # Stage executors
+    PARSE_PROCESS_WORKERS: int = int(os.getenv("PARSE_PROCESS_WORKERS", "2"))
+    RENDER_PROCESS_WORKERS: int = int(os.getenv("RENDER_PROCESS_WORKERS", "2"))
+    PDF_PARALLEL_PAGE_THRESHOLD: int = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "20"))
+    PDF_LEAD_PAGES: int = int(os.getenv("PDF_LEAD_PAGES", "2"))
+    LLM_THREAD_WORKERS: int = int(os.getenv("LLM_THREAD_WORKERS", "16"))
+    
+    # Reports (PDFs render on first download unless prewarmed)
+    REPORT_PREWARM: bool = os.getenv("REPORT_PREWARM", "false").lower() == "true"
+    REPORT_RENDER_BUDGET_SECONDS: float = float(os.getenv("REPORT_RENDER_BUDGET_SECONDS", "30"))
+    REPORT_DETAIL_LIMIT: int = int(os.getenv("REPORT_DETAIL_LIMIT", "25"))
+    REPORT_OVERFLOW_ROWS: int = int(os.getenv("REPORT_OVERFLOW_ROWS", "200"))
+    
+    # Local classifier (Gemini is only called below the threshold)
+    LOCAL_CLASSIFIER_ENABLED: bool = os.getenv("LOCAL_CLASSIFIER_ENABLED", "true").lower() == "true"
+    LOCAL_CLASSIFIER_THRESHOLD: float = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.85"))
+    LOCAL_CLASSIFIER_MODEL_PATH: str = os.getenv(
+        "LOCAL_CLASSIFIER_MODEL_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "local_classifier", "model.json")
+    )
+    
+    # Chunked extraction
+    EXTRACTION_CHUNK_SIZE: int = int(os.getenv("EXTRACTION_CHUNK_SIZE", "4000"))
+    EXTRACTION_CHUNK_OVERLAP: int = int(os.getenv("EXTRACTION_CHUNK_OVERLAP", "200"))
+    EXTRACTION_MAX_CONCURRENCY: int = int(os.getenv("EXTRACTION_MAX_CONCURRENCY", "4"))
+    
+    # Near-duplicate consolidation ("Dr. Sarah Chen" / "Sarah Chen" / "Chen")
+    CONSOLIDATION_ENABLED: bool = os.getenv("CONSOLIDATION_ENABLED", "true").lower() == "true"
+    CONSOLIDATION_THRESHOLDS: str = os.getenv(
+        "CONSOLIDATION_THRESHOLDS",
+        "character=0.7,speaker=0.7,party=0.7,author=0.7,entity=0.7,component=0.8"
+    )
+    CONSOLIDATION_DEFAULT_THRESHOLD: float = float(os.getenv("CONSOLIDATION_DEFAULT_THRESHOLD", "0"))
+    
+    # Result cache
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    RESULT_CACHE_BACKEND: str = os.getenv("RESULT_CACHE_BACKEND", "sqlite")
+    RESULT_CACHE_PATH: str = os.getenv("RESULT_CACHE_PATH", "outputs/cache/results.sqlite3")
+    RESULT_CACHE_MAX_MB: int = int(os.getenv("RESULT_CACHE_MAX_MB", "512"))
+    
+    # Job metadata store
+    JOB_STORE_ENABLED: bool = os.getenv("JOB_STORE_ENABLED", "true").lower() == "true"
+    JOB_STORE_BACKEND: str = os.getenv("JOB_STORE_BACKEND", "sqlite")
+    JOB_STORE_PATH: str = os.getenv("JOB_STORE_PATH", "outputs/jobs/jobs.sqlite3")
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "outputs/cache/llm.sqlite3")
+    LLM_CACHE_MAX_MB: int = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+    LLM_CACHE_TTL_HOURS: int = int(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+    
+    # Classify and extract the first chunk in a single Gemini call
+    FUSED_CLASSIFY_EXTRACT: bool = os.getenv("FUSED_CLASSIFY_EXTRACT", "false").lower() == "true"
+    
     # Cleanup
     CLEANUP_HOURS: int = int(os.getenv("CLEANUP_HOURS", "24"))
+    CLEANUP_INTERVAL_SECONDS: float = float(os.getenv("CLEANUP_INTERVAL_SECONDS", "300"))
+    CLEANUP_BATCH_SIZE: int = int(os.getenv("CLEANUP_BATCH_SIZE", "200"))
+    CLEANUP_INDEX_PATH: str = os.getenv("CLEANUP_INDEX_PATH", "")
     
     # Supported file types
     ALLOWED_EXTENSIONS: set = {".pdf", ".docx", ".txt"}
@@ -1,4 +1,5 @@
 """Pydantic Models and Schemas"""
+from datetime import datetime
 from enum import Enum
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
@@ -21,16 +22,107 @@ class ExtractionItem(BaseModel):
     attributes: Dict[str, Any] = Field(default_factory=dict)
 
 
+class CategoryAggregate(BaseModel):
+    """Counts and mention ranking for one extraction class"""
+    extraction_class: str
+    count: int
+    mentions: int
+    ranked: List[int] = Field(description="Indices into extractions, most mentioned first")
+
+
 class AnalyzeResponse(BaseModel):
     """Response from analyze endpoint"""
     job_id: str
     document_type: DocumentType
     confidence: float
+    classification_method: str = "llm"
     summary: str
     extraction_count: int
     extractions: List[ExtractionItem]
+    aggregates: List[CategoryAggregate] = Field(default_factory=list, description="Per-class views in display order")
     pdf_url: str
     jsonl_url: str
+    cached: bool = False
+
+
+class JobState(str, Enum):
+    """Lifecycle state of a background analysis job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class StageState(str, Enum):
+    """State of a single pipeline stage"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobAcceptedResponse(BaseModel):
+    """Response from analyze endpoint in background mode"""
+    job_id: str
+    status: JobState
+    status_url: str
+
+
+class JobStatusResponse(BaseModel):
+    """Status of a background analysis job"""
+    job_id: str
+    status: JobState
+    stages: Dict[str, StageState]
+    created_at: datetime
+    updated_at: datetime
+    error: Optional[str] = None
+    result: Optional[AnalyzeResponse] = None
+
+
+class BatchDocument(BaseModel):
+    """A document of a batch and the job analyzing it"""
+    filename: str
+    job_id: str
+    status: JobState
+    status_url: str
+
+
+class BatchRejection(BaseModel):
+    """A batch member that was not scheduled"""
+    filename: str
+    reason: str
+
+
+class BatchStatusResponse(BaseModel):
+    """Progress of a batch"""
+    batch_id: str
+    created_at: datetime
+    counts: Dict[JobState, int]
+    documents: List[BatchDocument]
+    rejected: List[BatchRejection] = Field(default_factory=list)
+
+
+class JobRecord(BaseModel):
+    """Persisted metadata of an analysis job"""
+    job_id: str
+    status: JobState
+    filename: str
+    content_hash: Optional[str] = None
+    upload_size: Optional[int] = None
+    document_type: Optional[DocumentType] = None
+    confidence: Optional[float] = None
+    classification_method: Optional[str] = None
+    extraction_count: Optional[int] = None
+    cached: bool = False
+    stage_timings: Dict[str, float] = Field(default_factory=dict)
+    token_usage: Dict[str, int] = Field(default_factory=dict)
+    report_path: Optional[str] = None
+    report_size: Optional[int] = None
+    jsonl_path: Optional[str] = None
+    jsonl_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
 
 
 class ClassificationResult(BaseModel):
@@ -38,6 +130,7 @@ class ClassificationResult(BaseModel):
     document_type: DocumentType
     confidence: float
     reasoning: str
+    method: str = "llm"
 
 
 class ExtractionTemplate(BaseModel):
@@ -6,7 +6,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.api.middleware import UploadSizeLimitMiddleware
 from app.api.routes import analyze
+from app.services.cleanup import cleanup_scheduler
+from app.services.job_manager import job_manager
+from app.services.llm_clients import client_registry
+from app.utils.executors import shutdown_executors
 
 
 @asynccontextmanager
@@ -16,11 +21,21 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
     os.makedirs(settings.REPORT_DIR, exist_ok=True)
     print(f"✓ Created output directories")
+    client_registry.start()
+    print(f"✓ Gemini connection pool ready ({settings.GEMINI_POOL_MAX_CONNECTIONS} connections)")
+    await job_manager.start()
+    print(f"✓ Started {job_manager.max_workers} background job workers")
+    await cleanup_scheduler.start()
+    print(f"✓ Scheduled cleanup every {settings.CLEANUP_INTERVAL_SECONDS:g}s")
     print(f"✓ Langextract POC API running on {settings.HOST}:{settings.PORT}")
     
     yield
     
     # Shutdown
+    await cleanup_scheduler.stop()
+    await job_manager.stop()
+    shutdown_executors()
+    await client_registry.aclose()
     print("✓ Shutting down gracefully")
 
 
@@ -40,6 +55,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized uploads before the multipart form is spooled
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Include routers
 app.include_router(analyze.router, prefix="/api/v1", tags=["Analysis"])
 
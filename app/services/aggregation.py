@@ -0,0 +1,151 @@
+"""Extraction Aggregation"""
+from typing import Dict, List, Optional, Tuple
+
+from app.core.schemas import CategoryAggregate, DocumentType
+
+# Category display order by document type
+CATEGORY_ORDERS = {
+    DocumentType.STORY: {
+        'character': 1,
+        'plot_point': 2,
+        'theme': 3,
+        'setting': 4,
+        'moral': 5
+    },
+    DocumentType.MEETING: {
+        'speaker': 1,
+        'decision': 2,
+        'action_item': 3,
+        'agenda_item': 4,
+        'discussion_point': 5
+    },
+    DocumentType.RESEARCH: {
+        'author': 1,
+        'research_question': 2,
+        'finding': 3,
+        'methodology': 4,
+        'conclusion': 5,
+        'citation': 6
+    },
+    DocumentType.TECHNICAL: {
+        'component': 1,
+        'function': 2,
+        'parameter': 3,
+        'configuration': 4,
+        'dependency': 5,
+        'example': 6
+    },
+    DocumentType.LEGAL: {
+        'party': 1,
+        'obligation': 2,
+        'clause': 3,
+        'deadline': 4,
+        'term': 5,
+        'penalty': 6
+    },
+    DocumentType.GENERAL: {
+        'entity': 1,
+        'key_point': 2,
+        'topic': 3,
+        'statement': 4,
+        'date': 5
+    }
+}
+
+
+def mention_count(item) -> int:
+    """Mentions recorded by deduplication; 1 if the item was never merged"""
+    return (item.attributes or {}).get('mention_count', 1)
+
+
+class ExtractionAggregate:
+    """
+    Per-class counts and mention-ranked views over one job's extractions
+
+    Built once per job in a single pass and shared by the summary, the
+    reports and the API response. Each class is ranked by mention count
+    (ties keep document order) the first time it is needed, unless the
+    ranking is supplied from a serialized aggregate. The API response
+    carries the full ranking of every class, so each class is sorted once
+    and top-k and overflow views are slices of that order.
+    """
+
+    def __init__(
+        self,
+        extractions: list,
+        doc_type: DocumentType,
+        ranked: Optional[Dict[str, List[int]]] = None
+    ):
+        self.extractions = extractions
+        self.doc_type = doc_type
+        self.counts: Dict[str, int] = {}
+        self.mentions: Dict[str, int] = {}
+        self._members: Dict[str, List[int]] = {}
+        self._ranked: Dict[str, List[int]] = dict(ranked or {})
+
+        for i, e in enumerate(extractions):
+            cls = e.extraction_class
+            if cls not in self.counts:
+                self.counts[cls] = 0
+                self.mentions[cls] = 0
+                self._members[cls] = []
+            self.counts[cls] += 1
+            self.mentions[cls] += mention_count(e)
+            self._members[cls].append(i)
+
+    @classmethod
+    def from_categories(cls, extractions: list, doc_type: DocumentType, categories: List[CategoryAggregate]):
+        """Rebuild from a serialized aggregate without re-ranking"""
+        return cls(extractions, doc_type, {c.extraction_class: c.ranked for c in categories})
+
+    def __len__(self) -> int:
+        return len(self.extractions)
+
+    def count(self, cls: str) -> int:
+        return self.counts.get(cls, 0)
+
+    def classes(self) -> List[str]:
+        """Classes in display order for the document type, then first appearance"""
+        order = CATEGORY_ORDERS.get(self.doc_type, {})
+        return sorted(self.counts, key=lambda cls: order.get(cls, 999))
+
+    def ranked(self, cls: str) -> list:
+        """All items of a class, most mentioned first"""
+        return [self.extractions[i] for i in self._ranked_indices(cls)]
+
+    def top(self, cls: str, k: int) -> list:
+        """The k most mentioned items of a class"""
+        return [self.extractions[i] for i in self._ranked_indices(cls)[:k]]
+
+    def split(self, cls: str, limit: Optional[int]) -> Tuple[list, list]:
+        """
+        Items shown in full and the overflow, both most mentioned first
+
+        Args:
+            cls: Extraction class
+            limit: Items shown in full; None for all
+        """
+        items = self.ranked(cls)
+        if limit is None:
+            return items, []
+        return items[:limit], items[limit:]
+
+    def to_categories(self) -> List[CategoryAggregate]:
+        """Serializable form, in display order"""
+        return [
+            CategoryAggregate(
+                extraction_class=cls,
+                count=self.counts[cls],
+                mentions=self.mentions[cls],
+                ranked=self._ranked_indices(cls)
+            )
+            for cls in self.classes()
+        ]
+
+    def _mentions_at(self, i: int) -> int:
+        return mention_count(self.extractions[i])
+
+    def _ranked_indices(self, cls: str) -> List[int]:
+        if cls not in self._ranked:
+            self._ranked[cls] = sorted(self._members.get(cls, []), key=self._mentions_at, reverse=True)
+        return self._ranked[cls]
@@ -0,0 +1,82 @@
+"""Text Chunking Service"""
+import re
+from typing import List, NamedTuple
+
+# Boundary patterns, strongest first
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class TextChunk(NamedTuple):
+    """A slice of a document with its offsets into the original text"""
+    text: str
+    start: int
+    end: int
+
+
+def chunk_text(text: str, chunk_size: int, overlap: int = 0) -> List[TextChunk]:
+    """
+    Split text into chunks that end on paragraph or sentence boundaries
+
+    Args:
+        text: Document text
+        chunk_size: Maximum characters per chunk
+        overlap: Characters shared between consecutive chunks
+
+    Returns:
+        Ordered list of chunks covering the whole text
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    # Overlap beyond half a chunk would make no forward progress worthwhile
+    overlap = max(0, min(overlap, chunk_size // 2))
+
+    chunks = []
+    start = 0
+    length = len(text)
+
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            end = _find_break(text, start, end)
+
+        chunks.append(TextChunk(text[start:end], start, end))
+
+        if end >= length:
+            break
+
+        next_start = end
+        if overlap:
+            next_start = _align_start(text, end - overlap, end)
+        start = max(next_start, start + 1)
+
+    return chunks
+
+
+def _find_break(text: str, start: int, end: int) -> int:
+    """Find the best cut position in the back half of text[start:end]"""
+    floor = start + (end - start) // 2
+    window = text[floor:end]
+
+    for pattern in (_PARAGRAPH_BREAK, _SENTENCE_END, _WHITESPACE):
+        last = None
+        for match in pattern.finditer(window):
+            last = match
+        if last is not None:
+            return floor + last.end()
+
+    return end
+
+
+def _align_start(text: str, pos: int, end: int) -> int:
+    """Move an overlap start forward to the next sentence or word boundary"""
+    window = text[pos:end]
+
+    for pattern in (_SENTENCE_END, _WHITESPACE):
+        match = pattern.search(window)
+        if match is not None and match.end() < len(window):
+            return pos + match.end()
+
+    return pos
@@ -1,8 +1,11 @@
 """Document Classification Service"""
-import os
+from typing import Optional
 import google.generativeai as genai
 from app.core.config import settings
 from app.core.schemas import DocumentType, ClassificationResult
+from app.services.llm_cache import cached_call, cached_call_async
+from app.services.llm_clients import client_registry
+from app.services.local_classifier import classify_locally
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,22 +13,83 @@ load_dotenv()
 # Configure Gemini
 genai.configure(api_key=settings.GEMINI_API_KEY)
 
+# Characters of the document the classifier looks at
+CLASSIFY_SAMPLE_CHARS = 2000
 
-def classify_document(text: str) -> ClassificationResult:
+
+def classify_document(text: str, use_cache: bool = True) -> ClassificationResult:
     """
-    Classify document type using Gemini
+    Classify document type, locally first and with Gemini as fallback
+    
+    The local model answers when its confidence reaches
+    LOCAL_CLASSIFIER_THRESHOLD; otherwise Gemini is asked.
     
     Args:
         text: Document text content
+        use_cache: Reuse a memoized Gemini response for the same prompt
     
     Returns:
-        ClassificationResult with document type and confidence
+        ClassificationResult with document type, confidence and the
+        method used ("local" or "llm")
     """
     
     # Use first 2000 characters for classification
-    sample_text = text[:2000]
+    sample_text = text[:CLASSIFY_SAMPLE_CHARS]
+    
+    local_result = classify_locally(sample_text)
+    if local_result is not None and local_result.confidence >= settings.LOCAL_CLASSIFIER_THRESHOLD:
+        return local_result
     
-    prompt = f"""Analyze the following document excerpt and classify it into ONE of these categories:
+    prompt = _build_prompt(sample_text)
+    
+    try:
+        response_text = cached_call(
+            lambda: client_registry.classification_model().generate_content(prompt).text,
+            model=settings.GEMINI_MODEL,
+            prompt=prompt,
+            use_cache=use_cache
+        )
+        return _parse_response(response_text)
+        
+    except Exception as e:
+        return _fallback(local_result, e)
+
+
+async def classify_document_async(text: str, use_cache: bool = True) -> ClassificationResult:
+    """
+    Async variant of classify_document using generate_content_async
+    
+    Args:
+        text: Document text content
+        use_cache: Reuse a memoized Gemini response for the same prompt
+    
+    Returns:
+        ClassificationResult, as for classify_document
+    """
+    sample_text = text[:CLASSIFY_SAMPLE_CHARS]
+    
+    local_result = classify_locally(sample_text)
+    if local_result is not None and local_result.confidence >= settings.LOCAL_CLASSIFIER_THRESHOLD:
+        return local_result
+    
+    prompt = _build_prompt(sample_text)
+    
+    try:
+        response_text = await cached_call_async(
+            lambda: client_registry.classify_async(prompt),
+            model=settings.GEMINI_MODEL,
+            prompt=prompt,
+            use_cache=use_cache
+        )
+        return _parse_response(response_text)
+        
+    except Exception as e:
+        return _fallback(local_result, e)
+
+
+def _build_prompt(sample_text: str) -> str:
+    """Classification prompt for a document excerpt"""
+    return f"""Analyze the following document excerpt and classify it into ONE of these categories:
 
 1. STORY - Narrative fiction, novels, short stories, creative writing
 2. MEETING - Meeting transcripts, minutes, discussion notes
@@ -44,46 +108,49 @@ CATEGORY: [one of: STORY, MEETING, RESEARCH, TECHNICAL, LEGAL, GENERAL]
 CONFIDENCE: [0.0 to 1.0]
 REASONING: [brief explanation]
 """
+
+
+def _parse_response(response_text: str) -> ClassificationResult:
+    """Parse the CATEGORY/CONFIDENCE/REASONING response format"""
+    lines = response_text.strip().split('\n')
+    category = None
+    confidence = 0.7
+    reasoning = ""
     
-    try:
-        model = genai.GenerativeModel(os.getenv("GEMINI_MODEL"))
-        response = model.generate_content(prompt)
-        
-        # Parse response
-        lines = response.text.strip().split('\n')
-        category = None
-        confidence = 0.7
-        reasoning = ""
-        
-        for line in lines:
-            if line.startswith("CATEGORY:"):
-                category_str = line.split(":", 1)[1].strip().upper()
-                category = _map_category(category_str)
-            elif line.startswith("CONFIDENCE:"):
-                try:
-                    confidence = float(line.split(":", 1)[1].strip())
-                except:
-                    confidence = 0.7
-            elif line.startswith("REASONING:"):
-                reasoning = line.split(":", 1)[1].strip()
-        
-        if not category:
-            category = DocumentType.GENERAL
-            reasoning = "Unable to determine specific category"
-        
-        return ClassificationResult(
-            document_type=category,
-            confidence=confidence,
-            reasoning=reasoning
-        )
-        
-    except Exception as e:
-        print(f"Classification error: {e}")
-        return ClassificationResult(
-            document_type=DocumentType.GENERAL,
-            confidence=0.5,
-            reasoning=f"Classification failed, using fallback: {str(e)}"
-        )
+    for line in lines:
+        if line.startswith("CATEGORY:"):
+            category_str = line.split(":", 1)[1].strip().upper()
+            category = _map_category(category_str)
+        elif line.startswith("CONFIDENCE:"):
+            try:
+                confidence = float(line.split(":", 1)[1].strip())
+            except:
+                confidence = 0.7
+        elif line.startswith("REASONING:"):
+            reasoning = line.split(":", 1)[1].strip()
+    
+    if not category:
+        category = DocumentType.GENERAL
+        reasoning = "Unable to determine specific category"
+    
+    return ClassificationResult(
+        document_type=category,
+        confidence=confidence,
+        reasoning=reasoning
+    )
+
+
+def _fallback(local_result: Optional[ClassificationResult], error: Exception) -> ClassificationResult:
+    """Result to use when the Gemini call fails"""
+    print(f"Classification error: {error}")
+    if local_result is not None:
+        local_result.reasoning = f"Gemini classification failed, using local prediction: {str(error)}"
+        return local_result
+    return ClassificationResult(
+        document_type=DocumentType.GENERAL,
+        confidence=0.5,
+        reasoning=f"Classification failed, using fallback: {str(error)}"
+    )
 
 
 def _map_category(category_str: str) -> DocumentType:
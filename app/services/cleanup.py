@@ -0,0 +1,126 @@
+"""Scheduled Cleanup of Expired Job Files"""
+import asyncio
+import os
+import time
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.job_events import job_events
+from app.services.job_store import get_job_store
+from app.utils.expiry_index import get_expiry_index
+from app.utils.file_handler import remove_job_files
+
+_BACKFILL_KEY = "backfilled"
+
+
+class CleanupScheduler:
+    """
+    Periodic sweep that deletes uploads and reports of expired jobs
+
+    Jobs are registered in the expiry index when their upload is saved,
+    so a sweep reads only the expired entries instead of listing and
+    stat-ing every job directory. Deletions run in batches on a worker
+    thread, never on the event loop.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        """Start the sweep loop on the running event loop"""
+        if self.started:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the sweep loop"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Delete every job that has expired by now
+
+        Also drops event history of jobs past their SSE grace period, so it
+        is released even when no further events are published.
+
+        Args:
+            now: Reference time; defaults to the current time
+
+        Returns:
+            Number of jobs removed
+        """
+        now = time.time() if now is None else now
+        job_events.expire()
+        index = get_expiry_index()
+        await asyncio.to_thread(_backfill, index)
+
+        removed = 0
+        while True:
+            job_ids = await asyncio.to_thread(index.expired, now, self.batch_size)
+            if not job_ids:
+                return removed
+            await asyncio.to_thread(_delete_jobs, index, job_ids)
+            removed += len(job_ids)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"Cleanup error: {e}")
+            await asyncio.sleep(self.interval)
+
+
+def _delete_jobs(index, job_ids: List[str]):
+    for job_id in job_ids:
+        remove_job_files(job_id)
+    store = get_job_store()
+    if store is not None:
+        store.forget_artifacts(job_ids)
+    index.remove(job_ids)
+
+
+def _backfill(index):
+    """Index job directories written before the index existed (runs once)"""
+    if index.get_meta(_BACKFILL_KEY):
+        return
+
+    entries = {}
+    for root in (settings.UPLOAD_DIR, settings.REPORT_DIR):
+        if not os.path.isdir(root):
+            continue
+        for name, ctime in _job_dirs(root):
+            expires_at = ctime + settings.CLEANUP_HOURS * 3600
+            entries[name] = min(expires_at, entries.get(name, expires_at))
+
+    if entries:
+        index.add_missing(list(entries.items()))
+    index.set_meta(_BACKFILL_KEY, str(time.time()))
+
+
+def _job_dirs(root: str, depth: int = 0):
+    """(job_id, ctime) of job directories, in the sharded ab/cd/ layout or flat"""
+    with os.scandir(root) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            if depth < 2 and len(entry.name) == 2:
+                yield from _job_dirs(entry.path, depth + 1)
+            else:
+                yield entry.name, entry.stat().st_ctime
+
+
+cleanup_scheduler = CleanupScheduler(
+    interval=settings.CLEANUP_INTERVAL_SECONDS,
+    batch_size=settings.CLEANUP_BATCH_SIZE
+)
@@ -0,0 +1,246 @@
+"""Near-Duplicate Entity Consolidation"""
+import re
+import zlib
+from typing import Dict, Iterator, List, Optional, Set
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.aggregation import mention_count
+
+# Dropped before comparing, so "Dr. Sarah Chen" matches "Sarah Chen"
+HONORIFICS = frozenset({
+    "dr", "mr", "mrs", "ms", "miss", "prof", "sir", "madam", "the", "jr", "sr"
+})
+
+SHINGLE_SIZE = 3
+# 8 bands of 4 rows: pairs above ~0.6 Jaccard share a bucket with high probability
+NUM_PERM = 32
+BANDS = 8
+# Blocks larger than this are too common to say anything and are skipped
+MAX_BLOCK_SIZE = 32
+# Token containment only applies to name-like texts up to this many tokens
+MAX_CONTAINMENT_TOKENS = 4
+# Items hashed per numpy batch, to bound memory
+MINHASH_BATCH = 4096
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, 1 << 31, size=(NUM_PERM, 1)).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=(NUM_PERM, 1)).astype(np.uint64)
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def parse_thresholds(spec: str) -> Dict[str, float]:
+    """Parse "character=0.7,party=0.8" into a per-class threshold map"""
+    thresholds = {}
+    for part in spec.split(","):
+        if "=" in part:
+            cls, value = part.split("=", 1)
+            thresholds[cls.strip()] = float(value)
+    return thresholds
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip punctuation and honorifics"""
+    tokens = _NON_WORD.sub(" ", text.lower()).split()
+    return " ".join(t for t in tokens if t not in HONORIFICS)
+
+
+def _shingles(norm: str) -> Set[int]:
+    """Character shingles, as stable 32-bit hashes"""
+    padded = f" {norm} ".encode("utf-8")
+    return {zlib.crc32(padded[i:i + SHINGLE_SIZE]) for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def _minhash(shingle_sets: List[Set[int]]) -> np.ndarray:
+    """MinHash signatures, one row per shingle set"""
+    signatures = np.empty((len(shingle_sets), NUM_PERM), dtype=np.uint64)
+    for start in range(0, len(shingle_sets), MINHASH_BATCH):
+        batch = shingle_sets[start:start + MINHASH_BATCH]
+        hashes = np.fromiter(
+            (s for shingles in batch for s in shingles),
+            dtype=np.uint64
+        )
+        offsets = np.cumsum([0] + [len(shingles) for shingles in batch[:-1]])
+        permuted = (_PERM_A * hashes + _PERM_B) % _MERSENNE
+        signatures[start:start + len(batch)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+class _Entry:
+    __slots__ = ("extraction", "twins", "norm", "tokens", "letters", "initials", "shingles", "keys")
+
+    def __init__(self, extraction, twins: list, norm: str):
+        self.extraction = extraction
+        # Extractions with the same normalized text
+        self.twins = twins
+        self.norm = norm
+        self.tokens = frozenset(norm.split())
+        # Strings rather than sets: fewer tracked objects for the GC
+        self.letters = "".join(t for t in self.tokens if len(t) == 1)
+        self.initials = "".join(t[0] for t in self.tokens)
+        self.shingles = _shingles(norm)
+        self.keys = ()
+
+
+def similarity(a: _Entry, b: _Entry) -> float:
+    """
+    Character shingle Jaccard, or token containment for short names
+
+    Containment lets "Chen" and "S. Chen" match "Sarah Chen" (a single
+    letter stands for any word with that initial); it is limited to short
+    texts so a single word doesn't match every sentence that contains it.
+    """
+    if a.norm == b.norm:
+        return 1.0
+    shared = len(a.shingles & b.shingles)
+    jaccard = shared / (len(a.shingles) + len(b.shingles) - shared)
+    if max(len(a.tokens), len(b.tokens)) > MAX_CONTAINMENT_TOKENS:
+        return jaccard
+    short, long = (a, b) if len(a.tokens) <= len(b.tokens) else (b, a)
+    covered = len(short.tokens & long.tokens)
+    if short.letters:
+        covered += sum(1 for t in short.letters if t not in long.tokens and t in long.initials)
+    return max(jaccard, covered / len(short.tokens))
+
+
+def _block_keys(entry: _Entry, signature: np.ndarray) -> Iterator:
+    """LSH band keys (bytes) and, for short texts, token keys (str)"""
+    rows = NUM_PERM // BANDS
+    for band in range(BANDS):
+        yield bytes((band,)) + signature[band * rows:(band + 1) * rows].tobytes()
+    if len(entry.tokens) <= MAX_CONTAINMENT_TOKENS:
+        yield from entry.tokens
+
+
+def _consolidate_class(extractions: list, threshold: float) -> list:
+    """Canonical extractions of one class, with aliases absorbed"""
+    # Texts that normalize identically merge without any comparison
+    same_norm: Dict[str, list] = {}
+    passthrough = []
+    for extraction in extractions:
+        norm = normalize(extraction.extraction_text)
+        if norm:
+            same_norm.setdefault(norm, []).append(extraction)
+        else:
+            passthrough.append(extraction)
+
+    entries = []
+    for norm, group in same_norm.items():
+        best = max(range(len(group)), key=lambda i: mention_count(group[i]))
+        entries.append(_Entry(group[best], group[:best] + group[best + 1:], norm))
+
+    for entry, signature in zip(entries, _minhash([e.shingles for e in entries])):
+        entry.keys = tuple(_block_keys(entry, signature))
+
+    # Fullest and most mentioned forms become canonical first
+    order = sorted(
+        range(len(entries)),
+        key=lambda i: (-len(entries[i].tokens), -mention_count(entries[i].extraction), i)
+    )
+
+    blocks: Dict[object, List[int]] = {}
+    oversized: Set[object] = set()
+    members: Dict[int, List[int]] = {}
+
+    for i in order:
+        entry = entries[i]
+        candidates = set()
+        for key in entry.keys:
+            if key not in oversized:
+                candidates.update(blocks.get(key, ()))
+
+        scores = {c: similarity(entry, entries[c]) for c in candidates}
+        matches = {c: score for c, score in scores.items() if score >= threshold}
+        if matches:
+            best = max(matches.values())
+            winners = [c for c, score in matches.items() if score == best]
+            # An alias that fits two canonicals equally well (e.g. a bare
+            # surname) stays on its own rather than bridging them
+            if len(winners) == 1:
+                members[winners[0]].append(i)
+                continue
+
+        members[i] = []
+        for key in entry.keys:
+            if key in oversized:
+                continue
+            block = blocks.setdefault(key, [])
+            block.append(i)
+            if len(block) > MAX_BLOCK_SIZE:
+                oversized.add(key)
+                del blocks[key]
+
+    kept = list(passthrough)
+    for i, merged in members.items():
+        canonical = entries[i].extraction
+        aliases = list(entries[i].twins)
+        for m in merged:
+            aliases.append(entries[m].extraction)
+            aliases.extend(entries[m].twins)
+        if aliases:
+            _absorb(canonical, aliases)
+        kept.append(canonical)
+    return kept
+
+
+def _absorb(canonical, aliases: list):
+    """Fold aliases into the canonical extraction's attributes"""
+    attrs = dict(canonical.attributes or {})
+    mentions = mention_count(canonical)
+    names = []
+    for alias in aliases:
+        mentions += mention_count(alias)
+        if alias.extraction_text != canonical.extraction_text and alias.extraction_text not in names:
+            names.append(alias.extraction_text)
+        for key, value in (alias.attributes or {}).items():
+            if key != "mention_count" and value and not attrs.get(key):
+                attrs[key] = value
+
+    attrs["mention_count"] = mentions
+    if names:
+        existing = attrs.get("aliases")
+        attrs["aliases"] = ", ".join(([existing] if existing else []) + names)
+    canonical.attributes = attrs
+
+
+def consolidate_extractions(
+    extractions: list,
+    thresholds: Optional[Dict[str, float]] = None,
+    default_threshold: Optional[float] = None
+) -> list:
+    """
+    Merge near-duplicate extractions within each class
+
+    Candidates come from MinHash LSH buckets over character shingles and
+    from shared tokens of short texts, so work stays near-linear instead
+    of comparing every pair. Each group keeps its fullest form as the
+    canonical extraction, with the other forms listed in an "aliases"
+    attribute and mention counts summed.
+
+    Args:
+        extractions: Exact-deduplicated extractions
+        thresholds: Similarity threshold per extraction_class
+        default_threshold: Threshold for other classes; 0 leaves them alone
+
+    Returns:
+        Consolidated extractions, in their original order
+    """
+    if thresholds is None:
+        thresholds = parse_thresholds(settings.CONSOLIDATION_THRESHOLDS)
+    if default_threshold is None:
+        default_threshold = settings.CONSOLIDATION_DEFAULT_THRESHOLD
+
+    by_class: Dict[str, list] = {}
+    for extraction in extractions:
+        by_class.setdefault(extraction.extraction_class, []).append(extraction)
+
+    kept = set()
+    for cls, items in by_class.items():
+        threshold = thresholds.get(cls, default_threshold)
+        if threshold and len(items) > 1:
+            items = _consolidate_class(items, threshold)
+        kept.update(map(id, items))
+    return [e for e in extractions if id(e) in kept]
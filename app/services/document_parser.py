@@ -1,41 +1,232 @@
 """Document Parsing Service"""
+import asyncio
+import math
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
 import pdfplumber
 from docx import Document
 
+from app.core.config import settings
+
+# Called with (pages_done, page_count) as PDF pages are extracted
+PageProgress = Callable[[int, int], None]
 
-def parse_document(file_path: str, file_ext: str) -> str:
+
+def parse_document(file_path: str, file_ext: str, executor: Optional[Executor] = None) -> str:
     """
     Parse document and extract text
     
     Args:
         file_path: Path to document file
         file_ext: File extension (.pdf, .docx, .txt)
+        executor: Optional pool to run parsing on; large PDFs are split
+            into page ranges that are extracted in parallel
     
     Returns:
         Extracted text content
     """
+    return "\n\n".join(iter_document_text(file_path, file_ext, executor))
+
+
+def iter_document_text(
+    file_path: str,
+    file_ext: str,
+    executor: Optional[Executor] = None,
+    on_pages: Optional[PageProgress] = None
+) -> Iterator[str]:
+    """
+    Parse document incrementally, yielding text blocks in document order
+    
+    PDFs yield one block per page, or per page range when parsed on an
+    executor (the leading pages still come one at a time); DOCX and TXT
+    files yield a single block. Joining the blocks with blank lines gives
+    the same text as parse_document. Consumers can stop early or act on a
+    prefix while the rest of the document is still being parsed.
+    
+    Args:
+        file_path: Path to document file
+        file_ext: File extension (.pdf, .docx, .txt)
+        executor: Optional pool to run parsing on
+        on_pages: Optional PDF page progress callback
+    
+    Yields:
+        Non-empty text blocks
+    """
     
     if file_ext == ".pdf":
-        return _parse_pdf(file_path)
+        if executor is not None:
+            yield from _iter_pdf_parallel(file_path, executor, on_pages)
+        else:
+            yield from _iter_pdf(file_path, on_pages)
+        return
     elif file_ext == ".docx":
-        return _parse_docx(file_path)
+        parser = _parse_docx
     elif file_ext == ".txt":
-        return _parse_txt(file_path)
+        parser = _parse_txt
     else:
         raise ValueError(f"Unsupported file extension: {file_ext}")
+    
+    if executor is not None:
+        text = executor.submit(parser, file_path).result()
+    else:
+        text = parser(file_path)
+    
+    if text:
+        yield text
+
+
+async def aiter_document_text(
+    file_path: str,
+    file_ext: str,
+    executor: Executor,
+    on_pages: Optional[PageProgress] = None
+) -> AsyncIterator[str]:
+    """
+    Async variant of iter_document_text for use on the event loop
 
+    Work is submitted to the executor from the loop and awaited there, so
+    no thread is held while pages are being extracted; on_pages is called
+    on the loop.
+
+    Args:
+        file_path: Path to document file
+        file_ext: File extension (.pdf, .docx, .txt)
+        executor: Pool to run parsing on
+        on_pages: Optional PDF page progress callback
 
-def _parse_pdf(file_path: str) -> str:
-    """Extract text from PDF"""
+    Yields:
+        Non-empty text blocks, as for iter_document_text
+    """
+    if file_ext == ".pdf":
+        page_count = await asyncio.wrap_future(executor.submit(count_pdf_pages, file_path))
+        ranges = _pdf_ranges(page_count)
+        futures = [
+            executor.submit(extract_pdf_page_range, file_path, start, end)
+            for start, end in ranges
+        ]
+        try:
+            for (_, end), future in zip(ranges, futures):
+                texts = await asyncio.wrap_future(future)
+                if on_pages:
+                    on_pages(end, page_count)
+                for text in texts:
+                    yield text
+        finally:
+            # Stop queued ranges if the consumer gave up early
+            for future in futures:
+                future.cancel()
+        return
+    elif file_ext == ".docx":
+        parser = _parse_docx
+    elif file_ext == ".txt":
+        parser = _parse_txt
+    else:
+        raise ValueError(f"Unsupported file extension: {file_ext}")
+
+    text = await asyncio.wrap_future(executor.submit(parser, file_path))
+    if text:
+        yield text
+
+
+def _iter_pdf(file_path: str, on_pages: Optional[PageProgress] = None) -> Iterator[str]:
+    """Yield PDF page texts one page at a time"""
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        for index, page in enumerate(pdf.pages):
+            page_text = page.extract_text()
+            page.close()
+            if on_pages:
+                on_pages(index + 1, page_count)
+            if page_text:
+                yield page_text
+
+
+def _iter_pdf_parallel(file_path: str, executor: Executor, on_pages: Optional[PageProgress] = None) -> Iterator[str]:
+    """
+    Extract text from PDF on an executor, splitting large files by page
+    
+    The first PDF_LEAD_PAGES pages are submitted one page at a time ahead
+    of the rest, so the classification sample is ready after a page or
+    two whatever the file size. Below PDF_PARALLEL_PAGE_THRESHOLD pages
+    the remainder is parsed by a single worker. Above it, each worker
+    opens the file independently and extracts one contiguous page range.
+    Ranges are yielded in page order as soon as each one and all before
+    it are done.
+    """
+    page_count = count_pdf_pages(file_path)
+    ranges = _pdf_ranges(page_count)
+    futures = [
+        executor.submit(extract_pdf_page_range, file_path, start, end)
+        for start, end in ranges
+    ]
+    
+    try:
+        for (_, end), future in zip(ranges, futures):
+            texts = future.result()
+            if on_pages:
+                on_pages(end, page_count)
+            yield from texts
+    finally:
+        # Stop queued ranges if the consumer gave up early
+        for future in futures:
+            future.cancel()
+
+
+def _pdf_ranges(page_count: int) -> List[Tuple[int, int]]:
+    """Single-page lead ranges, then the rest split for the parse workers"""
+    lead = min(settings.PDF_LEAD_PAGES, page_count)
+    ranges = [(page, page + 1) for page in range(lead)]
+    if page_count > lead:
+        # Twice as many ranges as workers evens out pages of uneven cost
+        parts = 1
+        if page_count >= settings.PDF_PARALLEL_PAGE_THRESHOLD:
+            parts = max(1, settings.PARSE_PROCESS_WORKERS) * 2
+        ranges += [
+            (lead + start, lead + end)
+            for start, end in split_page_ranges(page_count - lead, parts)
+        ]
+    return ranges
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """Count pages in a PDF"""
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pdf_page_range(file_path: str, start: int, end: Optional[int]) -> List[str]:
+    """
+    Extract non-empty page texts for pages [start, end)
+    
+    Args:
+        file_path: Path to PDF
+        start: First page index
+        end: Page index to stop at, or None for the last page
+    
+    Returns:
+        Page texts in page order
+    """
     text_parts = []
     
     with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
+        for page in pdf.pages[start:end]:
             page_text = page.extract_text()
             if page_text:
                 text_parts.append(page_text)
+            # Release parsed layout objects as we go
+            page.close()
     
-    return "\n\n".join(text_parts)
+    return text_parts
+
+
+def split_page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into at most `parts` contiguous ranges"""
+    size = max(1, math.ceil(page_count / max(1, parts)))
+    return [
+        (start, min(start + size, page_count))
+        for start in range(0, page_count, size)
+    ]
 
 
 def _parse_docx(file_path: str) -> str:
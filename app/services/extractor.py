@@ -1,10 +1,21 @@
 """Insight Extraction Service using langextract"""
+import asyncio
 import os
 import langextract as lx
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from langextract.core import base_model, types as lx_types
 from app.core.config import settings
-from app.core.schemas import DocumentType
-from app.templates.extraction_templates import get_template
+from app.core.schemas import DocumentType, ClassificationResult
+from app.services.chunker import chunk_text, TextChunk
+from app.services.classifier import classify_document, CLASSIFY_SAMPLE_CHARS, _map_category
+from app.services.consolidation import consolidate_extractions
+from app.services.llm_cache import cached_call, cached_call_async, serialize_extractions, deserialize_extractions
+from app.services.llm_clients import client_registry
+from app.services.local_classifier import classify_locally
+from app.templates.extraction_templates import get_template, FUSED_TEMPLATE
+from app.utils.executors import run_in_executor, LLM
 
 from dotenv import load_dotenv
 
@@ -13,38 +24,329 @@ load_dotenv()
 # Configure Gemini for langextract
 os.environ['GEMINI_API_KEY'] = settings.GEMINI_API_KEY
 
+# Called with (chunks_done, chunk_count, chunk_extractions)
+ChunkCallback = Callable[[int, int, list], None]
 
-def extract_insights(text: str, doc_type: DocumentType):
+
+def extract_insights(text: str, doc_type: DocumentType, use_cache: bool = True):
     """
     Extract insights from document using langextract
     
+    Long documents are split into overlapping chunks on paragraph and
+    sentence boundaries, extracted in parallel, and merged.
+    
     Args:
         text: Document text content
         doc_type: Classified document type
+        use_cache: Reuse memoized chunk extractions; unchanged chunks of a
+            re-run document are served from cache
     
     Returns:
-        langextract ExtractionResult with deduplicated extractions
+        langextract AnnotatedDocument with deduplicated extractions whose
+        char offsets refer to the original text
     """
     
     # Get extraction template for document type
     template = get_template(doc_type)
     
-    # Handle long documents by chunking
-    if len(text) > 8000:
-        text = _chunk_and_extract(text, template)
+    # Split into chunks
+    chunks = _split(text)
+    
+    # Map: extract every chunk with bounded concurrency
+    chunk_extractions = _extract_chunks(chunks, template, use_cache)
+    
+    # Reduce: merge and deduplicate
+    return _merge_chunks(text, chunks, chunk_extractions)
+
+
+async def extract_insights_async(
+    text: str,
+    doc_type: DocumentType,
+    use_cache: bool = True,
+    on_chunk: Optional[ChunkCallback] = None
+):
+    """
+    Async variant of extract_insights
+    
+    Chunks are extracted with asyncio.gather under a semaphore of
+    EXTRACTION_MAX_CONCURRENCY, and Gemini is called through the async
+    API, so no thread is held while a request is in flight. The local
+    langextract passes and the final merge run on the LLM executor to
+    keep the event loop free.
+    
+    Args:
+        text: Document text content
+        doc_type: Classified document type
+        use_cache: Reuse memoized chunk extractions (shared with the sync path)
+        on_chunk: Optional callback, called as each chunk finishes with
+            (chunks_done, chunk_count, chunk_extractions); extractions are
+            in document offsets and not yet deduplicated
+    
+    Returns:
+        langextract AnnotatedDocument, as for extract_insights
+    """
+    template = get_template(doc_type)
+    chunks = _split(text)
+    semaphore = asyncio.Semaphore(max(1, settings.EXTRACTION_MAX_CONCURRENCY))
+    done = 0
+    
+    async def extract(chunk: TextChunk) -> list:
+        nonlocal done
+        async with semaphore:
+            extractions = await _extract_chunk_async(chunk, template, use_cache)
+        done += 1
+        if on_chunk:
+            on_chunk(done, len(chunks), extractions)
+        return extractions
+    
+    chunk_extractions = await asyncio.gather(*(extract(chunk) for chunk in chunks))
+    return await run_in_executor(LLM, _merge_chunks, text, chunks, list(chunk_extractions))
+
+
+def classify_and_extract(text: str, use_cache: bool = True) -> Tuple[ClassificationResult, Any]:
+    """
+    Classify and extract with one fewer serial Gemini round-trip
+    
+    The first chunk is sent with a combined prompt (FUSED_TEMPLATE) that
+    returns the document type together with union-template extractions.
+    The type-specific pass over the remaining chunks starts as soon as
+    that call returns. A confident local classification skips the fused
+    call, and a fused response without a usable type falls back to
+    classify_document.
+    
+    Args:
+        text: Document text content
+        use_cache: Reuse memoized Gemini responses
+    
+    Returns:
+        (ClassificationResult, AnnotatedDocument)
+    """
+    local_result = classify_locally(text[:CLASSIFY_SAMPLE_CHARS])
+    if local_result is not None and local_result.confidence >= settings.LOCAL_CLASSIFIER_THRESHOLD:
+        return local_result, extract_insights(text, local_result.document_type, use_cache)
+    
+    chunks = _split(text)
+    first_extractions = _extract_chunk(chunks[0], FUSED_TEMPLATE, use_cache)
+    
+    classification = _classification_from_fused(first_extractions)
+    if classification is None:
+        classification = classify_document(text, use_cache=use_cache)
+    
+    # Keep only first-chunk extractions that belong to the selected template
+    template = get_template(classification.document_type)
+    first_extractions = [
+        e for e in first_extractions
+        if e.extraction_class in template.extraction_classes
+    ]
+    
+    chunk_extractions = [first_extractions] + _extract_chunks(chunks[1:], template, use_cache)
+    return classification, _merge_chunks(text, chunks, chunk_extractions)
+
+
+def _classification_from_fused(extractions: list) -> Optional[ClassificationResult]:
+    """Read the document_type extraction from a fused response"""
+    for extraction in extractions:
+        if extraction.extraction_class != "document_type":
+            continue
+        
+        attrs = extraction.attributes or {}
+        type_str = str(attrs.get("type", "")).strip().upper()
+        if not type_str:
+            return None
+        
+        try:
+            confidence = float(attrs.get("confidence", 0.7))
+        except (TypeError, ValueError):
+            confidence = 0.7
+        
+        return ClassificationResult(
+            document_type=_map_category(type_str),
+            confidence=confidence,
+            reasoning="Classified together with first-chunk extraction",
+            method="fused"
+        )
+    
+    return None
+
+
+def _split(text: str) -> list:
+    return chunk_text(
+        text,
+        chunk_size=settings.EXTRACTION_CHUNK_SIZE,
+        overlap=settings.EXTRACTION_CHUNK_OVERLAP
+    )
+
+
+def _extract_chunks(chunks: list, template, use_cache: bool) -> list:
+    """Extract chunks in parallel; returns one extraction list per chunk"""
+    if not chunks:
+        return []
+    
+    max_workers = max(1, min(settings.EXTRACTION_MAX_CONCURRENCY, len(chunks)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="extract") as pool:
+        return list(pool.map(lambda chunk: _extract_chunk(chunk, template, use_cache), chunks))
+
+
+def _merge_chunks(text: str, chunks: list, chunk_extractions: list):
+    """Keep each chunk's extractions from the region it owns, then deduplicate"""
+    extractions = []
+    for index, chunk in enumerate(chunks):
+        own_start, own_end = _owned_region(chunks, index)
+        for extraction in chunk_extractions[index]:
+            interval = extraction.char_interval
+            if interval is None or interval.start_pos is None:
+                extractions.append(extraction)
+            elif own_start <= interval.start_pos < own_end:
+                extractions.append(extraction)
+    
+    extractions = _deduplicate_extractions(extractions)
+    if settings.CONSOLIDATION_ENABLED:
+        extractions = consolidate_extractions(extractions)
+    
+    return lx.data.AnnotatedDocument(
+        text=text,
+        extractions=extractions
+    )
+
+
+def _extract_chunk(chunk: TextChunk, template, use_cache: bool = True) -> list:
+    """Run langextract on one chunk and shift offsets into document space"""
+    model_id = settings.GEMINI_MODEL
+    
+    def run_extract():
+        result = _run_langextract(chunk.text, template, client_registry.extraction_model(template))
+        return serialize_extractions(result.extractions or [])
     
-    # Run extraction
-    result = lx.extract(
+    # Cached offsets are chunk-relative so a chunk can move within a document
+    extractions = deserialize_extractions(cached_call(
+        run_extract,
+        model=model_id,
+        prompt=template.prompt_description,
+        examples=template.examples,
+        text=chunk.text,
+        use_cache=use_cache
+    ))
+    return _shift_offsets(extractions, chunk.start)
+
+
+async def _extract_chunk_async(chunk: TextChunk, template, use_cache: bool = True) -> list:
+    """
+    Async counterpart of _extract_chunk
+    
+    langextract itself is synchronous, so it is run twice around the
+    network calls: once to collect the prompts it would send, and once
+    to parse and align the Gemini responses to the chunk. Both passes
+    are local CPU work and run on the LLM executor; the Gemini calls are
+    awaited on the event loop without holding a thread.
+    """
+    model_id = settings.GEMINI_MODEL
+    
+    async def run_extract():
+        model = client_registry.extraction_model(template)
+        
+        recorder = _PromptRecorder(model)
+        await run_in_executor(LLM, _run_langextract, chunk.text, template, recorder)
+        
+        outputs = await asyncio.gather(*(
+            client_registry.generate_async(model, prompt) for prompt in recorder.prompts
+        ))
+        
+        replay = _PromptReplay(model, dict(zip(recorder.prompts, outputs)))
+        result = await run_in_executor(LLM, _run_langextract, chunk.text, template, replay)
+        return serialize_extractions(result.extractions or [])
+    
+    extractions = deserialize_extractions(await cached_call_async(
+        run_extract,
+        model=model_id,
+        prompt=template.prompt_description,
+        examples=template.examples,
+        text=chunk.text,
+        use_cache=use_cache
+    ))
+    return _shift_offsets(extractions, chunk.start)
+
+
+def _run_langextract(text: str, template, model):
+    # Registry models already carry the template's schema constraints
+    return lx.extract(
         text_or_documents=text,
         prompt_description=template.prompt_description,
         examples=template.examples,
-        model_id=os.getenv("GEMINI_MODEL"),
+        model=model,
+        use_schema_constraints=False,
+        show_progress=False,
     )
+
+
+class _PromptRecorder(base_model.BaseLanguageModel):
+    """Collects the prompts langextract would send, answering each with no extractions"""
+    
+    def __init__(self, model):
+        super().__init__()
+        _mirror_output_format(self, model)
+        self.prompts = []
+    
+    def infer(self, batch_prompts, **kwargs):
+        for prompt in batch_prompts:
+            self.prompts.append(prompt)
+            yield [lx_types.ScoredOutput(score=1.0, output='{"extractions": []}')]
+
+
+class _PromptReplay(base_model.BaseLanguageModel):
+    """Answers langextract prompts with responses fetched ahead of time"""
+    
+    def __init__(self, model, responses: Dict[str, str]):
+        super().__init__()
+        _mirror_output_format(self, model)
+        self.responses = responses
     
-    # Deduplicate extractions
-    result.extractions = _deduplicate_extractions(result.extractions)
+    def infer(self, batch_prompts, **kwargs):
+        for prompt in batch_prompts:
+            yield [lx_types.ScoredOutput(score=1.0, output=self.responses[prompt])]
+
+
+def _mirror_output_format(stand_in: base_model.BaseLanguageModel, model):
+    """Give a stand-in model the schema and fencing of the real model"""
+    stand_in.model_id = getattr(model, "model_id", None)
+    if model is not None:
+        stand_in.apply_schema(model.schema)
+        stand_in.set_fence_output(model.requires_fence_output)
+
+
+def _shift_offsets(extractions: list, offset: int) -> list:
+    """Move chunk-relative char offsets into document space"""
+    for extraction in extractions:
+        interval = extraction.char_interval
+        if interval is not None and interval.start_pos is not None:
+            interval.start_pos += offset
+            if interval.end_pos is not None:
+                interval.end_pos += offset
     
-    return result
+    return extractions
+
+
+def _owned_region(chunks: list, index: int) -> tuple:
+    """
+    Region of the document a chunk is authoritative for
+    
+    Overlapping spans are split at their midpoint so an entity that
+    appears in two neighbouring chunks is counted once.
+    """
+    chunk = chunks[index]
+    own_start = chunk.start
+    own_end = chunk.end
+    
+    if index > 0:
+        previous = chunks[index - 1]
+        if previous.end > chunk.start:
+            own_start = (chunk.start + previous.end) // 2
+    
+    if index < len(chunks) - 1:
+        following = chunks[index + 1]
+        if chunk.end > following.start:
+            own_end = (following.start + chunk.end) // 2
+    
+    return own_start, own_end
 
 
 def _deduplicate_extractions(extractions: list) -> list:
@@ -127,22 +429,3 @@ def _merge_attributes(all_attributes: list) -> dict:
     
     return merged
 
-
-def _chunk_and_extract(text: str, template):
-    """
-    Chunk long documents and extract from first significant chunk
-    
-    For 5-10 page documents, we focus on the first ~4000 chars
-    which typically contains the most important information
-    """
-    # Take first 4000 characters with word boundary
-    chunk_size = 4000
-    if len(text) > chunk_size:
-        # Find last space to avoid cutting words
-        last_space = text[:chunk_size].rfind(' ')
-        if last_space > chunk_size - 200:
-            text = text[:last_space]
-        else:
-            text = text[:chunk_size]
-    
-    return text
@@ -0,0 +1,140 @@
+"""Per-Job Progress Events for Server-Sent Events subscribers"""
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+# Event types that end a job's stream
+TERMINAL_EVENTS = {"completed", "failed"}
+
+JobEvent = Tuple[int, str, dict]
+
+
+class JobEventBroker:
+    """
+    Fan-out of job progress events
+
+    Each job keeps a bounded history so late subscribers (and reconnects
+    with Last-Event-ID) see what already happened, until a grace period
+    after its terminal event. An idle subscriber costs one asyncio.Queue
+    and no task or thread of its own. Publishing must happen on the
+    event loop thread.
+    """
+
+    def __init__(self, history_limit: int = 500, grace: float = 300):
+        self.history_limit = history_limit
+        self.grace = grace
+        self._history: Dict[str, Deque[JobEvent]] = {}
+        self._next_id: Dict[str, int] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        # Terminal event time by job ID, oldest first
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+
+    def open(self, job_id: str):
+        """Start accepting events for a job"""
+        self._history.setdefault(job_id, deque(maxlen=self.history_limit))
+        self._next_id.setdefault(job_id, 1)
+
+    def has_history(self, job_id: str) -> bool:
+        """Whether a job's events are still held"""
+        return job_id in self._history
+
+    def subscriber_count(self, job_id: Optional[str] = None) -> int:
+        if job_id is not None:
+            return len(self._subscribers.get(job_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, job_id: str, event: str, data: dict):
+        """Record an event and deliver it to current subscribers"""
+        if job_id in self._finished:
+            return
+        self.open(job_id)
+
+        event_id = self._next_id[job_id]
+        self._next_id[job_id] = event_id + 1
+        item = (event_id, event, data)
+        self._history[job_id].append(item)
+
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(item)
+
+        if event in TERMINAL_EVENTS:
+            self._finished[job_id] = time.monotonic()
+        self.expire()
+
+    def expire(self, now: Optional[float] = None):
+        """Drop history of jobs that finished more than the grace period ago"""
+        cutoff = (time.monotonic() if now is None else now) - self.grace
+        while self._finished:
+            job_id, finished = next(iter(self._finished.items()))
+            if finished > cutoff:
+                break
+            del self._finished[job_id]
+            self._history.pop(job_id, None)
+            self._next_id.pop(job_id, None)
+
+    async def subscribe(
+        self,
+        job_id: str,
+        last_event_id: int = 0,
+        heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[JobEvent]]:
+        """
+        Replay history after last_event_id, then follow live events
+
+        Args:
+            job_id: Job to follow
+            last_event_id: Skip events up to and including this ID
+            heartbeat: If set, yield None after this many idle seconds
+
+        Yields:
+            (event_id, event, data) tuples until a terminal event, with
+            None as an idle heartbeat
+        """
+        self.expire()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+
+        try:
+            # Snapshot history after registering so nothing falls in between
+            backlog = [item for item in self._history.get(job_id, ()) if item[0] > last_event_id]
+            seen = last_event_id
+            for item in backlog:
+                seen = item[0]
+                yield item
+                if item[1] in TERMINAL_EVENTS:
+                    return
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if item[0] <= seen:
+                    continue
+                seen = item[0]
+                yield item
+                if item[1] in TERMINAL_EVENTS:
+                    return
+        finally:
+            queues = self._subscribers.get(job_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[job_id]
+
+
+def format_sse(item: Optional[JobEvent]) -> str:
+    """Encode an event (or a heartbeat for None) in text/event-stream format"""
+    if item is None:
+        return ": keep-alive\n\n"
+    event_id, event, data = item
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+job_events = JobEventBroker(grace=settings.SSE_EVENT_GRACE_SECONDS)
@@ -0,0 +1,264 @@
+"""Background Job Manager for document analysis"""
+import asyncio
+import time
+import traceback
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.schemas import (
+    BatchDocument, BatchRejection, BatchStatusResponse, JobState, JobStatusResponse, StageState
+)
+from app.services.job_events import job_events
+from app.services.pipeline import STAGES, run_analysis
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+class _Batch(NamedTuple):
+    created_at: datetime
+    documents: List[Tuple[str, str]]  # (filename, job_id)
+    rejected: List[BatchRejection]
+
+
+def terminal_event(job: JobStatusResponse) -> Tuple[str, dict]:
+    """The completed or failed event for a finished job"""
+    if job.status == JobState.COMPLETED:
+        return "completed", {
+            "document_type": job.result.document_type.value,
+            "extraction_count": job.result.extraction_count,
+            "pdf_url": job.result.pdf_url,
+            "jsonl_url": job.result.jsonl_url,
+        }
+    return "failed", {"error": job.error}
+
+
+class JobManager:
+    """
+    Bounded worker pool for background analysis jobs
+
+    Jobs are queued in memory and processed by a fixed number of worker
+    tasks, so the number of in-flight pipelines stays bounded no matter
+    how many jobs have been accepted. Finished jobs and batches are kept
+    for retention seconds (at most max_finished of each), after which
+    job status comes from the job store.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, retention: float = 3600, max_finished: int = 10000):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.retention = retention
+        self.max_finished = max_finished
+        self._jobs: Dict[str, JobStatusResponse] = {}
+        self._batches: Dict[str, _Batch] = {}
+        self._job_batch: Dict[str, str] = {}
+        # Finish time by ID, oldest first
+        self._finished_jobs: "OrderedDict[str, float]" = OrderedDict()
+        self._finished_batches: "OrderedDict[str, float]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        """Start worker tasks on the running event loop"""
+        if self.started:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.max_workers)
+        ]
+
+    async def stop(self):
+        """Cancel worker tasks"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def submit(self, job_id: str, file_path: str, file_ext: str, filename: str, **options) -> JobStatusResponse:
+        """
+        Enqueue a saved upload for analysis
+
+        Extra keyword options are passed through to run_analysis.
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        await self.start()
+
+        now = datetime.now()
+        job = JobStatusResponse(
+            job_id=job_id,
+            status=JobState.QUEUED,
+            stages={stage: StageState.PENDING for stage in STAGES},
+            created_at=now,
+            updated_at=now
+        )
+
+        try:
+            self._queue.put_nowait((job_id, file_path, file_ext, filename, options))
+        except asyncio.QueueFull:
+            raise QueueFullError("Job queue is full, try again later")
+
+        self._jobs[job_id] = job
+        job_events.publish(job_id, "status", {"status": JobState.QUEUED.value})
+        return job
+
+    async def submit_batch(
+        self,
+        batch_id: str,
+        documents: List[Tuple[str, str, str, str]],
+        rejected: List[BatchRejection],
+        content_hashes: Optional[Dict[str, str]] = None,
+        **options
+    ) -> BatchStatusResponse:
+        """
+        Enqueue a batch of saved uploads as one job per document
+
+        All documents share the same worker pool as single jobs. The batch
+        is accepted whole or not at all.
+
+        Args:
+            batch_id: Unique batch identifier
+            documents: (job_id, file_path, file_ext, filename) per document
+            rejected: Members that were not scheduled
+            content_hashes: Upload SHA-256 by job ID, for the result cache
+            **options: Passed through to run_analysis
+
+        Raises:
+            QueueFullError: If the queue cannot take the whole batch
+        """
+        await self.start()
+
+        if len(documents) > self.max_queue_size - self._queue.qsize():
+            raise QueueFullError("Job queue cannot take the whole batch, try again later")
+
+        content_hashes = content_hashes or {}
+        self._batches[batch_id] = _Batch(
+            created_at=datetime.now(),
+            documents=[(filename, job_id) for job_id, _, _, filename in documents],
+            rejected=rejected
+        )
+        for job_id, file_path, file_ext, filename in documents:
+            self._job_batch[job_id] = batch_id
+            await self.submit(
+                job_id, file_path, file_ext, filename,
+                content_hash=content_hashes.get(job_id), **options
+            )
+        if not documents:
+            self._finished_batches[batch_id] = time.monotonic()
+        return self.get_batch(batch_id)
+
+    def get(self, job_id: str) -> Optional[JobStatusResponse]:
+        """Get job status by ID"""
+        return self._jobs.get(job_id)
+
+    def get_batch(self, batch_id: str) -> Optional[BatchStatusResponse]:
+        """Get batch progress by ID"""
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            return None
+
+        documents = [
+            BatchDocument(
+                filename=filename,
+                job_id=job_id,
+                status=self._jobs[job_id].status,
+                status_url=f"/api/v1/jobs/{job_id}"
+            )
+            for filename, job_id in batch.documents
+        ]
+        counts = Counter(document.status for document in documents)
+
+        return BatchStatusResponse(
+            batch_id=batch_id,
+            created_at=batch.created_at,
+            counts={state: counts.get(state, 0) for state in JobState},
+            documents=documents,
+            rejected=batch.rejected
+        )
+
+    async def _worker(self):
+        while True:
+            job_id, file_path, file_ext, filename, options = await self._queue.get()
+            try:
+                await self._run_job(job_id, file_path, file_ext, filename, options)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str, file_path: str, file_ext: str, filename: str, options: dict):
+        job = self._jobs[job_id]
+        job.status = JobState.RUNNING
+        job.updated_at = datetime.now()
+        job_events.publish(job_id, "status", {"status": JobState.RUNNING.value})
+
+        def on_stage(stage: str, state: StageState):
+            job.stages[stage] = state
+            job.updated_at = datetime.now()
+            job_events.publish(job_id, "stage", {"stage": stage, "state": state.value})
+
+        def on_event(event: str, data: dict):
+            job_events.publish(job_id, event, data)
+
+        try:
+            job.result = await run_analysis(
+                job_id, file_path, file_ext, filename, on_stage=on_stage, on_event=on_event, **options
+            )
+            job.status = JobState.COMPLETED
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}\n{traceback.format_exc()}")
+            for stage, state in job.stages.items():
+                if state == StageState.RUNNING:
+                    job.stages[stage] = StageState.FAILED
+            job.status = JobState.FAILED
+            job.error = str(e)
+        job.updated_at = datetime.now()
+
+        job_events.publish(job_id, *terminal_event(job))
+        self._finish(job_id)
+
+    def _finish(self, job_id: str):
+        """Start the retention period of a finished job, or of its batch once all are done"""
+        now = time.monotonic()
+        batch_id = self._job_batch.get(job_id)
+        if batch_id is None:
+            self._finished_jobs[job_id] = now
+        elif all(j in self._jobs and self._jobs[j].status in (JobState.COMPLETED, JobState.FAILED)
+                 for _, j in self._batches[batch_id].documents):
+            self._finished_batches[batch_id] = now
+        self._evict(now)
+
+    def _evict(self, now: float):
+        """Forget finished jobs and batches past retention or over the bound"""
+        cutoff = now - self.retention
+        while self._finished_jobs:
+            job_id, finished = next(iter(self._finished_jobs.items()))
+            if finished > cutoff and len(self._finished_jobs) <= self.max_finished:
+                break
+            del self._finished_jobs[job_id]
+            self._jobs.pop(job_id, None)
+        while self._finished_batches:
+            batch_id, finished = next(iter(self._finished_batches.items()))
+            if finished > cutoff and len(self._finished_batches) <= self.max_finished:
+                break
+            del self._finished_batches[batch_id]
+            # A batch's jobs are kept as long as the batch, for its status view
+            for _, job_id in self._batches.pop(batch_id).documents:
+                self._jobs.pop(job_id, None)
+                self._job_batch.pop(job_id, None)
+
+
+job_manager = JobManager(
+    max_workers=settings.JOB_WORKERS,
+    max_queue_size=settings.JOB_QUEUE_SIZE,
+    retention=settings.JOB_RETENTION_SECONDS,
+    max_finished=settings.JOB_MAX_FINISHED
+)
@@ -0,0 +1,190 @@
+"""Persistent Job Metadata Store"""
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.schemas import JobRecord
+
+# Columns holding JSON-encoded dicts
+_JSON_FIELDS = ("stage_timings", "token_usage")
+_TIME_FIELDS = ("created_at", "updated_at")
+_COLUMNS = list(JobRecord.model_fields)
+
+
+class JobStore(ABC):
+    """
+    Interface for job metadata stores
+
+    Implementations persist one JobRecord per job and answer lookups by
+    job ID, content hash and creation time without touching the
+    filesystem holding the artifacts.
+    """
+
+    @abstractmethod
+    def put(self, record: JobRecord):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_by_hash(self, content_hash: str, limit: int = 10) -> List[JobRecord]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list(self, since: Optional[datetime] = None, limit: int = 100) -> List[JobRecord]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def forget_artifacts(self, job_ids: List[str]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, object]:
+        raise NotImplementedError
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite job store in WAL mode, indexed on content hash and creation time
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                content_hash TEXT,
+                upload_size INTEGER,
+                document_type TEXT,
+                confidence REAL,
+                classification_method TEXT,
+                extraction_count INTEGER,
+                cached INTEGER NOT NULL DEFAULT 0,
+                stage_timings TEXT NOT NULL DEFAULT '{}',
+                token_usage TEXT NOT NULL DEFAULT '{}',
+                report_path TEXT,
+                report_size INTEGER,
+                jsonl_path TEXT,
+                jsonl_size INTEGER,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_hash ON jobs(content_hash, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)")
+
+    def put(self, record: JobRecord):
+        """Insert or replace a job's record"""
+        row = _to_row(record)
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                [row[column] for column in _COLUMNS]
+            )
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        rows = self._select("WHERE job_id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def find_by_hash(self, content_hash: str, limit: int = 10) -> List[JobRecord]:
+        """Most recent jobs for an upload's SHA-256"""
+        return self._select(
+            "WHERE content_hash = ? ORDER BY created_at DESC LIMIT ?", (content_hash, limit)
+        )
+
+    def list(self, since: Optional[datetime] = None, limit: int = 100) -> List[JobRecord]:
+        """Most recent jobs, optionally only those created after since"""
+        after = since.timestamp() if since is not None else 0.0
+        return self._select("WHERE created_at > ? ORDER BY created_at DESC LIMIT ?", (after, limit))
+
+    def forget_artifacts(self, job_ids: List[str]):
+        """Clear artifact paths of jobs whose files were deleted"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE jobs SET report_path = NULL, jsonl_path = NULL WHERE job_id = ?",
+                [(job_id,) for job_id in job_ids]
+            )
+            self._conn.execute("COMMIT")
+
+    def stats(self) -> Dict[str, object]:
+        """Job counts by status and document type"""
+        with self._lock:
+            by_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            by_type = dict(self._conn.execute(
+                "SELECT document_type, COUNT(*) FROM jobs WHERE document_type IS NOT NULL GROUP BY document_type"
+            ).fetchall())
+        return {"jobs": sum(by_status.values()), "by_status": by_status, "by_document_type": by_type}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _select(self, clause: str, params: tuple) -> List[JobRecord]:
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs {clause}", params)
+            rows = cursor.fetchall()
+        return [_from_row(dict(zip(_COLUMNS, row))) for row in rows]
+
+
+def _to_row(record: JobRecord) -> dict:
+    row = record.model_dump(mode="json")
+    for field in _JSON_FIELDS:
+        row[field] = json.dumps(row[field])
+    for field in _TIME_FIELDS:
+        row[field] = getattr(record, field).timestamp()
+    row["cached"] = int(record.cached)
+    return row
+
+
+def _from_row(row: dict) -> JobRecord:
+    for field in _JSON_FIELDS:
+        row[field] = json.loads(row[field])
+    for field in _TIME_FIELDS:
+        row[field] = datetime.fromtimestamp(row[field])
+    row["cached"] = bool(row["cached"])
+    return JobRecord.model_validate(row)
+
+
+# Available job store backends by name
+BACKENDS = {
+    "sqlite": SQLiteJobStore,
+}
+
+_job_store: Optional[JobStore] = None
+
+
+def get_job_store() -> Optional[JobStore]:
+    """Get the process-wide job store, or None if disabled"""
+    global _job_store
+
+    if not settings.JOB_STORE_ENABLED:
+        return None
+
+    if _job_store is None:
+        _job_store = BACKENDS[settings.JOB_STORE_BACKEND](path=settings.JOB_STORE_PATH)
+
+    return _job_store
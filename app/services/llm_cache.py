@@ -0,0 +1,149 @@
+"""Memoized LLM Call Layer"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, List, Optional
+
+import langextract as lx
+
+from app.core.config import settings
+from app.utils.cache_backend import SQLiteCacheBackend
+
+_llm_cache: Optional[SQLiteCacheBackend] = None
+
+
+def get_llm_cache() -> Optional[SQLiteCacheBackend]:
+    """Get the process-wide LLM response cache, or None if disabled"""
+    global _llm_cache
+
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    if _llm_cache is None:
+        _llm_cache = SQLiteCacheBackend(
+            path=settings.LLM_CACHE_PATH,
+            max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+            ttl_seconds=settings.LLM_CACHE_TTL_HOURS * 3600
+        )
+
+    return _llm_cache
+
+
+def llm_cache_key(model: str, prompt: str, examples: Any = None, text: str = "") -> str:
+    """Hash of everything that determines an LLM response"""
+    payload = json.dumps(
+        {
+            "model": model,
+            "prompt": prompt,
+            "examples": repr(examples) if examples is not None else None,
+            "text": text,
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_call(
+    compute: Callable[[], Any],
+    model: str,
+    prompt: str,
+    examples: Any = None,
+    text: str = "",
+    use_cache: bool = True
+) -> Any:
+    """
+    Return a memoized LLM result, calling compute on a miss
+
+    Args:
+        compute: Performs the LLM call; must return JSON-serializable data
+        model: Model name
+        prompt: Prompt or prompt description
+        examples: Few-shot examples, if any
+        text: Input text the prompt is applied to
+        use_cache: If False, skip the lookup but still store the fresh result
+
+    Returns:
+        The cached or freshly computed result
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return compute()
+
+    key = llm_cache_key(model, prompt, examples, text)
+
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+    result = compute()
+    cache.set(key, json.dumps(result).encode("utf-8"))
+    return result
+
+
+async def cached_call_async(
+    compute: Callable[[], Awaitable[Any]],
+    model: str,
+    prompt: str,
+    examples: Any = None,
+    text: str = "",
+    use_cache: bool = True
+) -> Any:
+    """
+    Async counterpart of cached_call; shares the same cache entries
+
+    Args:
+        compute: Coroutine function performing the LLM call
+        model, prompt, examples, text, use_cache: As for cached_call
+
+    Returns:
+        The cached or freshly computed result
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return await compute()
+
+    key = llm_cache_key(model, prompt, examples, text)
+
+    if use_cache:
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return json.loads(cached)
+
+    result = await compute()
+    await asyncio.to_thread(cache.set, key, json.dumps(result).encode("utf-8"))
+    return result
+
+
+def serialize_extractions(extractions: list) -> List[dict]:
+    """Convert langextract extractions to JSON-serializable dicts"""
+    serialized = []
+    for e in extractions:
+        interval = e.char_interval
+        serialized.append({
+            "extraction_class": e.extraction_class,
+            "extraction_text": e.extraction_text,
+            "char_interval": [interval.start_pos, interval.end_pos] if interval is not None else None,
+            "attributes": e.attributes,
+            "description": e.description,
+            "extraction_index": e.extraction_index,
+            "group_index": e.group_index,
+        })
+    return serialized
+
+
+def deserialize_extractions(serialized: List[dict]) -> list:
+    """Rebuild langextract extractions from serialize_extractions output"""
+    extractions = []
+    for item in serialized:
+        interval = item.get("char_interval")
+        extractions.append(lx.data.Extraction(
+            extraction_class=item["extraction_class"],
+            extraction_text=item["extraction_text"],
+            char_interval=lx.data.CharInterval(start_pos=interval[0], end_pos=interval[1]) if interval else None,
+            attributes=item.get("attributes"),
+            description=item.get("description"),
+            extraction_index=item.get("extraction_index"),
+            group_index=item.get("group_index"),
+        ))
+    return extractions
@@ -0,0 +1,226 @@
+"""
+Process-wide Gemini Client Registry
+
+Model objects are built once and reused across requests instead of per
+call. All google-genai clients (the ones langextract creates) share one
+pooled keep-alive httpx transport, so repeated calls skip TCP and TLS
+setup. The async path uses a matching httpx.AsyncClient and caps
+in-flight requests with a semaphore of the same size as the pool.
+"""
+import asyncio
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import google.generativeai as genai
+import httpx
+from google import genai as google_genai
+from google.genai import types as genai_types
+from langextract import factory
+
+from app.core.config import settings
+from app.core.schemas import ExtractionTemplate
+from app.templates.extraction_templates import TEMPLATES, FUSED_TEMPLATE
+
+# Token counts of async Gemini calls made on behalf of the current job
+_usage: ContextVar[Optional[Counter]] = ContextVar("gemini_usage", default=None)
+
+
+def track_usage() -> Counter:
+    """
+    Start counting Gemini tokens for the calling task
+
+    Tasks spawned afterwards share the returned Counter, so calls made
+    from gathered chunks are included. Cached responses cost nothing.
+
+    Returns:
+        Counter of calls, prompt_tokens and output_tokens
+    """
+    usage = Counter()
+    _usage.set(usage)
+    return usage
+
+
+def _record_usage(response):
+    usage = _usage.get()
+    metadata = getattr(response, "usage_metadata", None)
+    if usage is None or metadata is None:
+        return
+    usage["calls"] += 1
+    usage["prompt_tokens"] += getattr(metadata, "prompt_token_count", 0) or 0
+    usage["output_tokens"] += getattr(metadata, "candidates_token_count", 0) or 0
+
+
+class ClientRegistry:
+    """
+    Cache of Gemini model objects backed by a shared HTTP connection pool
+
+    Extraction models carry schema constraints derived from their
+    template's examples, so one is kept per template.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+        self._async_client: Optional[google_genai.Client] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._classification_model = None
+        self._extraction_models: Dict[int, object] = {}
+
+    def start(self):
+        """
+        Create the shared transport, the in-flight semaphore and a model
+        for every extraction template
+
+        Called once per application lifespan, from the event loop that
+        will use the semaphore.
+        """
+        with self._lock:
+            self._ensure_http_client()
+            self._inflight = asyncio.Semaphore(settings.GEMINI_POOL_MAX_CONNECTIONS)
+        for template in (*TEMPLATES.values(), FUSED_TEMPLATE):
+            self.extraction_model(template)
+
+    def close(self):
+        """Drop cached models and close pooled connections"""
+        with self._lock:
+            self._classification_model = None
+            self._extraction_models = {}
+            self._async_client = None
+            self._async_http_client = None
+            self._inflight = None
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+
+    async def aclose(self):
+        """Close the async transport as well, then everything else"""
+        if self._async_http_client is not None:
+            await self._async_http_client.aclose()
+        self.close()
+
+    def http_options(self) -> genai_types.HttpOptions:
+        """HTTP options that route a google-genai client through the shared pool"""
+        with self._lock:
+            return self._http_options()
+
+    async def generate_async(self, model, prompt: str) -> str:
+        """
+        Run one extraction prompt with the async Gemini API
+
+        Args:
+            model: Registry extraction model; supplies temperature and the
+                template's response schema
+            prompt: Fully rendered langextract prompt
+
+        Returns:
+            Raw response text
+        """
+        config = {"temperature": model.temperature}
+        if model.gemini_schema is not None:
+            config.update(model.gemini_schema.to_provider_config())
+
+        async with self.inflight():
+            response = await self.async_client().aio.models.generate_content(
+                model=settings.GEMINI_MODEL,
+                contents=prompt,
+                config=config
+            )
+        _record_usage(response)
+        return response.text
+
+    async def classify_async(self, prompt: str) -> str:
+        """Run the classification prompt with generate_content_async"""
+        async with self.inflight():
+            response = await self.classification_model().generate_content_async(prompt)
+        _record_usage(response)
+        return response.text
+
+    def async_client(self) -> google_genai.Client:
+        """google-genai client whose .aio calls go through the async pool"""
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = google_genai.Client(
+                    api_key=settings.GEMINI_API_KEY,
+                    http_options=self._http_options()
+                )
+            return self._async_client
+
+    def inflight(self) -> asyncio.Semaphore:
+        """Process-wide cap on concurrent async Gemini requests"""
+        if self._inflight is None:
+            raise RuntimeError("Client registry is not started")
+        return self._inflight
+
+    def classification_model(self):
+        """Reusable GenerativeModel for document classification"""
+        with self._lock:
+            if self._classification_model is None:
+                self._classification_model = genai.GenerativeModel(settings.GEMINI_MODEL)
+            return self._classification_model
+
+    def extraction_model(self, template: ExtractionTemplate):
+        """
+        Reusable langextract model for a template
+
+        Args:
+            template: Extraction template; templates are module-level
+                singletons, so they are keyed by identity
+
+        Returns:
+            Provider instance to pass to lx.extract(model=...)
+        """
+        key = id(template)
+        model = self._extraction_models.get(key)
+        if model is not None:
+            return model
+
+        config = factory.ModelConfig(
+            model_id=settings.GEMINI_MODEL,
+            provider_kwargs={
+                "api_key": settings.GEMINI_API_KEY,
+                "http_options": self.http_options(),
+            }
+        )
+        model = factory.create_model(
+            config,
+            examples=template.examples,
+            use_schema_constraints=True
+        )
+
+        with self._lock:
+            return self._extraction_models.setdefault(key, model)
+
+    def _http_options(self) -> genai_types.HttpOptions:
+        self._ensure_http_client()
+        if self._async_http_client is None:
+            self._async_http_client = httpx.AsyncClient(
+                limits=self._limits(),
+                timeout=settings.GEMINI_TIMEOUT_SECONDS
+            )
+        return genai_types.HttpOptions(
+            base_url=settings.GEMINI_BASE_URL or None,
+            httpx_client=self._http_client,
+            httpx_async_client=self._async_http_client
+        )
+
+    def _ensure_http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(
+                limits=self._limits(),
+                timeout=settings.GEMINI_TIMEOUT_SECONDS
+            )
+        return self._http_client
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.GEMINI_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GEMINI_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.GEMINI_POOL_KEEPALIVE_SECONDS
+        )
+
+
+client_registry = ClientRegistry()
@@ -0,0 +1,288 @@
+"""
+Local Document Classifier
+
+A zero-cost first pass in front of the Gemini classifier: keyword/regex
+features plus hashed word n-grams scored by a small multinomial logistic
+regression stored as JSON. Probabilities are temperature-scaled on a
+held-out set of realistic-length documents so the confidence threshold
+means the same thing outside the short seed examples. Retrain with:
+
+    python -m app.services.local_classifier train [corpus.jsonl] [model.json] [calibration.jsonl]
+"""
+import json
+import math
+import os
+import random
+import re
+import sys
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.schemas import DocumentType, ClassificationResult
+
+RESOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "resources", "local_classifier")
+DEFAULT_CORPUS_PATH = os.path.join(RESOURCE_DIR, "seed_corpus.jsonl")
+DEFAULT_CALIBRATION_PATH = os.path.join(RESOURCE_DIR, "calibration_corpus.jsonl")
+
+N_FEATURES = 2 ** 18
+
+# Pattern features are few but strong; weight them above single n-grams
+PATTERN_WEIGHT = 3.0
+
+_WORD = re.compile(r"[a-z][a-z']+")
+
+# Structural cues that n-grams alone pick up poorly
+PATTERN_FEATURES = {
+    "speaker_line": re.compile(r"^\s*(\[[\d:]+\]\s*)?[A-Z][\w.'-]+(\s[A-Z][\w.'-]+)?(\s\([^)]*\))?:\s", re.MULTILINE),
+    "timestamp": re.compile(r"\[\d{1,2}:\d{2}(:\d{2})?\]"),
+    "attendees": re.compile(r"\b(attendees|present|absent|minutes|agenda|action items?)\b", re.IGNORECASE),
+    "whereas": re.compile(r"\bWHEREAS\b|\bNOW,? THEREFORE\b|\bIN WITNESS WHEREOF\b"),
+    "legal_terms": re.compile(r"\b(hereinafter|hereto|thereof|herein|indemnif\w+|governing law|shall)\b", re.IGNORECASE),
+    "section_ref": re.compile(r"\b(Section|Article|Clause)\s+\d+(\.\d+)*", re.IGNORECASE),
+    "abstract": re.compile(r"^\s*(abstract|introduction|methodology|references|conclusion)s?\b", re.IGNORECASE | re.MULTILINE),
+    "citation": re.compile(r"\bet al\.|\(\s*[A-Z][a-z]+,?\s+\d{4}\s*\)|\[\d+(,\s*\d+)*\]|\bdoi\b", re.IGNORECASE),
+    "numbered_heading": re.compile(r"^\s*\d+(\.\d+)+\s+[A-Z]", re.MULTILINE),
+    "code": re.compile(r"```|\b(def|class|import|return|function)\b|\w+\(\)|\$ \w+|--[a-z][\w-]+"),
+    "tech_terms": re.compile(r"\b(API|endpoint|install|configur\w+|parameter|JSON|HTTP|CLI|SDK)\b"),
+    "dialogue": re.compile(r"[\"“][^\"”]{3,}[\"”]"),
+    "said": re.compile(r"\b(said|whispered|asked|replied|smiled|laughed)\b", re.IGNORECASE),
+}
+
+
+def extract_features(text: str) -> Dict[int, float]:
+    """
+    Map text to a sparse, L2-normalized hashed feature vector
+
+    Args:
+        text: Document text (typically the classification sample)
+
+    Returns:
+        Dict of feature index to weight
+    """
+    counts = Counter()
+
+    words = _WORD.findall(text.lower())
+    counts.update(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+    features = {}
+    for token, count in counts.items():
+        index = zlib.crc32(token.encode("utf-8")) % N_FEATURES
+        features[index] = features.get(index, 0.0) + 1.0 + math.log(count)
+
+    for name, pattern in PATTERN_FEATURES.items():
+        matches = len(pattern.findall(text))
+        if matches:
+            index = zlib.crc32(f"__{name}".encode("utf-8")) % N_FEATURES
+            features[index] = features.get(index, 0.0) + PATTERN_WEIGHT * (1.0 + math.log(matches))
+
+    norm = math.sqrt(sum(v * v for v in features.values())) or 1.0
+    return {index: value / norm for index, value in features.items()}
+
+
+class LocalClassifier:
+    """Multinomial logistic regression over hashed sparse features"""
+
+    def __init__(
+        self,
+        classes: List[str],
+        weights: Dict[str, Dict[int, float]],
+        bias: Dict[str, float],
+        temperature: float = 1.0
+    ):
+        self.classes = classes
+        self.weights = weights
+        self.bias = bias
+        self.temperature = temperature
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """Calibrated class probabilities for text"""
+        scores = self._scores(extract_features(text))
+        return self._softmax({cls: score / self.temperature for cls, score in scores.items()})
+
+    def predict(self, text: str) -> Tuple[DocumentType, float]:
+        """Most likely document type and its probability"""
+        probabilities = self.predict_proba(text)
+        label = max(probabilities, key=probabilities.get)
+        return DocumentType(label), probabilities[label]
+
+    def _scores(self, features: Dict[int, float]) -> Dict[str, float]:
+        scores = {}
+        for cls in self.classes:
+            weights = self.weights[cls]
+            scores[cls] = self.bias[cls] + sum(
+                value * weights.get(index, 0.0) for index, value in features.items()
+            )
+        return scores
+
+    @staticmethod
+    def _softmax(scores: Dict[str, float]) -> Dict[str, float]:
+        top = max(scores.values())
+        exps = {cls: math.exp(score - top) for cls, score in scores.items()}
+        total = sum(exps.values())
+        return {cls: value / total for cls, value in exps.items()}
+
+    @classmethod
+    def train(
+        cls,
+        samples: Iterable[Tuple[str, str]],
+        epochs: int = 200,
+        learning_rate: float = 2.0,
+        l2: float = 1e-5,
+        seed: int = 13
+    ) -> "LocalClassifier":
+        """
+        Fit the model with stochastic gradient descent
+
+        Args:
+            samples: (text, label) pairs; labels are DocumentType values
+            epochs: Passes over the data
+            learning_rate: SGD step size
+            l2: L2 regularization strength
+            seed: Shuffle seed for reproducible models
+        """
+        data = [(extract_features(text), label) for text, label in samples]
+        classes = sorted({label for _, label in data})
+        model = cls(classes, {c: {} for c in classes}, {c: 0.0 for c in classes})
+        rng = random.Random(seed)
+
+        for _ in range(epochs):
+            rng.shuffle(data)
+            for features, label in data:
+                probabilities = model._softmax(model._scores(features))
+                for c in classes:
+                    gradient = probabilities[c] - (1.0 if c == label else 0.0)
+                    weights = model.weights[c]
+                    for index, value in features.items():
+                        current = weights.get(index, 0.0)
+                        weights[index] = current - learning_rate * (gradient * value + l2 * current)
+                    model.bias[c] -= learning_rate * gradient
+
+        # Drop negligible weights to keep the stored model small
+        for c in classes:
+            model.weights[c] = {i: round(w, 5) for i, w in model.weights[c].items() if abs(w) > 1e-4}
+
+        return model
+
+    def calibrate(self, samples: Iterable[Tuple[str, str]]) -> float:
+        """
+        Fit the softmax temperature on held-out samples
+
+        Picks the temperature with the lowest log loss; it is never below
+        1, so calibration can only soften the trained model.
+
+        Args:
+            samples: (text, label) pairs not used for training
+
+        Returns:
+            The chosen temperature
+        """
+        scored = [(self._scores(extract_features(text)), label) for text, label in samples]
+
+        def log_loss(temperature: float) -> float:
+            loss = 0.0
+            for scores, label in scored:
+                probabilities = self._softmax({c: s / temperature for c, s in scores.items()})
+                loss -= math.log(max(probabilities[label], 1e-12))
+            return loss
+
+        self.temperature = min((1.0 + step / 10 for step in range(91)), key=log_loss)
+        return self.temperature
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "n_features": N_FEATURES,
+                    "classes": self.classes,
+                    "bias": self.bias,
+                    "temperature": self.temperature,
+                    "weights": {c: {str(i): w for i, w in ws.items()} for c, ws in self.weights.items()},
+                },
+                f
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "LocalClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data["n_features"] != N_FEATURES:
+            raise ValueError("Model was trained with a different feature size")
+        weights = {c: {int(i): w for i, w in ws.items()} for c, ws in data["weights"].items()}
+        return cls(data["classes"], weights, data["bias"], data.get("temperature", 1.0))
+
+
+def load_corpus(path: str) -> List[Tuple[str, str]]:
+    """Read (text, label) pairs from a JSONL file with text/label fields"""
+    samples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples.append((record["text"], record["label"]))
+    return samples
+
+
+_model: Optional[LocalClassifier] = None
+
+
+def get_local_classifier() -> Optional[LocalClassifier]:
+    """Load the on-disk model once; None if disabled or missing"""
+    global _model
+
+    if not settings.LOCAL_CLASSIFIER_ENABLED:
+        return None
+
+    if _model is None:
+        try:
+            _model = LocalClassifier.load(settings.LOCAL_CLASSIFIER_MODEL_PATH)
+        except (OSError, ValueError) as e:
+            print(f"Local classifier unavailable: {e}")
+            return None
+
+    return _model
+
+
+def classify_locally(text: str) -> Optional[ClassificationResult]:
+    """
+    Classify a document sample with the local model
+
+    Args:
+        text: Document text sample
+
+    Returns:
+        ClassificationResult with method "local", or None if no model is loaded
+    """
+    model = get_local_classifier()
+    if model is None:
+        return None
+
+    document_type, confidence = model.predict(text)
+    return ClassificationResult(
+        document_type=document_type,
+        confidence=round(confidence, 3),
+        reasoning="Classified locally from keyword and n-gram features",
+        method="local"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "train":
+        print(__doc__)
+        sys.exit(1)
+
+    corpus_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_CORPUS_PATH
+    model_path = sys.argv[3] if len(sys.argv) > 3 else settings.LOCAL_CLASSIFIER_MODEL_PATH
+
+    calibration_path = sys.argv[4] if len(sys.argv) > 4 else DEFAULT_CALIBRATION_PATH
+
+    corpus = load_corpus(corpus_path)
+    model = LocalClassifier.train(corpus)
+    temperature = model.calibrate(load_corpus(calibration_path))
+    model.save(model_path)
+    print(f"✓ Trained on {len(corpus)} samples (temperature {temperature:.1f}), saved to {model_path}")
@@ -0,0 +1,329 @@
+"""Document Analysis Pipeline"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+import langextract as lx
+
+from app.core.config import settings
+from app.core.schemas import AnalyzeResponse, ExtractionItem, JobRecord, JobState, StageState
+from app.services.document_parser import aiter_document_text
+from app.services.classifier import classify_document_async, CLASSIFY_SAMPLE_CHARS
+from app.services.extractor import extract_insights_async, classify_and_extract
+from app.services.job_store import get_job_store
+from app.services.llm_clients import track_usage
+from app.services.aggregation import ExtractionAggregate
+from app.services.report_renderer import report_renderer, report_request, write_report_request, DATA_FILE, REPORT_FILE
+from app.services.result_cache import get_result_cache, restore_cached_result, store_result
+from app.utils.executors import get_executor, run_in_executor, PARSE, LLM
+from app.utils.file_handler import job_dir
+
+# Pipeline stages in execution order
+STAGES = ["parsed", "classified", "extracted", "rendered"]
+
+StageCallback = Callable[[str, StageState], None]
+
+# Called with (event, data) for progress within a stage
+EventCallback = Callable[[str, dict], None]
+
+
+class DocumentTooShortError(ValueError):
+    """Raised when a parsed document has no usable content"""
+
+
+async def run_analysis(
+    job_id: str,
+    file_path: str,
+    file_ext: str,
+    filename: str,
+    content_hash: Optional[str] = None,
+    use_cache: bool = True,
+    on_stage: Optional[StageCallback] = None,
+    on_event: Optional[EventCallback] = None
+) -> AnalyzeResponse:
+    """
+    Run parse, classify, extract and render for a saved upload
+
+    Args:
+        job_id: Unique job identifier
+        file_path: Path to the saved upload
+        file_ext: File extension (.pdf, .docx, .txt)
+        filename: Original filename
+        content_hash: SHA-256 of the upload; enables the result cache
+        use_cache: If False, skip result and LLM cache lookups (fresh
+            results are still stored)
+        on_stage: Optional callback notified of stage transitions
+        on_event: Optional callback for progress events, always called on
+            the event loop: "pages" {done, total} while a PDF is parsed and
+            "chunk" {done, total, extractions} as chunks are extracted
+
+    Returns:
+        AnalyzeResponse for the job
+    """
+    store = get_job_store()
+    if store is None:
+        return await _analyze(job_id, file_path, file_ext, filename, content_hash, use_cache, on_stage, on_event)
+
+    now = datetime.now()
+    record = JobRecord(
+        job_id=job_id,
+        status=JobState.RUNNING,
+        filename=filename,
+        content_hash=content_hash,
+        upload_size=os.path.getsize(file_path) if os.path.exists(file_path) else None,
+        created_at=now,
+        updated_at=now
+    )
+    await asyncio.to_thread(store.put, record)
+
+    started = {}
+
+    def timed_stage(stage: str, state: StageState):
+        if state == StageState.RUNNING:
+            started[stage] = time.perf_counter()
+        elif state == StageState.COMPLETED:
+            record.stage_timings[stage] = round(time.perf_counter() - started.pop(stage, time.perf_counter()), 4)
+        if on_stage:
+            on_stage(stage, state)
+
+    usage = track_usage()
+    try:
+        response = await _analyze(job_id, file_path, file_ext, filename, content_hash, use_cache, timed_stage, on_event)
+    except BaseException as e:
+        record.status = JobState.FAILED
+        record.error = str(e) or type(e).__name__
+        record.token_usage = dict(usage)
+        record.updated_at = datetime.now()
+        # Synchronous: this may be unwinding a cancellation
+        store.put(record)
+        raise
+
+    record.token_usage = dict(usage)
+    await asyncio.to_thread(_record_result, store, record, response)
+    return response
+
+
+async def _analyze(
+    job_id: str,
+    file_path: str,
+    file_ext: str,
+    filename: str,
+    content_hash: Optional[str],
+    use_cache: bool,
+    on_stage: Optional[StageCallback],
+    on_event: Optional[EventCallback]
+) -> AnalyzeResponse:
+    def notify(stage: str, state: StageState):
+        if on_stage:
+            on_stage(stage, state)
+
+    loop = asyncio.get_running_loop()
+
+    def on_pages(done: int, total: int):
+        if on_event:
+            on_event("pages", {"done": done, "total": total})
+
+    def on_chunk(done: int, total: int, extractions: list):
+        if on_event:
+            on_event("chunk", {
+                "done": done,
+                "total": total,
+                "extractions": [_partial_extraction(e) for e in extractions],
+            })
+
+    # Serve identical uploads from the result cache
+    cache = get_result_cache() if content_hash else None
+    if cache is not None and use_cache:
+        cached = await asyncio.to_thread(cache.get, content_hash, settings.GEMINI_MODEL)
+        if cached is not None:
+            response = await asyncio.to_thread(restore_cached_result, cached, job_id)
+            for stage in STAGES:
+                notify(stage, StageState.COMPLETED)
+            return response
+
+    # Parse document, starting classification as soon as enough text is in
+    notify("parsed", StageState.RUNNING)
+    sample_ready = loop.create_future()
+    parse_task = asyncio.ensure_future(_parse_with_sample(file_path, file_ext, sample_ready, on_pages))
+
+    # The fused mode classifies together with extraction after parsing
+    fused = settings.FUSED_CLASSIFY_EXTRACT
+    classify_task = None
+    if not fused:
+        await asyncio.wait({sample_ready, parse_task}, return_when=asyncio.FIRST_COMPLETED)
+        if sample_ready.done():
+            notify("classified", StageState.RUNNING)
+            classify_task = asyncio.ensure_future(classify_document_async(
+                sample_ready.result(), use_cache=use_cache
+            ))
+
+    try:
+        text = await parse_task
+        if not text or len(text.strip()) < 50:
+            raise DocumentTooShortError("Document appears to be empty or too short")
+    except BaseException:
+        if classify_task is not None:
+            classify_task.cancel()
+        raise
+    notify("parsed", StageState.COMPLETED)
+
+    if fused:
+        # One Gemini call classifies and extracts the first chunk
+        notify("classified", StageState.RUNNING)
+        notify("extracted", StageState.RUNNING)
+        classification, extraction_result = await run_in_executor(
+            LLM, classify_and_extract, text, use_cache=use_cache
+        )
+        notify("classified", StageState.COMPLETED)
+        notify("extracted", StageState.COMPLETED)
+    else:
+        # Classify document type (short documents are classified once fully parsed)
+        if classify_task is None:
+            notify("classified", StageState.RUNNING)
+            classify_task = asyncio.ensure_future(classify_document_async(
+                text, use_cache=use_cache
+            ))
+        classification = await classify_task
+        notify("classified", StageState.COMPLETED)
+
+        # Extract insights
+        notify("extracted", StageState.RUNNING)
+        extraction_result = await extract_insights_async(
+            text, classification.document_type, use_cache=use_cache, on_chunk=on_chunk
+        )
+        notify("extracted", StageState.COMPLETED)
+
+    # Generate PDF report and JSONL data
+    # (the PDF itself is rendered on first download, or prewarmed)
+    notify("rendered", StageState.RUNNING)
+    # Grouped and ranked once; shared by the summary, reports and response
+    aggregate = ExtractionAggregate(extraction_result.extractions, classification.document_type)
+    await asyncio.to_thread(
+        _save_artifacts,
+        extraction_result,
+        aggregate,
+        classification,
+        job_dir(settings.REPORT_DIR, job_id),
+        filename,
+        text[:1000]  # First 1000 chars for context
+    )
+    notify("rendered", StageState.COMPLETED)
+    if settings.REPORT_PREWARM:
+        report_renderer.prewarm(job_id)
+
+    # Generate summary
+    summary = _generate_summary(aggregate)
+
+    response = AnalyzeResponse(
+        job_id=job_id,
+        document_type=classification.document_type,
+        confidence=classification.confidence,
+        classification_method=classification.method,
+        summary=summary,
+        extraction_count=len(extraction_result.extractions),
+        extractions=[
+            ExtractionItem(
+                extraction_class=e.extraction_class,
+                extraction_text=e.extraction_text,
+                attributes=e.attributes or {}
+            )
+            for e in extraction_result.extractions
+        ],
+        aggregates=aggregate.to_categories(),
+        pdf_url=f"/api/v1/report/{job_id}",
+        jsonl_url=f"/api/v1/data/{job_id}"
+    )
+
+    if cache is not None:
+        await asyncio.to_thread(store_result, content_hash, response)
+
+    return response
+
+
+def _record_result(store, record: JobRecord, response: AnalyzeResponse):
+    """Store a finished job's outcome and artifact paths"""
+    report_dir = job_dir(settings.REPORT_DIR, response.job_id)
+    report_path = os.path.join(report_dir, REPORT_FILE)
+    jsonl_path = os.path.join(report_dir, DATA_FILE)
+
+    record.status = JobState.COMPLETED
+    record.document_type = response.document_type
+    record.confidence = response.confidence
+    record.classification_method = response.classification_method
+    record.extraction_count = response.extraction_count
+    record.cached = response.cached
+    if os.path.exists(report_path):
+        record.report_path = report_path
+        record.report_size = os.path.getsize(report_path)
+    if os.path.exists(jsonl_path):
+        record.jsonl_path = jsonl_path
+        record.jsonl_size = os.path.getsize(jsonl_path)
+    record.updated_at = datetime.now()
+    store.put(record)
+
+
+async def _parse_with_sample(file_path: str, file_ext: str, sample_ready, on_pages=None) -> str:
+    """
+    Parse a document incrementally on the PARSE executor
+
+    Resolves sample_ready with the leading text once the classifier has
+    enough to work with, then keeps parsing and returns the full text.
+    Page ranges are awaited on the event loop, so no thread waits on them.
+    """
+    parts = []
+    length = 0
+    signalled = False
+
+    async for block in aiter_document_text(file_path, file_ext, get_executor(PARSE), on_pages):
+        parts.append(block)
+        length += len(block) + 2
+        if not signalled and length >= CLASSIFY_SAMPLE_CHARS:
+            _resolve(sample_ready, "\n\n".join(parts))
+            signalled = True
+
+    return "\n\n".join(parts)
+
+
+def _resolve(future, value):
+    if not future.done():
+        future.set_result(value)
+
+
+def _partial_extraction(extraction) -> dict:
+    """JSON form of a chunk extraction for progress events"""
+    interval = extraction.char_interval
+    return {
+        "extraction_class": extraction.extraction_class,
+        "extraction_text": extraction.extraction_text,
+        "start": interval.start_pos if interval is not None else None,
+        "end": interval.end_pos if interval is not None else None,
+        "attributes": dict(extraction.attributes or {}),
+    }
+
+
+def _save_artifacts(extraction_result, aggregate, classification, report_dir: str, filename: str, document_text: str):
+    """Save JSONL data and the report request for a later PDF render"""
+    os.makedirs(report_dir, exist_ok=True)
+    lx.io.save_annotated_documents(
+        [extraction_result],
+        output_name=DATA_FILE,
+        output_dir=report_dir,
+        show_progress=False
+    )
+    write_report_request(report_dir, report_request(filename, classification, document_text, aggregate))
+
+
+def _generate_summary(aggregate: ExtractionAggregate) -> str:
+    """Generate a brief summary from extractions"""
+    if not len(aggregate):
+        return "No significant insights extracted from the document."
+
+    summary_parts = [f"Analyzed as {aggregate.doc_type.upper()} document."]
+    summary_parts.append(f"Extracted {len(aggregate)} entities:")
+
+    for cls, count in aggregate.counts.items():
+        summary_parts.append(f"• {count} {cls}(s)")
+
+    return " ".join(summary_parts)
@@ -0,0 +1,198 @@
+"""HTML and Markdown Report Rendering"""
+import html
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from app.services.aggregation import mention_count
+from app.services.report_generator import _generate_executive_summary, _generate_key_insights, _overflow_note
+from app.services.report_renderer import ReportInputs
+
+
+def _outline(
+    inputs: ReportInputs,
+    job_id: str,
+    detail_limit: Optional[int],
+    overflow_rows: int
+) -> Iterator[Tuple]:
+    """
+    Report content as (kind, ...) blocks, in the same order as the PDF
+
+    Grouping, summary and insight text come from the PDF generator, so
+    every format says the same thing.
+    """
+    aggregate = inputs.aggregate
+    doc_type = aggregate.doc_type
+
+    yield ("title", "Langextract POC - Analysis Report")
+    yield ("table", ["Field", "Value"], [
+        ["Document", inputs.filename],
+        ["Type", doc_type.value.upper()],
+        ["Confidence", f"{inputs.classification.confidence:.1%}"],
+        ["Job ID", job_id],
+    ])
+
+    yield ("heading", "Executive Summary")
+    for para in _generate_executive_summary(aggregate, inputs.classification, inputs.document_text):
+        yield ("markup", para)
+
+    yield ("heading", "Extraction Summary")
+    yield ("table", ["Category", "Count"], [
+        [cls.replace('_', ' ').title(), str(count)] for cls, count in aggregate.counts.items()
+    ])
+
+    yield ("heading", "Key Insights")
+    yield ("bullets", _generate_key_insights(aggregate))
+
+    yield ("heading", "Detailed Entities & Findings")
+    for cls in aggregate.classes():
+        yield ("category", cls.replace('_', ' ').title())
+
+        detail_items, overflow_items = aggregate.split(cls, detail_limit)
+        for item in detail_items:
+            attrs = {
+                key.replace('_', ' '): str(value)
+                for key, value in (item.attributes or {}).items()
+                if key != 'mention_count' and value
+            }
+            yield ("entity", item.extraction_text, (item.attributes or {}).get('mention_count', 0), attrs)
+
+        if overflow_items:
+            shown = overflow_items[:overflow_rows]
+            yield ("table", ["Other entities", "Mentions"], [
+                [item.extraction_text, str(mention_count(item))] for item in shown
+            ])
+            yield ("overflow_note", _overflow_note(len(overflow_items), len(overflow_items) - len(shown), job_id))
+
+
+def _html_markup(text: str) -> str:
+    # Summary paragraphs only use <b>; everything else is escaped
+    return html.escape(text).replace("&lt;b&gt;", "<b>").replace("&lt;/b&gt;", "</b>")
+
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; max-width: 820px; margin: 2em auto; color: #2c3e50; line-height: 1.5; }}
+h1 {{ text-align: center; color: #1a1a1a; }}
+h3 {{ color: #16a085; }}
+table {{ border-collapse: collapse; margin: 1em 0; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 10px; text-align: left; }}
+th {{ background: #ecf0f1; }}
+.attr {{ margin-left: 2em; font-style: italic; }}
+</style>
+</head>
+<body>
+"""
+
+
+def render_html(
+    inputs: ReportInputs,
+    job_id: str,
+    detail_limit: Optional[int] = None,
+    overflow_rows: int = 200
+) -> Iterator[str]:
+    """
+    Render a report as a standalone HTML page, one block at a time
+
+    Args:
+        inputs: Parsed render request
+        job_id: Job identifier
+        detail_limit: Entities per category shown in full (None for all)
+        overflow_rows: Row cap for each category's overflow table
+
+    Yields:
+        HTML fragments
+    """
+    esc = html.escape
+    for block in _outline(inputs, job_id, detail_limit, overflow_rows):
+        kind = block[0]
+        if kind == "title":
+            yield HTML_HEAD.format(title=esc(block[1])) + f"<h1>{esc(block[1])}</h1>\n"
+        elif kind == "heading":
+            yield f"<h2>{esc(block[1])}</h2>\n"
+        elif kind == "category":
+            yield f"<h3>{esc(block[1])}</h3>\n"
+        elif kind == "markup":
+            yield f"<p>{_html_markup(block[1])}</p>\n"
+        elif kind == "bullets":
+            yield "<ul>\n" + "".join(f"<li>{esc(item)}</li>\n" for item in block[1]) + "</ul>\n"
+        elif kind == "table":
+            _, header, rows = block
+            parts = ["<table><tr>", *(f"<th>{esc(h)}</th>" for h in header), "</tr>\n"]
+            for row in rows:
+                parts.append("<tr>" + "".join(f"<td>{esc(cell)}</td>" for cell in row) + "</tr>\n")
+            parts.append("</table>\n")
+            yield "".join(parts)
+        elif kind == "entity":
+            _, text, mentions, attrs = block
+            line = f"<p><b>&bull;</b> {esc(text)}"
+            if mentions > 1:
+                line += f" <i>(mentioned {mentions} times)</i>"
+            line += "</p>\n"
+            for key, value in attrs.items():
+                line += f'<div class="attr">{esc(key)}: {esc(value)}</div>\n'
+            yield line
+        elif kind == "overflow_note":
+            yield f"<p><i>{esc(block[1])}</i></p>\n"
+    yield "</body>\n</html>\n"
+
+
+def _md_cell(text: str) -> str:
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def render_markdown(
+    inputs: ReportInputs,
+    job_id: str,
+    detail_limit: Optional[int] = None,
+    overflow_rows: int = 200
+) -> Iterator[str]:
+    """
+    Render a report as Markdown, one block at a time
+
+    Args:
+        inputs: Parsed render request
+        job_id: Job identifier
+        detail_limit: Entities per category shown in full (None for all)
+        overflow_rows: Row cap for each category's overflow table
+
+    Yields:
+        Markdown fragments
+    """
+    for block in _outline(inputs, job_id, detail_limit, overflow_rows):
+        kind = block[0]
+        if kind == "title":
+            yield f"# {block[1]}\n\n"
+        elif kind == "heading":
+            yield f"## {block[1]}\n\n"
+        elif kind == "category":
+            yield f"### {block[1]}\n\n"
+        elif kind == "markup":
+            yield block[1].replace("<b>", "**").replace("</b>", "**") + "\n\n"
+        elif kind == "bullets":
+            yield "".join(f"- {item}\n" for item in block[1]) + "\n"
+        elif kind == "table":
+            _, header, rows = block
+            lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+            lines.extend("| " + " | ".join(_md_cell(cell) for cell in row) + " |" for row in rows)
+            yield "\n" + "\n".join(lines) + "\n\n"
+        elif kind == "entity":
+            _, text, mentions, attrs = block
+            line = f"- {text}"
+            if mentions > 1:
+                line += f" _(mentioned {mentions} times)_"
+            line += "\n"
+            for key, value in attrs.items():
+                line += f"  - _{key}:_ {value}\n"
+            yield line
+        elif kind == "overflow_note":
+            yield f"\n_{block[1]}_\n\n"
+
+
+# format -> (renderer, media type)
+FORMATS: Dict[str, Tuple[Callable[..., Iterator[str]], str]] = {
+    "html": (render_html, "text/html; charset=utf-8"),
+    "md": (render_markdown, "text/markdown; charset=utf-8"),
+}
@@ -1,29 +1,156 @@
 """PDF Report Generation Service"""
 import os
+import time
 from datetime import datetime
-from collections import defaultdict
+from typing import Any, Dict, NamedTuple, Optional
+from types import MappingProxyType
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+from reportlab.pdfbase import pdfmetrics
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib import colors
 
 from app.core.config import settings
 from app.core.schemas import DocumentType, ClassificationResult
+from app.services.aggregation import ExtractionAggregate, mention_count
+from app.utils.file_handler import job_dir
 
 
+class RenderBudgetExceeded(Exception):
+    """Raised when a report takes longer than its time budget to render"""
+
+
+class ReportEntity(NamedTuple):
+    """Plain extraction used for rendering; duck-types langextract's Extraction"""
+    extraction_class: str
+    extraction_text: str
+    attributes: Optional[Dict[str, Any]] = None
+
+
+class _BudgetedDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that stops building once a deadline has passed"""
+
+    def __init__(self, filename, deadline: Optional[float] = None, **kwargs):
+        super().__init__(filename, **kwargs)
+        self._deadline = deadline
+
+    def afterFlowable(self, flowable):
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise RenderBudgetExceeded("Report exceeded its render time budget")
+
+
+def _build_styles() -> MappingProxyType:
+    """Paragraph styles used by every report, built once per process"""
+    base = getSampleStyleSheet()
+    return MappingProxyType({
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=base['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1a1a1a'),
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        "heading": ParagraphStyle(
+            'CustomHeading',
+            parent=base['Heading2'],
+            fontSize=16,
+            textColor=colors.HexColor('#2c3e50'),
+            spaceAfter=12,
+            spaceBefore=20
+        ),
+        "summary": ParagraphStyle(
+            'Summary',
+            parent=base['Normal'],
+            fontSize=11,
+            leading=16,
+            alignment=TA_JUSTIFY,
+            spaceAfter=12
+        ),
+        "category": ParagraphStyle(
+            'Category',
+            parent=base['Heading3'],
+            fontSize=13,
+            textColor=colors.HexColor('#16a085'),
+            spaceAfter=10,
+            spaceBefore=15
+        ),
+        "body": base['Normal'],
+    })
+
+
+# Read-only registry; flowables only read styles, so sharing is safe
+STYLES = _build_styles()
+
+METADATA_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+])
+
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')])
+])
+
+OVERFLOW_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#ecf0f1')),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.lightgrey)
+])
+
+# Longest entity text shown in an overflow table cell
+OVERFLOW_TEXT_CHARS = 90
+
+# Fonts used by the styles above
+REPORT_FONTS = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique')
+
+
+def _warm_font_metrics():
+    """Load font widths now so the first report in a render worker doesn't pay for it"""
+    for name in REPORT_FONTS:
+        pdfmetrics.stringWidth("Warm up 0123456789", name, 10)
+
+
+_warm_font_metrics()
+
 def generate_pdf_report(
     extractions: list,
     doc_type: DocumentType,
     job_id: str,
     filename: str,
     classification: ClassificationResult,
-    document_text: str = ""
+    document_text: str = "",
+    output_dir: Optional[str] = None,
+    time_budget: Optional[float] = None,
+    detail_limit: Optional[int] = None,
+    overflow_rows: int = 200,
+    aggregate: Optional[ExtractionAggregate] = None
 ) -> str:
     """
     Generate professional PDF report
     
+    The PDF is written under a temporary name and renamed into place, so
+    readers never see a partial file.
+    
     Args:
         extractions: List of extraction items
         doc_type: Document type
@@ -31,21 +158,39 @@ def generate_pdf_report(
         filename: Original filename
         classification: Classification result
         document_text: Sample of document text for context
+        output_dir: Directory for report.pdf; defaults to the job's
+            directory under REPORT_DIR
+        time_budget: Seconds allowed for the render, checked after each
+            flowable is laid out
+        detail_limit: Entities per category shown in full; the rest go
+            into a compact table. None shows every entity in full.
+        overflow_rows: Most rows in a category's overflow table; anything
+            beyond is only counted and left to the JSONL data
+        aggregate: The job's extraction aggregate, if already built
     
     Returns:
         Path to generated PDF
+    
+    Raises:
+        RenderBudgetExceeded: If time_budget runs out
     """
+    deadline = time.monotonic() + time_budget if time_budget else None
+    if aggregate is None:
+        aggregate = ExtractionAggregate(extractions, doc_type)
+    partial_path = None
     
     try:
         # Create job directory
-        job_dir = os.path.join(settings.REPORT_DIR, job_id)
-        os.makedirs(job_dir, exist_ok=True)
+        report_dir = output_dir or job_dir(settings.REPORT_DIR, job_id)
+        os.makedirs(report_dir, exist_ok=True)
         
-        report_path = os.path.join(job_dir, "report.pdf")
+        report_path = os.path.join(report_dir, "report.pdf")
+        partial_path = f"{report_path}.{os.getpid()}.tmp"
         
         # Create PDF
-        doc = SimpleDocTemplate(
-            report_path,
+        doc = _BudgetedDocTemplate(
+            partial_path,
+            deadline=deadline,
             pagesize=letter,
             rightMargin=0.75*inch,
             leftMargin=0.75*inch,
@@ -55,26 +200,8 @@ def generate_pdf_report(
         
         # Build content
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a1a1a'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=12,
-            spaceBefore=20
-        )
+        title_style = STYLES['title']
+        heading_style = STYLES['heading']
         
         # Title
         story.append(Paragraph("Langextract POC - Analysis Report", title_style))
@@ -90,32 +217,15 @@ def generate_pdf_report(
         ]
         
         metadata_table = Table(metadata, colWidths=[2*inch, 4*inch])
-        metadata_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-        ]))
+        metadata_table.setStyle(METADATA_TABLE_STYLE)
         
         story.append(metadata_table)
         story.append(Spacer(1, 0.4*inch))
         
         # Executive Summary
         story.append(Paragraph("Executive Summary", heading_style))
-        executive_summary = _generate_executive_summary(extractions, doc_type, classification, document_text)
-        
-        summary_style = ParagraphStyle(
-            'Summary',
-            parent=styles['Normal'],
-            fontSize=11,
-            leading=16,
-            alignment=TA_JUSTIFY,
-            spaceAfter=12
-        )
+        executive_summary = _generate_executive_summary(aggregate, classification, document_text)
+        summary_style = STYLES['summary']
         
         for para in executive_summary:
             story.append(Paragraph(para, summary_style))
@@ -125,39 +235,22 @@ def generate_pdf_report(
         # Extraction summary
         story.append(Paragraph("Extraction Summary", heading_style))
         
-        # Group by extraction class
-        grouped = {}
-        for e in extractions:
-            if e.extraction_class not in grouped:
-                grouped[e.extraction_class] = []
-            grouped[e.extraction_class].append(e)
-        
         summary_data = [['Category', 'Count']]
-        for cls, items in grouped.items():
-            summary_data.append([cls.replace('_', ' ').title(), str(len(items))])
+        for cls, count in aggregate.counts.items():
+            summary_data.append([cls.replace('_', ' ').title(), str(count)])
         
         summary_table = Table(summary_data, colWidths=[3*inch, 1.5*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')])
-        ]))
+        summary_table.setStyle(SUMMARY_TABLE_STYLE)
         
         story.append(summary_table)
         story.append(Spacer(1, 0.4*inch))
         
         # Key Insights Section
         story.append(Paragraph("Key Insights", heading_style))
-        key_insights = _generate_key_insights(grouped, doc_type)
+        key_insights = _generate_key_insights(aggregate)
         
         for insight in key_insights:
-            story.append(Paragraph(f"• {insight}", styles['Normal']))
+            story.append(Paragraph(f"• {insight}", STYLES['body']))
             story.append(Spacer(1, 0.08*inch))
         
         story.append(Spacer(1, 0.3*inch))
@@ -165,34 +258,16 @@ def generate_pdf_report(
         # Detailed Entities Section
         story.append(Paragraph("Detailed Entities & Findings", heading_style))
         
-        # Sort categories by importance
-        category_order = _get_category_order(doc_type)
-        sorted_categories = sorted(
-            grouped.items(),
-            key=lambda x: category_order.get(x[0], 999)
-        )
-        
-        for cls, items in sorted_categories:
+        # Categories by importance
+        for cls in aggregate.classes():
             # Category header
-            cat_style = ParagraphStyle(
-                'Category',
-                parent=styles['Heading3'],
-                fontSize=13,
-                textColor=colors.HexColor('#16a085'),
-                spaceAfter=10,
-                spaceBefore=15
-            )
-            story.append(Paragraph(cls.replace('_', ' ').title(), cat_style))
+            story.append(Paragraph(cls.replace('_', ' ').title(), STYLES['category']))
             
-            # Sort items by mention count (if available)
-            sorted_items = sorted(
-                items,
-                key=lambda x: (x.attributes or {}).get('mention_count', 1),
-                reverse=True
-            )
+            # Most mentioned items first; only the top ones in full
+            detail_items, overflow_items = aggregate.split(cls, detail_limit)
             
             # Items
-            for item in sorted_items:
+            for item in detail_items:
                 # Extraction text with mention count
                 # Safely get attributes (handle None case)
                 item_attrs = item.attributes if item.attributes else {}
@@ -203,7 +278,7 @@ def generate_pdf_report(
                 else:
                     text_display = f"<b>•</b> {item.extraction_text}"
                 
-                text_para = Paragraph(text_display, styles['Normal'])
+                text_para = Paragraph(text_display, STYLES['body'])
                 story.append(text_para)
                 
                 # Attributes (excluding mention_count as it's already shown)
@@ -213,24 +288,74 @@ def generate_pdf_report(
                             # Escape special characters for XML/HTML
                             safe_value = str(value).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
                             attr_text = f"&nbsp;&nbsp;&nbsp;&nbsp;<i>{key.replace('_', ' ')}:</i> {safe_value}"
-                            story.append(Paragraph(attr_text, styles['Normal']))
+                            story.append(Paragraph(attr_text, STYLES['body']))
                 
                 story.append(Spacer(1, 0.12*inch))
+            
+            if overflow_items:
+                story.extend(_overflow_flowables(overflow_items, overflow_rows, job_id))
         
         # Build PDF
         doc.build(story)
+        os.replace(partial_path, report_path)
         
         return report_path
         
+    except RenderBudgetExceeded:
+        _discard(partial_path)
+        raise
     except Exception as e:
+        _discard(partial_path)
         import traceback
         print(f"PDF generation error: {str(e)}")
         print(traceback.format_exc())
         raise Exception(f"Failed to generate PDF report: {str(e)}")
 
 
-def _generate_executive_summary(extractions: list, doc_type: DocumentType, classification: ClassificationResult, document_text: str) -> list:
+def _overflow_flowables(items: list, max_rows: int, job_id: str) -> list:
+    """Compact table for a category's remaining entities, most mentioned first"""
+    shown = items[:max_rows]
+    
+    rows = [['Other entities', 'Mentions']]
+    for item in shown:
+        text = item.extraction_text
+        if len(text) > OVERFLOW_TEXT_CHARS:
+            text = text[:OVERFLOW_TEXT_CHARS - 1] + "…"
+        rows.append([text, str(mention_count(item))])
+    
+    table = Table(rows, colWidths=[5.5*inch, 1*inch], repeatRows=1)
+    table.setStyle(OVERFLOW_TABLE_STYLE)
+    flowables = [table]
+    
+    flowables.append(Paragraph(
+        f"<i>{_overflow_note(len(items), len(items) - len(shown), job_id)}</i>",
+        STYLES['body']
+    ))
+    flowables.append(Spacer(1, 0.12*inch))
+    return flowables
+
+
+def _overflow_note(total: int, hidden: int, job_id: str) -> str:
+    """
+    Plain-text note under an overflow table
+
+    Points at the job's data export in words rather than a link, since a
+    relative API path does not resolve from a downloaded report.
+    """
+    note = f"{total} more in this category"
+    if hidden:
+        note = f"{total - hidden} of {note} listed above; {hidden} omitted"
+    return f"{note}. The full list is in the JSONL data export of job {job_id}."
+
+
+def _discard(path: Optional[str]):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def _generate_executive_summary(aggregate: ExtractionAggregate, classification: ClassificationResult, document_text: str) -> list:
     """Generate executive summary paragraphs"""
+    doc_type = aggregate.doc_type
     paragraphs = []
     
     # Classification summary
@@ -239,62 +364,57 @@ def _generate_executive_summary(extractions: list, doc_type: DocumentType, class
         f"with {classification.confidence:.0%} confidence. {classification.reasoning}"
     )
     
-    # Group extractions
-    grouped = defaultdict(list)
-    for e in extractions:
-        grouped[e.extraction_class].append(e)
-    
     # Document-type specific summaries
     if doc_type == DocumentType.STORY:
-        char_count = len(grouped.get('character', []))
-        theme_count = len(grouped.get('theme', []))
+        char_count = aggregate.count('character')
+        theme_count = aggregate.count('theme')
         paragraphs.append(
             f"The narrative features {char_count} main character(s) and explores {theme_count} central theme(s). "
             f"The story presents a compelling narrative with well-defined characters and meaningful themes."
         )
     
     elif doc_type == DocumentType.MEETING:
-        speaker_count = len(grouped.get('speaker', []))
-        action_count = len(grouped.get('action_item', []))
-        decision_count = len(grouped.get('decision', []))
+        speaker_count = aggregate.count('speaker')
+        action_count = aggregate.count('action_item')
+        decision_count = aggregate.count('decision')
         paragraphs.append(
             f"The meeting involved {speaker_count} participant(s) and resulted in {decision_count} key decision(s) "
             f"with {action_count} action item(s) identified for follow-up."
         )
     
     elif doc_type == DocumentType.RESEARCH:
-        finding_count = len(grouped.get('finding', []))
+        finding_count = aggregate.count('finding')
         paragraphs.append(
             f"This research paper presents {finding_count} significant finding(s). "
             f"The study employs rigorous methodology and contributes valuable insights to the field."
         )
     
     elif doc_type == DocumentType.TECHNICAL:
-        component_count = len(grouped.get('component', []))
-        function_count = len(grouped.get('function', []))
+        component_count = aggregate.count('component')
+        function_count = aggregate.count('function')
         paragraphs.append(
             f"The technical documentation covers {component_count} component(s) and {function_count} function(s), "
             f"providing comprehensive guidance for implementation and usage."
         )
     
     elif doc_type == DocumentType.LEGAL:
-        party_count = len(grouped.get('party', []))
-        obligation_count = len(grouped.get('obligation', []))
+        party_count = aggregate.count('party')
+        obligation_count = aggregate.count('obligation')
         paragraphs.append(
             f"This legal document involves {party_count} party/parties with {obligation_count} defined obligation(s). "
             f"The document establishes clear terms and responsibilities for all parties involved."
         )
     
     else:  # GENERAL
-        total_entities = len(extractions)
+        total_entities = len(aggregate)
         paragraphs.append(
             f"The document contains {total_entities} key entities and insights. "
             f"Analysis reveals important information across multiple categories."
         )
     
     # Overall summary
-    total_extractions = len(extractions)
-    unique_classes = len(grouped)
+    total_extractions = len(aggregate)
+    unique_classes = len(aggregate.counts)
     paragraphs.append(
         f"In total, {total_extractions} unique entities were identified across {unique_classes} categories, "
         f"providing a comprehensive understanding of the document's content and context."
@@ -303,87 +423,21 @@ def _generate_executive_summary(extractions: list, doc_type: DocumentType, class
     return paragraphs
 
 
-def _generate_key_insights(grouped: dict, doc_type: DocumentType) -> list:
+def _generate_key_insights(aggregate: ExtractionAggregate) -> list:
     """Generate bullet-point key insights"""
     insights = []
     
-    for cls, items in grouped.items():
-        if not items:
-            continue
-        
-        # Get most mentioned items
-        top_items = sorted(
-            items,
-            key=lambda x: (x.attributes or {}).get('mention_count', 1),
-            reverse=True
-        )[:3]  # Top 3
+    for cls, count in aggregate.counts.items():
+        # Most mentioned items
+        names = [item.extraction_text for item in aggregate.top(cls, 3)]
         
-        if len(items) == 1:
-            insights.append(
-                f"{cls.replace('_', ' ').title()}: {items[0].extraction_text}"
-            )
-        elif len(items) <= 3:
-            names = [item.extraction_text for item in items]
+        if count <= 3:
             insights.append(
                 f"{cls.replace('_', ' ').title()}: {', '.join(names)}"
             )
         else:
-            names = [item.extraction_text for item in top_items]
             insights.append(
-                f"{cls.replace('_', ' ').title()} ({len(items)} total): {', '.join(names)}, and others"
+                f"{cls.replace('_', ' ').title()} ({count} total): {', '.join(names)}, and others"
             )
     
     return insights
-
-
-def _get_category_order(doc_type: DocumentType) -> dict:
-    """Define category display order by document type"""
-    orders = {
-        DocumentType.STORY: {
-            'character': 1,
-            'plot_point': 2,
-            'theme': 3,
-            'setting': 4,
-            'moral': 5
-        },
-        DocumentType.MEETING: {
-            'speaker': 1,
-            'decision': 2,
-            'action_item': 3,
-            'agenda_item': 4,
-            'discussion_point': 5
-        },
-        DocumentType.RESEARCH: {
-            'author': 1,
-            'research_question': 2,
-            'finding': 3,
-            'methodology': 4,
-            'conclusion': 5,
-            'citation': 6
-        },
-        DocumentType.TECHNICAL: {
-            'component': 1,
-            'function': 2,
-            'parameter': 3,
-            'configuration': 4,
-            'dependency': 5,
-            'example': 6
-        },
-        DocumentType.LEGAL: {
-            'party': 1,
-            'obligation': 2,
-            'clause': 3,
-            'deadline': 4,
-            'term': 5,
-            'penalty': 6
-        },
-        DocumentType.GENERAL: {
-            'entity': 1,
-            'key_point': 2,
-            'topic': 3,
-            'statement': 4,
-            'date': 5
-        }
-    }
-    
-    return orders.get(doc_type, {})
@@ -0,0 +1,251 @@
+"""On-Demand PDF Report Rendering"""
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.schemas import CategoryAggregate, ClassificationResult
+from app.services.aggregation import ExtractionAggregate
+from app.services.job_store import get_job_store
+from app.services.report_generator import generate_pdf_report, RenderBudgetExceeded, ReportEntity
+from app.utils.executors import run_in_executor, RENDER
+from app.utils.file_handler import job_dir
+
+REPORT_FILE = "report.pdf"
+DATA_FILE = "data.jsonl"
+# Compact render payload: report inputs plus [class, text, attributes] rows
+REQUEST_FILE = "report.json"
+
+
+def report_request(
+    filename: str,
+    classification: ClassificationResult,
+    document_text: str,
+    aggregate: ExtractionAggregate
+) -> bytes:
+    """Serialized inputs for a later render, stored next to the JSONL data"""
+    return json.dumps({
+        "filename": filename,
+        "classification": classification.model_dump(mode="json"),
+        "document_text": document_text,
+        "extractions": [
+            [e.extraction_class, e.extraction_text, dict(e.attributes or {})]
+            for e in aggregate.extractions
+        ],
+        "aggregates": [c.model_dump() for c in aggregate.to_categories()],
+    }, default=str).encode("utf-8")
+
+
+class ReportInputs(NamedTuple):
+    """A parsed render request"""
+    filename: str
+    classification: ClassificationResult
+    document_text: str
+    aggregate: ExtractionAggregate
+
+
+def load_report_request(payload: bytes) -> ReportInputs:
+    """Parse the contents of report.json"""
+    request = json.loads(payload)
+    classification = ClassificationResult.model_validate(request["classification"])
+    aggregate = ExtractionAggregate.from_categories(
+        [ReportEntity(*row) for row in request["extractions"]],
+        classification.document_type,
+        [CategoryAggregate.model_validate(c) for c in request["aggregates"]]
+    )
+    return ReportInputs(
+        filename=request["filename"],
+        classification=classification,
+        document_text=request["document_text"],
+        aggregate=aggregate,
+    )
+
+
+def write_report_request(report_dir: str, request: bytes):
+    os.makedirs(report_dir, exist_ok=True)
+    partial_path = os.path.join(report_dir, f"{REQUEST_FILE}.tmp")
+    with open(partial_path, "wb") as f:
+        f.write(request)
+    os.replace(partial_path, os.path.join(report_dir, REQUEST_FILE))
+
+
+def render_report(
+    payload: bytes,
+    report_dir: str,
+    job_id: str,
+    time_budget: Optional[float] = None,
+    detail_limit: Optional[int] = None,
+    overflow_rows: int = 200
+) -> Tuple[str, float]:
+    """
+    Render report.pdf from a compact render payload
+
+    Runs on the render executor; only the payload bytes cross the process
+    boundary, never langextract objects.
+
+    Args:
+        payload: Contents of report.json
+        report_dir: The job's report directory
+        job_id: Job identifier
+        time_budget: Seconds allowed for the render
+        detail_limit: Entities per category shown in full (None for all)
+        overflow_rows: Row cap for each category's overflow table
+
+    Returns:
+        (path to the rendered PDF, seconds spent rendering)
+    """
+    start = time.perf_counter()
+    inputs = load_report_request(payload)
+
+    report_path = generate_pdf_report(
+        extractions=inputs.aggregate.extractions,
+        doc_type=inputs.classification.document_type,
+        job_id=job_id,
+        filename=inputs.filename,
+        classification=inputs.classification,
+        document_text=inputs.document_text,
+        output_dir=report_dir,
+        time_budget=time_budget,
+        detail_limit=detail_limit,
+        overflow_rows=overflow_rows,
+        aggregate=inputs.aggregate
+    )
+    return report_path, time.perf_counter() - start
+
+
+class RenderMetrics:
+    """Render queue depth and timings, kept in the API process"""
+
+    def __init__(self, window: int = 1000):
+        self.queued = 0
+        self.rendered = 0
+        self.failed = 0
+        self.over_budget = 0
+        self._render_seconds: Deque[float] = deque(maxlen=window)
+        self._wait_seconds: Deque[float] = deque(maxlen=window)
+
+    def record(self, render_seconds: float, total_seconds: float):
+        self.rendered += 1
+        self._render_seconds.append(render_seconds)
+        self._wait_seconds.append(max(total_seconds - render_seconds, 0.0))
+
+    def snapshot(self) -> dict:
+        return {
+            "queue_depth": self.queued,
+            "workers": settings.RENDER_PROCESS_WORKERS,
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "over_budget": self.over_budget,
+            "time_budget_seconds": settings.REPORT_RENDER_BUDGET_SECONDS,
+            "render_seconds": _summary(self._render_seconds),
+            "queue_wait_seconds": _summary(self._wait_seconds),
+        }
+
+
+def _summary(samples) -> dict:
+    if not samples:
+        return {"p50": None, "p95": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "p50": round(statistics.median(ordered), 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class ReportRenderer:
+    """
+    Renders PDF reports on first request and keeps them on disk
+
+    Concurrent requests for the same report share one render
+    (single-flight); later requests are served from the file.
+    """
+
+    def __init__(self):
+        self.metrics = RenderMetrics()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._prewarming: Set[asyncio.Task] = set()
+
+    async def get(self, job_id: str) -> Optional[str]:
+        """
+        Path to a job's PDF report, rendering it if needed
+
+        Returns:
+            Report path, or None if the job has no report data
+        """
+        report_dir = job_dir(settings.REPORT_DIR, job_id)
+        report_path = os.path.join(report_dir, REPORT_FILE)
+
+        if await asyncio.to_thread(os.path.exists, report_path):
+            return report_path
+        if not await asyncio.to_thread(os.path.exists, os.path.join(report_dir, REQUEST_FILE)):
+            return None
+
+        future = self._inflight.get(job_id)
+        if future is None:
+            future = asyncio.ensure_future(self._render(job_id, report_dir))
+            self._inflight[job_id] = future
+            future.add_done_callback(lambda done: self._forget(job_id, done))
+
+        # A disconnecting client must not cancel the render for the others
+        return await asyncio.shield(future)
+
+    def prewarm(self, job_id: str):
+        """Render a report in the background ahead of the first request"""
+        task = asyncio.ensure_future(self.get(job_id))
+        self._prewarming.add(task)
+        task.add_done_callback(self._prewarmed)
+
+    async def _render(self, job_id: str, report_dir: str) -> str:
+        with open(os.path.join(report_dir, REQUEST_FILE), "rb") as f:
+            payload = f.read()
+
+        budget = settings.REPORT_RENDER_BUDGET_SECONDS or None
+        # Settings are read here: spawned render workers don't share them
+        detail_limit = settings.REPORT_DETAIL_LIMIT or None
+        start = time.perf_counter()
+        self.metrics.queued += 1
+        try:
+            report_path, render_seconds = await run_in_executor(
+                RENDER, render_report, payload, report_dir, job_id,
+                budget, detail_limit, settings.REPORT_OVERFLOW_ROWS
+            )
+        except RenderBudgetExceeded:
+            self.metrics.over_budget += 1
+            raise
+        except Exception:
+            self.metrics.failed += 1
+            raise
+        finally:
+            self.metrics.queued -= 1
+        self.metrics.record(render_seconds, time.perf_counter() - start)
+
+        store = get_job_store()
+        if store is not None:
+            await asyncio.to_thread(_record_report, store, job_id, report_path)
+        return report_path
+
+    def _forget(self, job_id: str, future: asyncio.Future):
+        if self._inflight.get(job_id) is future:
+            del self._inflight[job_id]
+
+    def _prewarmed(self, task: asyncio.Task):
+        self._prewarming.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Report prewarm failed: {task.exception()}")
+
+
+def _record_report(store, job_id: str, report_path: str):
+    record = store.get(job_id)
+    if record is None:
+        return
+    record.report_path = report_path
+    record.report_size = os.path.getsize(report_path)
+    store.put(record)
+
+
+report_renderer = ReportRenderer()
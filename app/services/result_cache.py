@@ -0,0 +1,161 @@
+"""Content-Addressed Analysis Result Cache"""
+import hashlib
+import json
+import os
+from typing import Dict, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.schemas import AnalyzeResponse, ExtractionTemplate
+from app.services.report_renderer import write_report_request, DATA_FILE, REQUEST_FILE
+from app.templates.extraction_templates import get_template
+from app.utils.cache_backend import CacheBackend, SQLiteCacheBackend
+from app.utils.file_handler import job_dir
+
+# Available cache backends by name
+BACKENDS = {
+    "sqlite": SQLiteCacheBackend,
+}
+
+
+# Bumped when the stored artifact layout changes; older entries are misses
+CACHE_FORMAT = 5
+
+
+class CachedResult(NamedTuple):
+    """A cached analysis with its artifacts"""
+    response: AnalyzeResponse
+    report_request: bytes
+    jsonl: bytes
+
+
+def template_version(template: ExtractionTemplate) -> str:
+    """Stable hash of everything in a template that affects extraction output"""
+    payload = json.dumps(
+        {
+            "prompt_description": template.prompt_description,
+            "examples": repr(template.examples),
+            "extraction_classes": template.extraction_classes,
+            "report_sections": template.report_sections,
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Cache of complete analyses keyed by document content
+
+    Entries are addressed by SHA-256 of the uploaded bytes and the Gemini
+    model. The version of the template that produced an entry is stored
+    with it; the template is only known after classification, so a
+    version mismatch on lookup is treated as a miss and the entry dropped.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    @staticmethod
+    def cache_key(content_hash: str, model: str) -> str:
+        return hashlib.sha256(f"{content_hash}:{model}".encode("utf-8")).hexdigest()
+
+    def get(self, content_hash: str, model: str) -> Optional[CachedResult]:
+        """Look up a cached analysis for document content"""
+        key = self.cache_key(content_hash, model)
+        blob = self.backend.get(key)
+        if blob is None:
+            return None
+
+        header_line, _, body = blob.partition(b"\n")
+        header = json.loads(header_line)
+        if header.get("format") != CACHE_FORMAT:
+            self.backend.delete(key)
+            return None
+        response = AnalyzeResponse.model_validate(header["response"])
+
+        if header["template_version"] != template_version(get_template(response.document_type)):
+            self.backend.delete(key)
+            return None
+
+        request_size = header["report_request_size"]
+        return CachedResult(
+            response=response,
+            report_request=body[:request_size],
+            jsonl=body[request_size:request_size + header["jsonl_size"]]
+        )
+
+    def put(self, content_hash: str, model: str, response: AnalyzeResponse, report_request: bytes, jsonl: bytes):
+        """Store an analysis and the inputs to render its report"""
+        header = {
+            "format": CACHE_FORMAT,
+            "template_version": template_version(get_template(response.document_type)),
+            "response": response.model_dump(mode="json"),
+            "report_request_size": len(report_request),
+            "jsonl_size": len(jsonl),
+        }
+        blob = json.dumps(header).encode("utf-8") + b"\n" + report_request + jsonl
+        self.backend.set(self.cache_key(content_hash, model), blob)
+
+    def stats(self) -> Dict[str, int]:
+        return self.backend.stats()
+
+
+def restore_cached_result(cached: CachedResult, job_id: str) -> AnalyzeResponse:
+    """
+    Materialize cached artifacts for a new job
+    
+    The PDF is rendered from them on first download.
+
+    Args:
+        cached: Cached analysis
+        job_id: Job the artifacts are served under
+
+    Returns:
+        The cached response rebound to job_id
+    """
+    report_dir = job_dir(settings.REPORT_DIR, job_id)
+    os.makedirs(report_dir, exist_ok=True)
+
+    with open(os.path.join(report_dir, DATA_FILE), "wb") as f:
+        f.write(cached.jsonl)
+    write_report_request(report_dir, cached.report_request)
+
+    return cached.response.model_copy(update={
+        "job_id": job_id,
+        "pdf_url": f"/api/v1/report/{job_id}",
+        "jsonl_url": f"/api/v1/data/{job_id}",
+        "cached": True,
+    })
+
+
+def store_result(content_hash: str, response: AnalyzeResponse):
+    """Read a finished job's artifacts from disk and cache them"""
+    report_dir = job_dir(settings.REPORT_DIR, response.job_id)
+
+    with open(os.path.join(report_dir, REQUEST_FILE), "rb") as f:
+        request = f.read()
+    with open(os.path.join(report_dir, DATA_FILE), "rb") as f:
+        jsonl = f.read()
+
+    get_result_cache().put(content_hash, settings.GEMINI_MODEL, response, request, jsonl)
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the process-wide result cache, or None if disabled"""
+    global _result_cache
+
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+
+    if _result_cache is None:
+        backend_cls = BACKENDS[settings.RESULT_CACHE_BACKEND]
+        backend = backend_cls(
+            path=settings.RESULT_CACHE_PATH,
+            max_bytes=settings.RESULT_CACHE_MAX_MB * 1024 * 1024
+        )
+        _result_cache = ResultCache(backend)
+
+    return _result_cache
@@ -226,3 +226,46 @@ TEMPLATES = {
 def get_template(doc_type: DocumentType) -> ExtractionTemplate:
     """Get extraction template for document type"""
     return TEMPLATES.get(doc_type, GENERAL_TEMPLATE)
+
+
+def _build_fused_template() -> ExtractionTemplate:
+    """
+    Union template that classifies and extracts in a single call
+    
+    Each per-type example is reused with an extra leading `document_type`
+    extraction, so the model learns to label the excerpt's type first.
+    """
+    examples = []
+    extraction_classes = ["document_type"]
+    
+    for doc_type, template in TEMPLATES.items():
+        for example in template.examples:
+            opening_words = " ".join(example.text.split()[:6])
+            examples.append(lx.data.ExampleData(
+                text=example.text,
+                extractions=[
+                    lx.data.Extraction(
+                        extraction_class="document_type",
+                        extraction_text=opening_words,
+                        attributes={"type": doc_type.value, "confidence": "0.9"}
+                    ),
+                    *example.extractions
+                ]
+            ))
+        for cls in template.extraction_classes:
+            if cls not in extraction_classes:
+                extraction_classes.append(cls)
+    
+    return ExtractionTemplate(
+        prompt_description=f"""First, classify the excerpt: extract exactly one `document_type` using the opening words as text,
+    with attribute `type` set to one of: {", ".join(t.value for t in DocumentType)}, and attribute `confidence` between 0.0 and 1.0.
+    Then extract key elements appropriate to that type, in order of appearance.
+    Use exact text for extractions. Provide meaningful attributes for context.""",
+        examples=examples,
+        extraction_classes=extraction_classes,
+        report_sections=[]
+    )
+
+
+# Combined classify-and-extract template
+FUSED_TEMPLATE = _build_fused_template()
@@ -0,0 +1,203 @@
+"""Content-Addressed Artifact Storage"""
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.core.config import settings
+
+
+def shard_path(root: str, key: str) -> str:
+    """
+    Two-level sharded location of a key: root/ab/cd/abcdef...
+
+    Keeps any one directory to at most 256 subdirectories however many
+    keys exist. Keys must be hex digests or UUIDs.
+    """
+    key = key.lower()
+    return os.path.join(root, key[:2], key[2:4], key)
+
+
+class ArtifactStore(ABC):
+    """
+    Interface for content-addressed blob storage
+
+    Blobs are keyed by the SHA-256 of their bytes, so storing the same
+    content twice keeps one copy.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put_file(self, path: str, key: str):
+        """
+        Ingest a local file under key
+
+        The file stays at path afterwards (as a reference to the stored
+        blob where the backend supports it) for the job to work on.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch(self, key: str, dest: str):
+        """Write the blob for key to a local path"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def release(self, key: str):
+        """Called when a job referencing key is deleted"""
+        raise NotImplementedError
+
+
+class LocalArtifactStore(ArtifactStore):
+    """
+    Blobs in a sharded directory tree, shared with jobs through hard links
+
+    Each job's copy of an upload is a hard link to the blob, so duplicate
+    uploads cost one directory entry instead of another copy. A blob is
+    removed once no job links to it any more.
+
+    Args:
+        root: Directory holding the blob tree
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(shard_path(self.root, key))
+
+    def put_file(self, path: str, key: str):
+        blob = shard_path(self.root, key)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+
+        try:
+            os.link(path, blob)
+            return
+        except FileExistsError:
+            pass
+        except OSError:
+            # Different filesystem: keep a copy, the job keeps its own file
+            if not os.path.exists(blob):
+                _copy_into_place(path, blob)
+            return
+
+        # Duplicate content: point the job's file at the existing blob
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(blob, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def fetch(self, key: str, dest: str):
+        blob = shard_path(self.root, key)
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        try:
+            os.link(blob, dest)
+        except OSError:
+            shutil.copyfile(blob, dest)
+
+    def release(self, key: str):
+        blob = shard_path(self.root, key)
+        try:
+            if os.stat(blob).st_nlink <= 1:
+                os.remove(blob)
+        except FileNotFoundError:
+            pass
+
+
+class S3ArtifactStore(ArtifactStore):
+    """
+    Blobs in an S3-compatible bucket under sharded keys
+
+    Jobs keep their local working copy; the bucket holds one object per
+    distinct upload. Objects are not deleted when jobs expire, since
+    other jobs (possibly on other hosts) may reference them; use a bucket
+    lifecycle rule for retention.
+
+    Args:
+        bucket: Bucket name
+        prefix: Key prefix inside the bucket
+        client: boto3-style S3 client (head_object, upload_file,
+            download_file); built from S3_ENDPOINT_URL if omitted
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", client=None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("ARTIFACT_STORE_BACKEND=s3 requires boto3 (pip install boto3)")
+            self._client = boto3.client("s3", endpoint_url=settings.S3_ENDPOINT_URL or None)
+        return self._client
+
+    def object_key(self, key: str) -> str:
+        return shard_path(self.prefix, key).replace(os.sep, "/").lstrip("/")
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except Exception as e:
+            if _error_code(e) in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put_file(self, path: str, key: str):
+        if not self.exists(key):
+            self.client.upload_file(path, self.bucket, self.object_key(key))
+
+    def fetch(self, key: str, dest: str):
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        self.client.download_file(self.bucket, self.object_key(key), dest)
+
+    def release(self, key: str):
+        pass
+
+
+def _copy_into_place(src: str, dest: str):
+    tmp = f"{dest}.{uuid.uuid4().hex}.tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    response = getattr(error, "response", None) or {}
+    return str(response.get("Error", {}).get("Code", "")) or None
+
+
+_artifact_store: Optional[ArtifactStore] = None
+
+
+def artifact_dir() -> str:
+    """ARTIFACT_DIR, or artifacts/ next to UPLOAD_DIR"""
+    if settings.ARTIFACT_DIR:
+        return settings.ARTIFACT_DIR
+    return os.path.join(os.path.dirname(os.path.normpath(settings.UPLOAD_DIR)), "artifacts")
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Get the process-wide artifact store selected by ARTIFACT_STORE_BACKEND"""
+    global _artifact_store
+
+    if settings.ARTIFACT_STORE_BACKEND == "s3":
+        if not isinstance(_artifact_store, S3ArtifactStore):
+            _artifact_store = S3ArtifactStore(bucket=settings.S3_BUCKET, prefix=settings.S3_PREFIX)
+    else:
+        # Local blobs must share a filesystem with UPLOAD_DIR for hard links
+        root = artifact_dir()
+        if not isinstance(_artifact_store, LocalArtifactStore) or _artifact_store.root != root:
+            _artifact_store = LocalArtifactStore(root)
+
+    return _artifact_store
@@ -0,0 +1,157 @@
+"""Key-Value Cache Backends"""
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class CacheBackend(ABC):
+    """
+    Interface for byte-oriented cache backends
+
+    Implementations store opaque bytes under string keys, evict entries
+    to stay within a size budget, and count hits and misses.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: bytes):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite-backed cache with size-based LRU eviction and optional TTL
+
+    Args:
+        path: SQLite database file
+        max_bytes: Total value size budget; least recently used entries
+            are evicted once it is exceeded
+        ttl_seconds: Optional entry lifetime; expired entries count as misses
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: Optional[int] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, size, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._total_bytes -= row[0]
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), size, now, now)
+            )
+            self._total_bytes += size
+            self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._total_bytes -= row[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        """Drop least recently used entries until within max_bytes (lock held)"""
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM cache ORDER BY accessed_at ASC LIMIT 32"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.evictions += 1
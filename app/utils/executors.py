@@ -0,0 +1,71 @@
+"""Stage Executors for blocking pipeline work"""
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.core.config import settings
+
+# Executor kinds per stage
+PARSE = "parse"
+LLM = "llm"
+RENDER = "render"
+
+_executors: Dict[str, Executor] = {}
+
+
+def _create_executor(name: str) -> Executor:
+    """Build the executor for a stage from settings"""
+    if name == LLM:
+        return ThreadPoolExecutor(
+            max_workers=settings.LLM_THREAD_WORKERS,
+            thread_name_prefix="llm"
+        )
+
+    workers = {
+        PARSE: settings.PARSE_PROCESS_WORKERS,
+        RENDER: settings.RENDER_PROCESS_WORKERS,
+    }[name]
+
+    # A size of 0 keeps the stage in-process on a small thread pool
+    if workers <= 0:
+        return ThreadPoolExecutor(max_workers=2, thread_name_prefix=name)
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def get_executor(name: str) -> Executor:
+    """Get (or lazily create) the executor for a stage"""
+    if name not in _executors:
+        _executors[name] = _create_executor(name)
+    return _executors[name]
+
+
+async def run_in_executor(name: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking function on a stage executor without blocking the event loop
+
+    Args:
+        name: Executor kind (PARSE, LLM or RENDER)
+        func: Function to call; must be picklable for process pools
+        *args, **kwargs: Arguments passed to func
+
+    Returns:
+        Result of func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(name),
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_executors(wait: bool = True):
+    """Shut down all stage executors"""
+    for executor in _executors.values():
+        executor.shutdown(wait=wait, cancel_futures=True)
+    _executors.clear()
@@ -0,0 +1,122 @@
+"""Persistent Job Expiry Index"""
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from app.core.config import settings
+
+
+class ExpiryIndex:
+    """
+    SQLite table of job IDs ordered by expiry time
+
+    Lookups of expired jobs walk the expires_at index from the oldest
+    entry, so a sweep costs O(expired) rather than a scan of every job
+    directory on disk.
+
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS expiry (
+                job_id TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_expiry_expires ON expiry(expires_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def add(self, job_id: str, expires_at: float):
+        """Register (or re-register) a job's expiry time"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO expiry (job_id, expires_at) VALUES (?, ?)",
+                (job_id, expires_at)
+            )
+
+    def add_missing(self, entries: List[tuple]):
+        """Register (job_id, expires_at) pairs that are not indexed yet"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO expiry (job_id, expires_at) VALUES (?, ?)", entries
+            )
+            self._conn.execute("COMMIT")
+
+    def expired(self, now: Optional[float] = None, limit: int = 500) -> List[str]:
+        """Oldest job IDs whose expiry time has passed"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM expiry WHERE expires_at <= ? ORDER BY expires_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove(self, job_ids: List[str]):
+        """Drop jobs from the index"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM expiry WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+            self._conn.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM expiry").fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[ExpiryIndex] = None
+_index_lock = threading.Lock()
+
+
+def index_path() -> str:
+    """CLEANUP_INDEX_PATH, or expiry.sqlite3 next to UPLOAD_DIR"""
+    if settings.CLEANUP_INDEX_PATH:
+        return settings.CLEANUP_INDEX_PATH
+    parent = os.path.dirname(os.path.normpath(settings.UPLOAD_DIR))
+    return os.path.join(parent, "expiry.sqlite3")
+
+
+def get_expiry_index() -> ExpiryIndex:
+    """Process-wide index, reopened if the configured path changes"""
+    global _index
+    path = index_path()
+    with _index_lock:
+        if _index is None or _index.path != path:
+            if _index is not None:
+                _index.close()
+            _index = ExpiryIndex(path)
+        return _index
+
+
+def schedule_expiry(job_id: str, created_at: Optional[float] = None):
+    """Expire a job's uploads and reports CLEANUP_HOURS after created_at"""
+    created_at = time.time() if created_at is None else created_at
+    get_expiry_index().add(job_id, created_at + settings.CLEANUP_HOURS * 3600)
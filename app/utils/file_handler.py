@@ -1,60 +1,247 @@
 """File Handling Utilities"""
+import asyncio
+import hashlib
 import os
 import shutil
-from datetime import datetime, timedelta
+import uuid
+import zipfile
+import aiofiles
+from typing import List, NamedTuple, Optional
 from fastapi import UploadFile
 
 from app.core.config import settings
+from app.utils.artifact_store import get_artifact_store, shard_path
+from app.utils.expiry_index import schedule_expiry
 
 
-async def save_upload_file(file: UploadFile, job_id: str) -> str:
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_FILE_SIZE_MB"""
+
+
+class BatchTooLargeError(Exception):
+    """Raised when a batch has more than MAX_BATCH_FILES documents or an archive expands too far"""
+
+
+class SavedUpload(NamedTuple):
+    """An upload written to disk"""
+    path: str
+    sha256: str
+    size: int
+
+
+class ArchiveMember(NamedTuple):
+    """A ZIP member saved as its own job upload, or the reason it was skipped"""
+    filename: str
+    job_id: Optional[str]
+    upload: Optional[SavedUpload]
+    error: Optional[str]
+
+
+def job_dir(root: str, job_id: str) -> str:
+    """A job's directory under UPLOAD_DIR or REPORT_DIR, sharded by ID prefix"""
+    return shard_path(root, job_id)
+
+
+async def save_upload_file(
+    file: UploadFile,
+    job_id: str,
+    max_size_mb: Optional[int] = None,
+    content_addressed: bool = True
+) -> SavedUpload:
     """
-    Save uploaded file to disk
+    Stream uploaded file to disk in fixed-size chunks
+    
+    The file is hashed and its size checked as bytes are copied, so memory
+    use stays at one chunk regardless of file size. Starlette has already
+    spooled the form by now; UploadSizeLimitMiddleware caps the request
+    body before that, and this enforces the per-file limit within it. The
+    saved file is named after its
+    SHA-256 and handed to the artifact store, so identical uploads share
+    storage.
     
     Args:
         file: Uploaded file
         job_id: Unique job identifier
+        max_size_mb: Size limit; defaults to MAX_FILE_SIZE_MB
+        content_addressed: If False, keep the file out of the artifact
+            store (for transient uploads such as archives)
     
     Returns:
-        Path to saved file
+        SavedUpload with path, SHA-256 and size
+    
+    Raises:
+        FileTooLargeError: If the upload exceeds the size limit
     """
+    max_size_mb = max_size_mb or settings.MAX_FILE_SIZE_MB
+    max_size = max_size_mb * 1024 * 1024
+    
+    # Skip the copy when the spooled size is already over the limit
+    if file.size is not None and file.size > max_size:
+        raise FileTooLargeError(f"File too large. Max size: {max_size_mb}MB")
+    
     # Create upload directory for this job
-    upload_dir = os.path.join(settings.UPLOAD_DIR, job_id)
-    os.makedirs(upload_dir, exist_ok=True)
+    upload_dir = await asyncio.to_thread(_create_upload_dir, job_id)
     
     # Save file
     file_ext = os.path.splitext(file.filename)[1]
-    file_path = os.path.join(upload_dir, f"document{file_ext}")
+    file_path = os.path.join(upload_dir, f"upload{file_ext}.part")
     
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    digest = hashlib.sha256()
+    size = 0
     
-    return file_path
+    async with aiofiles.open(file_path, "wb") as f:
+        while True:
+            chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            
+            size += len(chunk)
+            if size > max_size:
+                break
+            
+            digest.update(chunk)
+            await f.write(chunk)
+    
+    if size > max_size:
+        await asyncio.to_thread(shutil.rmtree, upload_dir, ignore_errors=True)
+        raise FileTooLargeError(f"File too large. Max size: {max_size_mb}MB")
+    
+    sha256 = digest.hexdigest()
+    file_path = await asyncio.to_thread(_finish_upload, file_path, sha256, file_ext, content_addressed)
+    return SavedUpload(path=file_path, sha256=sha256, size=size)
 
 
-async def cleanup_old_files():
-    """Remove files older than CLEANUP_HOURS"""
-    try:
-        cutoff_time = datetime.now() - timedelta(hours=settings.CLEANUP_HOURS)
+def save_archive_members(zip_path: str, max_documents: int) -> List[ArchiveMember]:
+    """
+    Save each supported member of a ZIP archive as a separate job upload
+    
+    Members are decompressed one chunk at a time straight into their job
+    directory, so the archive is never extracted into memory. Both the
+    per-member limit and the MAX_ARCHIVE_EXPANDED_MB limit on the whole
+    archive are enforced on decompressed bytes, not the headers' claims.
+    Blocking; run it off the event loop.
+    
+    Args:
+        zip_path: Path to the saved archive
+        max_documents: Maximum number of supported members
+    
+    Returns:
+        One ArchiveMember per file in the archive (directories and
+        metadata entries are skipped)
+    
+    Raises:
+        zipfile.BadZipFile: If the archive cannot be read
+        BatchTooLargeError: If it holds more than max_documents documents,
+            or its members decompress to more than MAX_ARCHIVE_EXPANDED_MB;
+            nothing is left on disk
+    """
+    max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    max_expanded = settings.MAX_ARCHIVE_EXPANDED_MB * 1024 * 1024
+    expanded = 0
+    members = []
+    
+    with zipfile.ZipFile(zip_path) as archive:
+        infos = [info for info in archive.infolist() if not _is_archive_noise(info)]
         
-        # Cleanup uploads
-        if os.path.exists(settings.UPLOAD_DIR):
-            for job_dir in os.listdir(settings.UPLOAD_DIR):
-                job_path = os.path.join(settings.UPLOAD_DIR, job_dir)
-                if os.path.isdir(job_path):
-                    dir_time = datetime.fromtimestamp(os.path.getctime(job_path))
-                    if dir_time < cutoff_time:
-                        shutil.rmtree(job_path)
+        documents = [info for info in infos if _archive_ext(info) in settings.ALLOWED_EXTENSIONS]
+        if len(documents) > max_documents:
+            raise BatchTooLargeError(f"Too many documents. Max per batch: {max_documents}")
         
-        # Cleanup reports
-        if os.path.exists(settings.REPORT_DIR):
-            for job_dir in os.listdir(settings.REPORT_DIR):
-                job_path = os.path.join(settings.REPORT_DIR, job_dir)
-                if os.path.isdir(job_path):
-                    dir_time = datetime.fromtimestamp(os.path.getctime(job_path))
-                    if dir_time < cutoff_time:
-                        shutil.rmtree(job_path)
-                        
-    except Exception as e:
-        print(f"Cleanup error: {e}")
+        for info in infos:
+            file_ext = _archive_ext(info)
+            if file_ext not in settings.ALLOWED_EXTENSIONS:
+                members.append(ArchiveMember(info.filename, None, None, "Unsupported file type"))
+                continue
+            if info.file_size > max_size:
+                members.append(ArchiveMember(info.filename, None, None, f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB"))
+                continue
+            
+            job_id = str(uuid.uuid4())
+            upload_dir = _create_upload_dir(job_id)
+            file_path = os.path.join(upload_dir, f"upload{file_ext}.part")
+            
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with archive.open(info) as src, open(file_path, "wb") as dst:
+                    while True:
+                        chunk = src.read(settings.UPLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        size += len(chunk)
+                        expanded += len(chunk)
+                        if expanded > max_expanded:
+                            raise BatchTooLargeError(
+                                f"Archive too large when extracted. Max size: {settings.MAX_ARCHIVE_EXPANDED_MB}MB"
+                            )
+                        if size > max_size:
+                            raise FileTooLargeError(f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB")
+                        digest.update(chunk)
+                        dst.write(chunk)
+            except (FileTooLargeError, zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+                # RuntimeError: encrypted member; NotImplementedError: unsupported compression
+                shutil.rmtree(upload_dir, ignore_errors=True)
+                members.append(ArchiveMember(info.filename, None, None, str(e)))
+                continue
+            except BatchTooLargeError:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+                for member in members:
+                    if member.job_id:
+                        remove_job_files(member.job_id)
+                raise
+            
+            sha256 = digest.hexdigest()
+            file_path = _finish_upload(file_path, sha256, file_ext)
+            upload = SavedUpload(path=file_path, sha256=sha256, size=size)
+            members.append(ArchiveMember(info.filename, job_id, upload, None))
+    
+    return members
+
+
+def _create_upload_dir(job_id: str) -> str:
+    """Create a job's upload directory and schedule its expiry (blocking)"""
+    upload_dir = job_dir(settings.UPLOAD_DIR, job_id)
+    os.makedirs(upload_dir, exist_ok=True)
+    schedule_expiry(job_id)
+    return upload_dir
+
+
+def _finish_upload(part_path: str, sha256: str, file_ext: str, content_addressed: bool = True) -> str:
+    """Name a fully written upload after its hash and store it; returns the final path"""
+    file_path = os.path.join(os.path.dirname(part_path), f"{sha256}{file_ext}")
+    os.replace(part_path, file_path)
+    if content_addressed:
+        get_artifact_store().put_file(file_path, sha256)
+    return file_path
+
+
+def remove_job_files(job_id: str):
+    """
+    Delete a job's upload and report directories
+    
+    Releases the job's references to stored uploads, and also removes
+    directories left in the flat pre-sharding layout.
+    """
+    upload_dir = job_dir(settings.UPLOAD_DIR, job_id)
+    hashes = []
+    if os.path.isdir(upload_dir):
+        hashes = [os.path.splitext(name)[0] for name in os.listdir(upload_dir) if not name.endswith(".part")]
+    
+    for root in (settings.UPLOAD_DIR, settings.REPORT_DIR):
+        shutil.rmtree(job_dir(root, job_id), ignore_errors=True)
+        shutil.rmtree(os.path.join(root, job_id), ignore_errors=True)
+    
+    store = get_artifact_store()
+    for sha256 in hashes:
+        store.release(sha256)
+
+
+def _archive_ext(info: zipfile.ZipInfo) -> str:
+    return os.path.splitext(info.filename)[1].lower()
+
+
+def _is_archive_noise(info: zipfile.ZipInfo) -> bool:
+    """Directories and OS metadata entries (__MACOSX/, dotfiles)"""
+    name = os.path.basename(info.filename.rstrip("/"))
+    return info.is_dir() or info.filename.startswith("__MACOSX/") or name.startswith(".")
+
@@ -0,0 +1,85 @@
+"""
+Benchmark: threaded vs native asyncio extraction for many concurrent documents
+
+Gemini is replaced with stubs that wait a fixed round-trip latency
+(time.sleep in a stand-in langextract model for the threaded path,
+asyncio.sleep for the async path), the LLM cache is disabled, and N
+documents are extracted concurrently on one event loop. Both paths run
+real langextract prompting and alignment. Reports wall time and the peak
+number of threads.
+
+Usage:
+    python -m benchmarks.bench_async_extract [--documents 300] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from langextract.core import base_model, types as lx_types
+
+from app.core.config import settings
+from app.core.schemas import DocumentType
+from app.services import extractor
+from app.utils.executors import run_in_executor, shutdown_executors, LLM
+
+TEXT = "\n\n".join(["Elias walked through the theater and listened to Clara play the cello. " * 10] * 4)
+
+RESPONSE = '```json\n{"extractions": [{"character": "Elias"}]}\n```'
+
+
+class _SleepingModel(base_model.BaseLanguageModel):
+    """Blocking stand-in for the Gemini provider"""
+
+    def infer(self, batch_prompts, **kwargs):
+        time.sleep(ARGS.latency)
+        for _ in batch_prompts:
+            yield [lx_types.ScoredOutput(score=1.0, output=RESPONSE)]
+
+
+async def _stub_generate(model, prompt):
+    await asyncio.sleep(ARGS.latency)
+    return RESPONSE
+
+
+async def _sample_threads(stop: asyncio.Event, peak: list):
+    while not stop.is_set():
+        peak[0] = max(peak[0], threading.active_count())
+        await asyncio.sleep(0.01)
+
+
+async def _run(name, extract_one):
+    stop, peak = asyncio.Event(), [threading.active_count()]
+    sampler = asyncio.create_task(_sample_threads(stop, peak))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(extract_one() for _ in range(ARGS.documents)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await sampler
+    print(f"{name:8s} documents={ARGS.documents} wall={elapsed:6.2f}s peak_threads={peak[0]}")
+
+
+async def main():
+    settings.LLM_CACHE_ENABLED = False
+    extractor.client_registry.generate_async = _stub_generate
+
+    print(f"latency={ARGS.latency}s chunks/doc={len(extractor._split(TEXT))} "
+          f"llm_threads={settings.LLM_THREAD_WORKERS}")
+
+    sleeping_model = _SleepingModel()
+    extractor.client_registry.extraction_model = lambda template: sleeping_model
+    await _run("threaded", lambda: run_in_executor(LLM, extractor.extract_insights, TEXT, DocumentType.STORY))
+    shutdown_executors()
+
+    extractor.client_registry.extraction_model = lambda template: None
+    await _run("async", lambda: extractor.extract_insights_async(TEXT, DocumentType.STORY))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.5)
+    ARGS = parser.parse_args()
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark: per-call Gemini clients vs the shared client registry
+
+A local HTTP server stands in for the Gemini endpoint and counts TCP
+connections. Each round runs the same number of lx.extract calls, first
+letting langextract build a new model and client per call (the old
+behaviour), then reusing the registry model over the pooled transport.
+
+Usage:
+    python -m benchmarks.bench_client_reuse [--calls 200] [--latency 0.005]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Settings are read at import time
+os.environ.setdefault("GEMINI_API_KEY", "bench-key")
+os.environ.setdefault("GEMINI_MODEL", "gemini-2.5-flash")
+
+import langextract as lx  # noqa: E402
+from google.genai import types as genai_types  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.schemas import DocumentType  # noqa: E402
+from app.services.llm_clients import ClientRegistry  # noqa: E402
+from app.templates.extraction_templates import get_template  # noqa: E402
+
+TEXT = "Elias walked through the theater and listened to Clara play the cello."
+
+RESPONSE = json.dumps({
+    "candidates": [{
+        "content": {
+            "role": "model",
+            "parts": [{"text": json.dumps({"extractions": [{"character": "Elias"}]})}]
+        },
+        "finishReason": "STOP"
+    }]
+}).encode("utf-8")
+
+_connections = {"count": 0}
+_lock = threading.Lock()
+
+
+class _StubGemini(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with _lock:
+            _connections["count"] += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(ARGS.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def _per_call(template, base_url):
+    lx.extract(
+        text_or_documents=TEXT,
+        prompt_description=template.prompt_description,
+        examples=template.examples,
+        model_id=settings.GEMINI_MODEL,
+        api_key=settings.GEMINI_API_KEY,
+        language_model_params={"http_options": genai_types.HttpOptions(base_url=base_url)},
+        show_progress=False,
+    )
+
+
+def _registry(registry, template):
+    lx.extract(
+        text_or_documents=TEXT,
+        prompt_description=template.prompt_description,
+        examples=template.examples,
+        model=registry.extraction_model(template),
+        use_schema_constraints=False,
+        show_progress=False,
+    )
+
+
+def _run(name, call):
+    _connections["count"] = 0
+    start = time.perf_counter()
+    for _ in range(ARGS.calls):
+        call()
+    elapsed = time.perf_counter() - start
+    print(f"{name:10s} {ARGS.calls} calls in {elapsed:6.2f}s  "
+          f"{elapsed / ARGS.calls * 1000:6.2f} ms/call  {_connections['count']} connections")
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    settings.GEMINI_BASE_URL = base_url
+    registry = ClientRegistry()
+    registry.start()
+    template = get_template(DocumentType.STORY)
+
+    # Warm up imports and provider resolution for both paths
+    _per_call(template, base_url)
+    _registry(registry, template)
+
+    _run("per-call", lambda: _per_call(template, base_url))
+    _run("registry", lambda: _registry(registry, template))
+
+    registry.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005)
+    ARGS = parser.parse_args()
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: serial classify-then-extract vs fused classify-and-extract
+
+Gemini is replaced with stubs that sleep for a fixed round-trip latency,
+the local classifier and LLM cache are disabled, and documents of
+increasing length are run through both paths.
+
+Usage:
+    python -m benchmarks.bench_fused_mode [--latency 0.5]
+"""
+import argparse
+import threading
+import time
+
+import langextract as lx
+
+from app.core.config import settings
+from app.services import classifier, extractor
+from app.templates.extraction_templates import FUSED_TEMPLATE
+
+PARAGRAPH = "Elias walked through the theater and listened to Clara play the cello. " * 8
+
+_calls = {"count": 0}
+_lock = threading.Lock()
+
+
+def _count():
+    with _lock:
+        _calls["count"] += 1
+
+
+def _stub_extract(text_or_documents, prompt_description=None, **kwargs):
+    _count()
+    time.sleep(ARGS.latency)
+    extractions = [lx.data.Extraction(
+        extraction_class="character",
+        extraction_text="Elias",
+        char_interval=lx.data.CharInterval(start_pos=0, end_pos=5)
+    )]
+    if prompt_description == FUSED_TEMPLATE.prompt_description:
+        extractions.insert(0, lx.data.Extraction(
+            extraction_class="document_type",
+            extraction_text=text_or_documents[:20],
+            attributes={"type": "story", "confidence": "0.9"}
+        ))
+    return lx.data.AnnotatedDocument(text=text_or_documents, extractions=extractions)
+
+
+class _StubResponse:
+    text = "CATEGORY: STORY\nCONFIDENCE: 0.9\nREASONING: stub"
+
+
+class _StubModel:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def generate_content(self, prompt):
+        _count()
+        time.sleep(ARGS.latency)
+        return _StubResponse()
+
+
+def _serial(text):
+    classification = classifier.classify_document(text)
+    return extractor.extract_insights(text, classification.document_type)
+
+
+def _fused(text):
+    return extractor.classify_and_extract(text)[1]
+
+
+def main():
+    extractor.lx.extract = _stub_extract
+    extractor.client_registry.extraction_model = lambda template: None
+    classifier.client_registry.classification_model = lambda: _StubModel()
+    settings.LLM_CACHE_ENABLED = False
+    settings.LOCAL_CLASSIFIER_ENABLED = False
+
+    print(f"latency={ARGS.latency}s chunk_size={settings.EXTRACTION_CHUNK_SIZE} "
+          f"concurrency={settings.EXTRACTION_MAX_CONCURRENCY}")
+    for paragraphs in (4, 20, 60):
+        text = "\n\n".join([PARAGRAPH] * paragraphs)
+        row = []
+        for name, run in (("serial", _serial), ("fused", _fused)):
+            _calls["count"] = 0
+            start = time.perf_counter()
+            run(text)
+            row.append(f"{name}={time.perf_counter() - start:5.2f}s/{_calls['count']:2d} calls")
+        print(f"chars={len(text):6d} chunks={len(extractor._split(text)):3d}  " + "  ".join(row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.5)
+    ARGS = parser.parse_args()
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: /health latency while analyses are running
+
+Fires N concurrent /api/v1/analyze requests (Gemini extraction calls stubbed
+with a fixed sleep) and samples /health throughout. Everything else, including
+langextract's prompt building and parsing, runs for real. With the stage
+executors the event loop stays free, so /health p99 should match the idle
+baseline. Pass --inline to run every stage on the event loop for comparison.
+
+Usage:
+    python -m benchmarks.bench_health_latency [--analyses 50] [--llm-latency 1.0] [--inline]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="bench_health_")
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp, "uploads")
+os.environ["REPORT_DIR"] = os.path.join(_tmp, "reports")
+os.environ["RESULT_CACHE_ENABLED"] = "false"
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+os.environ.setdefault("GEMINI_MODEL", "gemini-2.5-flash")
+# Classification is answered by the local model; only extraction calls are stubbed
+os.environ["LOCAL_CLASSIFIER_THRESHOLD"] = "0"
+
+import httpx
+
+from app.main import app
+from app.services import extractor, pipeline
+from app.services.llm_clients import client_registry
+
+SAMPLE_DOC = os.path.join(os.path.dirname(__file__), "..", "sample_docs", "Langextract_test_story.txt")
+
+STUB_RESPONSE = json.dumps({"extractions": [
+    {"character": f"Character {i}", "character_attributes": {"role": "stub"}}
+    for i in range(50)
+]})
+
+
+async def _stub_generate(model, prompt):
+    await asyncio.sleep(ARGS.llm_latency)
+    return STUB_RESPONSE
+
+
+async def _inline(name, func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _sample_health(client, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def main():
+    client_registry.generate_async = _stub_generate
+    if ARGS.inline:
+        pipeline.run_in_executor = _inline
+        extractor.run_in_executor = _inline
+
+    with open(SAMPLE_DOC, "rb") as f:
+        content = f.read()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        # Idle baseline
+        idle, stop = [], asyncio.Event()
+        sampler = asyncio.create_task(_sample_health(client, stop, idle))
+        await asyncio.sleep(1.0)
+        stop.set()
+        await sampler
+
+        # Under load
+        loaded, stop = [], asyncio.Event()
+        sampler = asyncio.create_task(_sample_health(client, stop, loaded))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/api/v1/analyze", files={"file": ("story.txt", content, "text/plain")})
+            for _ in range(ARGS.analyses)
+        ])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+
+    ok = sum(1 for r in responses if r.status_code == 200)
+    if ok < len(responses):
+        print(next(r.text for r in responses if r.status_code != 200)[:300])
+    mode = "inline" if ARGS.inline else "executors"
+    print(f"mode={mode} analyses={ARGS.analyses} ok={ok} wall={elapsed:.2f}s")
+    for label, samples in (("idle", idle), ("loaded", loaded)):
+        print(
+            f"/health {label:6s} n={len(samples):4d} "
+            f"p50={statistics.median(samples):7.2f}ms p99={_percentile(samples, 99):7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--analyses", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--inline", action="store_true")
+    ARGS = parser.parse_args()
+    asyncio.run(main())
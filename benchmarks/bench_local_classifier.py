@@ -0,0 +1,108 @@
+"""
+Benchmark: local classifier accuracy and latency
+
+Scores the on-disk local model against sample_docs/ (labels taken from the
+file names) and the held-out calibration corpus, and runs leave-one-out
+cross-validation over the seed corpus.
+Reports which documents would clear LOCAL_CLASSIFIER_THRESHOLD and skip
+the Gemini call.
+
+Usage:
+    python -m benchmarks.bench_local_classifier
+"""
+import os
+import statistics
+import time
+
+from app.core.config import settings
+from app.services.classifier import CLASSIFY_SAMPLE_CHARS
+from app.services.local_classifier import (
+    DEFAULT_CALIBRATION_PATH, DEFAULT_CORPUS_PATH, LocalClassifier, load_corpus
+)
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), "..", "sample_docs")
+SAMPLE_LABELS = {
+    "research_paper": "research",
+    "story": "story",
+    "transcript": "meeting",
+}
+
+
+def _label_for(filename: str) -> str:
+    for key, label in SAMPLE_LABELS.items():
+        if key in filename:
+            return label
+    return "general"
+
+
+def bench_sample_docs(model: LocalClassifier):
+    print(f"sample_docs (threshold={settings.LOCAL_CLASSIFIER_THRESHOLD})")
+    correct = 0
+    local_hits = 0
+    latencies = []
+    files = sorted(f for f in os.listdir(SAMPLE_DIR) if f.endswith(".txt"))
+
+    for filename in files:
+        with open(os.path.join(SAMPLE_DIR, filename), encoding="utf-8") as f:
+            sample = f.read()[:CLASSIFY_SAMPLE_CHARS]
+
+        start = time.perf_counter()
+        for _ in range(100):
+            predicted, confidence = model.predict(sample)
+        latencies.append((time.perf_counter() - start) / 100 * 1000)
+
+        expected = _label_for(filename)
+        correct += predicted.value == expected
+        path = "local" if confidence >= settings.LOCAL_CLASSIFIER_THRESHOLD else "llm"
+        local_hits += path == "local"
+        print(f"  {filename:45s} expected={expected:9s} predicted={predicted.value:9s} "
+              f"p={confidence:.2f} path={path} {latencies[-1]:.2f}ms")
+
+    print(f"  accuracy={correct}/{len(files)} answered_locally={local_hits}/{len(files)} "
+          f"mean_latency={statistics.mean(latencies):.2f}ms")
+
+
+def bench_held_out(model: LocalClassifier):
+    corpus = load_corpus(DEFAULT_CALIBRATION_PATH)
+    correct = 0
+    confident = 0
+    confident_correct = 0
+
+    for text, label in corpus:
+        predicted, confidence = model.predict(text[:CLASSIFY_SAMPLE_CHARS])
+        correct += predicted.value == label
+        if confidence >= settings.LOCAL_CLASSIFIER_THRESHOLD:
+            confident += 1
+            confident_correct += predicted.value == label
+
+    print(f"held-out calibration corpus (temperature={model.temperature:.1f})")
+    print(f"  accuracy={correct / len(corpus):.1%} ({correct}/{len(corpus)})")
+    if confident:
+        print(f"  above threshold: {confident}/{len(corpus)} with accuracy {confident_correct / confident:.1%}")
+
+
+def bench_cross_validation():
+    corpus = load_corpus(DEFAULT_CORPUS_PATH)
+    correct = 0
+    confident_correct = 0
+    confident = 0
+
+    for i, (text, label) in enumerate(corpus):
+        model = LocalClassifier.train(corpus[:i] + corpus[i + 1:])
+        predicted, confidence = model.predict(text)
+        correct += predicted.value == label
+        if confidence >= settings.LOCAL_CLASSIFIER_THRESHOLD:
+            confident += 1
+            confident_correct += predicted.value == label
+
+    print("seed corpus leave-one-out")
+    print(f"  accuracy={correct / len(corpus):.1%} ({correct}/{len(corpus)})")
+    if confident:
+        print(f"  above threshold: {confident}/{len(corpus)} with accuracy {confident_correct / confident:.1%}")
+
+
+if __name__ == "__main__":
+    model = LocalClassifier.load(settings.LOCAL_CLASSIFIER_MODEL_PATH)
+    bench_sample_docs(model)
+    bench_held_out(model)
+    bench_cross_validation()
@@ -0,0 +1,68 @@
+"""
+Benchmark: serial vs parallel per-page PDF text extraction
+
+Generates synthetic 10/100/500-page PDFs and times parse_document serially
+and on process pools of increasing size.
+
+Usage:
+    python -m benchmarks.bench_pdf_parse [--pages 10 100 500] [--workers 1 2 4]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from app.core.config import settings
+from app.services.document_parser import parse_document
+
+LINE = "The quarterly review covered revenue, hiring plans, and the product roadmap in detail."
+
+
+def _make_pdf(path: str, pages: int):
+    pdf = canvas.Canvas(path, pagesize=letter)
+    for page in range(pages):
+        y = 750
+        for line in range(45):
+            pdf.drawString(40, y, f"Page {page + 1} line {line + 1}: {LINE}")
+            y -= 16
+        pdf.showPage()
+    pdf.save()
+
+
+def main(args):
+    tmp = tempfile.mkdtemp(prefix="bench_pdf_")
+    settings.PDF_PARALLEL_PAGE_THRESHOLD = 1
+
+    print(f"cpu_count={os.cpu_count()}")
+    for pages in args.pages:
+        path = os.path.join(tmp, f"synthetic_{pages}.pdf")
+        _make_pdf(path, pages)
+
+        start = time.perf_counter()
+        baseline_text = parse_document(path, ".pdf")
+        serial = time.perf_counter() - start
+        print(f"pages={pages:4d} serial      {serial:7.2f}s")
+
+        for workers in args.workers:
+            settings.PARSE_PROCESS_WORKERS = workers
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # Warm up worker processes so spawn cost is excluded
+                list(pool.map(abs, range(workers)))
+                start = time.perf_counter()
+                text = parse_document(path, ".pdf", executor=pool)
+                elapsed = time.perf_counter() - start
+
+            assert text == baseline_text
+            print(f"pages={pages:4d} workers={workers:2d} {elapsed:7.2f}s speedup={serial / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    main(parser.parse_args())
@@ -0,0 +1,73 @@
+"""
+Benchmark: PDF vs HTML vs Markdown report rendering
+
+Renders the same report with E entities in each format and reports time
+per report and output size. PDF uses reportlab; HTML and Markdown use
+the template renderers in app.services.report_formats.
+
+Usage:
+    python -m benchmarks.bench_report_formats [--entities 500] [--reports 5] [--detail-limit 25]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.core.schemas import ClassificationResult, DocumentType
+from app.services.aggregation import ExtractionAggregate
+from app.services.report_formats import render_html, render_markdown
+from app.services.report_generator import generate_pdf_report, ReportEntity
+from app.services.report_renderer import ReportInputs
+
+CATEGORIES = ["author", "research_question", "finding", "methodology", "conclusion", "citation"]
+
+
+def _inputs():
+    extractions = [
+        ReportEntity(
+            CATEGORIES[i % len(CATEGORIES)],
+            f"Entity number {i} with a short description",
+            {"mention_count": i % 9 + 1, "context": "appears in section 3"}
+        )
+        for i in range(ARGS.entities)
+    ]
+    classification = ClassificationResult(document_type=DocumentType.RESEARCH, confidence=0.93, reasoning="bench")
+    return ReportInputs("paper.pdf", classification, "", ExtractionAggregate(extractions, DocumentType.RESEARCH))
+
+
+def _pdf(inputs, output_dir):
+    path = generate_pdf_report(
+        inputs.aggregate.extractions, DocumentType.RESEARCH, "job", inputs.filename, inputs.classification,
+        output_dir=output_dir, detail_limit=ARGS.detail_limit, aggregate=inputs.aggregate
+    )
+    return os.path.getsize(path)
+
+
+def _text(render):
+    def run(inputs, output_dir):
+        return sum(len(chunk.encode("utf-8")) for chunk in render(inputs, "job", ARGS.detail_limit))
+    return run
+
+
+def _measure(name, run, inputs, output_dir):
+    start = time.perf_counter()
+    for _ in range(ARGS.reports):
+        size = run(inputs, output_dir)
+    elapsed = (time.perf_counter() - start) / ARGS.reports
+    print(f"{name:5s} entities={ARGS.entities} {elapsed * 1000:8.2f}ms/report {size / 1024:8.1f}KB")
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entities", type=int, default=500)
+    parser.add_argument("--reports", type=int, default=5)
+    parser.add_argument("--detail-limit", type=int, default=None)
+    ARGS = parser.parse_args()
+
+    inputs = _inputs()
+    output_dir = tempfile.mkdtemp(prefix="bench_formats_")
+    pdf = _measure("pdf", _pdf, inputs, output_dir)
+    for name, render in (("html", render_html), ("md", render_markdown)):
+        elapsed = _measure(name, _text(render), inputs, output_dir)
+        print(f"      {pdf / elapsed:.0f}x cheaper than pdf")
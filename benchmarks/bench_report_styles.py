@@ -0,0 +1,112 @@
+"""
+Benchmark: per-report style construction vs the shared style registry
+
+For N reports, compares the style setup the report generator used to do
+on every report (a fresh sample stylesheet, three ParagraphStyles, one
+Category style per category, two TableStyles) with lookups in the
+prebuilt registry. Allocations are counted with tracemalloc. A few full
+renders with E entities put the numbers in context; --detail-limit renders
+them in the bounded mode (top-K per category, remainder in tables).
+
+Usage:
+    python -m benchmarks.bench_report_styles [--reports 1000] [--entities 500] [--full 5] [--detail-limit 25]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import langextract as lx
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+from app.core.schemas import ClassificationResult, DocumentType
+from app.services import report_generator
+from app.services.report_generator import STYLES, METADATA_TABLE_STYLE, SUMMARY_TABLE_STYLE
+
+CATEGORIES = ["author", "research_question", "finding", "methodology", "conclusion", "citation"]
+
+
+def _legacy_styles(categories):
+    """Style objects the generator used to build for each report"""
+    styles = getSampleStyleSheet()
+    built = [
+        ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24,
+                       textColor=colors.HexColor('#1a1a1a'), spaceAfter=30, alignment=TA_CENTER),
+        ParagraphStyle('CustomHeading', parent=styles['Heading2'], fontSize=16,
+                       textColor=colors.HexColor('#2c3e50'), spaceAfter=12, spaceBefore=20),
+        ParagraphStyle('Summary', parent=styles['Normal'], fontSize=11, leading=16,
+                       alignment=TA_JUSTIFY, spaceAfter=12),
+        TableStyle([('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
+                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)]),
+        TableStyle([('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#ecf0f1')])]),
+    ]
+    for _ in categories:
+        built.append(ParagraphStyle('Category', parent=styles['Heading3'], fontSize=13,
+                                    textColor=colors.HexColor('#16a085'), spaceAfter=10, spaceBefore=15))
+    return built
+
+
+def _registry_styles(categories):
+    built = [STYLES['title'], STYLES['heading'], STYLES['summary'], METADATA_TABLE_STYLE, SUMMARY_TABLE_STYLE]
+    for _ in categories:
+        built.append(STYLES['category'])
+    return built
+
+
+def _measure(name, setup):
+    # Keep every report's styles alive so traced memory is what was allocated
+    kept = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(ARGS.reports):
+        kept.append(setup(CATEGORIES))
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:10s} reports={ARGS.reports} setup={elapsed * 1000:8.1f}ms "
+          f"({elapsed * 1e6 / ARGS.reports:7.1f}us/report) "
+          f"allocated={allocated / 1024:8.1f}KB ({allocated / ARGS.reports:7.0f}B/report)")
+
+
+def _full_renders():
+    extractions = [
+        lx.data.Extraction(
+            extraction_class=CATEGORIES[i % len(CATEGORIES)],
+            extraction_text=f"Entity number {i} with a short description",
+            attributes={"mention_count": i % 9 + 1, "context": "appears in section 3"}
+        )
+        for i in range(ARGS.entities)
+    ]
+    classification = ClassificationResult(document_type=DocumentType.RESEARCH, confidence=0.93, reasoning="bench")
+    output_dir = tempfile.mkdtemp(prefix="bench_report_")
+
+    start = time.perf_counter()
+    for i in range(ARGS.full):
+        report_generator.generate_pdf_report(
+            extractions, DocumentType.RESEARCH, f"job-{i}", "paper.pdf", classification,
+            document_text="", output_dir=output_dir, detail_limit=ARGS.detail_limit
+        )
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(os.path.join(output_dir, "report.pdf"))
+    print(f"full render entities={ARGS.entities} detail_limit={ARGS.detail_limit} "
+          f"{elapsed * 1000 / ARGS.full:8.1f}ms/report over {ARGS.full} reports, {size / 1024:.0f}KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, default=1000)
+    parser.add_argument("--entities", type=int, default=500)
+    parser.add_argument("--full", type=int, default=5)
+    parser.add_argument("--detail-limit", type=int, default=None)
+    ARGS = parser.parse_args()
+
+    _measure("per-report", _legacy_styles)
+    _measure("registry", _registry_styles)
+    if ARGS.full:
+        _full_renders()
@@ -0,0 +1,134 @@
+"""
+Benchmark: idle Server-Sent Events subscribers
+
+Starts the app under uvicorn on a local port with a stub pipeline that
+holds one background job open, attaches N subscribers to its event
+stream, then measures memory per subscriber, /health latency while they
+sit idle, and how long the final event takes to reach all of them.
+
+Usage:
+    python -m benchmarks.bench_sse_subscribers [--subscribers 1000] [--hold 5]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import tempfile
+import threading
+import time
+
+_tmp = tempfile.mkdtemp(prefix="bench_sse_")
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp, "uploads")
+os.environ["REPORT_DIR"] = os.path.join(_tmp, "reports")
+os.environ["RESULT_CACHE_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.schemas import AnalyzeResponse, DocumentType, StageState  # noqa: E402
+from app.services import job_manager as job_manager_module  # noqa: E402
+from app.services.job_events import job_events  # noqa: E402
+from app.services.pipeline import STAGES  # noqa: E402
+
+
+async def _held_analysis(job_id, file_path, file_ext, filename, on_stage=None, on_event=None, **options):
+    on_stage(STAGES[0], StageState.RUNNING)
+    await asyncio.sleep(ARGS.hold)
+    for stage in STAGES:
+        on_stage(stage, StageState.COMPLETED)
+    return AnalyzeResponse(
+        job_id=job_id,
+        document_type=DocumentType.GENERAL,
+        confidence=1.0,
+        summary="stub",
+        extraction_count=0,
+        extractions=[],
+        pdf_url=f"/api/v1/report/{job_id}",
+        jsonl_url=f"/api/v1/data/{job_id}"
+    )
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _subscribe(client, job_id, connected, done_at):
+    async with client.stream("GET", f"/api/v1/jobs/{job_id}/events") as response:
+        connected.release()
+        async for line in response.aiter_lines():
+            if line == "event: completed":
+                done_at.append(time.perf_counter())
+
+
+async def _health_latencies(client, samples: int) -> list:
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(name, latencies):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"/health {name:5s} p50={statistics.median(ordered):6.2f}ms p99={p99:6.2f}ms")
+
+
+async def main(port: int):
+    limits = httpx.Limits(max_connections=ARGS.subscribers + 10, max_keepalive_connections=ARGS.subscribers + 10)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=None) as client:
+        _report("idle", await _health_latencies(client, 200))
+
+        files = {"file": ("doc.txt", b"benchmark document content", "text/plain")}
+        response = await client.post("/api/v1/analyze?background=true", files=files)
+        job_id = response.json()["job_id"]
+
+        rss_before = _rss_mb()
+        connected = asyncio.Semaphore(0)
+        done_at = []
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(_subscribe(client, job_id, connected, done_at)) for _ in range(ARGS.subscribers)]
+        for _ in range(ARGS.subscribers):
+            await connected.acquire()
+        print(f"subscribers={ARGS.subscribers} connected in {time.perf_counter() - start:5.2f}s "
+              f"server_side={job_events.subscriber_count(job_id)}")
+        print(f"rss delta={_rss_mb() - rss_before:6.1f}MB "
+              f"({(_rss_mb() - rss_before) * 1024 / ARGS.subscribers:5.1f}KB per subscriber, client and server)")
+
+        # Separate client: a pool holding 1000 streams slows every request it makes
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as probe:
+            _report("busy", await _health_latencies(probe, 200))
+
+        await asyncio.gather(*tasks)
+        fanout = max(done_at) - min(done_at)
+        print(f"completed event delivered to {len(done_at)} subscribers, spread {fanout * 1000:6.1f}ms")
+
+
+def _serve(server):
+    server.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--hold", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8765)
+    ARGS = parser.parse_args()
+
+    job_manager_module.run_analysis = _held_analysis
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=ARGS.port, log_level="warning", backlog=4096))
+    thread = threading.Thread(target=_serve, args=(server,), daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    asyncio.run(main(ARGS.port))
+    server.should_exit = True
+    thread.join()
@@ -1,7 +1,7 @@
 """Streamlit Frontend for Langextract POC"""
 import streamlit as st
+import streamlit.components.v1 as components
 import requests
-import base64
 
 # Page configuration
 st.set_page_config(
@@ -109,6 +109,17 @@ def analyze_document(uploaded_file):
             return None, f"Error: {str(e)}"
 
 
+def fetch_html_report(job_id):
+    """Fetch the HTML report from API"""
+    try:
+        response = requests.get(f"{API_BASE_URL}/api/v1/report/{job_id}", params={"format": "html"})
+        if response.status_code == 200:
+            return response.text
+        return None
+    except:
+        return None
+
+
 def download_pdf_report(job_id):
     """Download PDF report from API"""
     try:
@@ -120,13 +131,6 @@ def download_pdf_report(job_id):
         return None
 
 
-def display_pdf(pdf_bytes):
-    """Display PDF in iframe"""
-    base64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
-    pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="800" type="application/pdf"></iframe>'
-    st.markdown(pdf_display, unsafe_allow_html=True)
-
-
 def main():
     # Header
     st.markdown('<div class="main-header">📄 Langextract POC</div>', unsafe_allow_html=True)
@@ -200,36 +204,42 @@ def main():
         tab1, tab2 = st.tabs(["📄 Report", "📊 Data"])
         
         with tab1:
-            # PDF viewer
-            pdf_bytes = download_pdf_report(result['job_id'])
+            # HTML report; the PDF is only rendered if downloaded
+            report_html = fetch_html_report(result['job_id'])
             
-            if pdf_bytes:
-                display_pdf(pdf_bytes)
+            if report_html:
+                components.html(report_html, height=800, scrolling=True)
                 
-                # Download button below PDF
-                st.download_button(
-                    label="Download PDF",
-                    data=pdf_bytes,
-                    file_name=f"report_{result['job_id']}.pdf",
-                    mime="application/pdf",
-                    use_container_width=True
-                )
+                # The PDF is rendered and fetched through the frontend on request
+                pdf_key = f"pdf_{result['job_id']}"
+                if pdf_key not in st.session_state:
+                    if st.button("Prepare PDF", use_container_width=True):
+                        with st.spinner("Rendering PDF..."):
+                            st.session_state[pdf_key] = download_pdf_report(result['job_id'])
+                        st.rerun()
+                elif st.session_state[pdf_key]:
+                    st.download_button(
+                        label="Download PDF",
+                        data=st.session_state[pdf_key],
+                        file_name=f"report_{result['job_id']}.pdf",
+                        mime="application/pdf",
+                        use_container_width=True
+                    )
+                else:
+                    st.error("Failed to render PDF")
+                    del st.session_state[pdf_key]
             else:
                 st.error("Failed to load report")
         
         with tab2:
             # Entities grouped by category
             if result['extractions']:
-                grouped = {}
-                for ext in result['extractions']:
-                    cls = ext['extraction_class']
-                    if cls not in grouped:
-                        grouped[cls] = []
-                    grouped[cls].append(ext)
-                
-                for cls, items in grouped.items():
-                    with st.expander(f"{cls.replace('_', ' ').title()} ({len(items)})", expanded=False):
-                        for item in items:
+                # Categories come pre-grouped and ranked by the API
+                extractions = result['extractions']
+                for category in result['aggregates']:
+                    cls = category['extraction_class']
+                    with st.expander(f"{cls.replace('_', ' ').title()} ({category['count']})", expanded=False):
+                        for item in (extractions[i] for i in category['ranked']):
                             mention = item['attributes'].get('mention_count', 0)
                             if mention > 1:
                                 st.markdown(f"**{item['extraction_text']}** _(×{mention})_")
@@ -0,0 +1,20 @@
+"""Shared test fixtures"""
+import pytest
+
+from app.services import job_store as job_store_module
+from app.services.llm_clients import client_registry
+
+
+@pytest.fixture(autouse=True)
+def no_gemini_models(monkeypatch):
+    """Keep tests from building real Gemini models; lx.extract is faked where used"""
+    monkeypatch.setattr(client_registry, "extraction_model", lambda template: None)
+
+
+@pytest.fixture(autouse=True)
+def job_store(tmp_path, monkeypatch):
+    """Per-test job store under tmp_path"""
+    store = job_store_module.SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setattr(job_store_module, "_job_store", store)
+    yield store
+    store.close()
@@ -0,0 +1,42 @@
+"""Tests for extraction aggregation"""
+from app.core.schemas import DocumentType
+from app.services.aggregation import ExtractionAggregate
+from app.services.report_generator import ReportEntity
+
+
+def _entity(cls, text, mentions):
+    return ReportEntity(cls, text, {"mention_count": mentions})
+
+
+def test_aggregate_counts_ranks_and_orders_classes():
+    extractions = [
+        _entity("theme", "loss", 1),
+        _entity("character", "Bob", 2),
+        _entity("character", "Alice", 5),
+        _entity("character", "Eve", 2),
+        _entity("unknown", "x", 1),
+    ]
+    aggregate = ExtractionAggregate(extractions, DocumentType.STORY)
+
+    assert aggregate.counts == {"theme": 1, "character": 3, "unknown": 1}
+    assert aggregate.mentions["character"] == 9
+    assert aggregate.classes() == ["character", "theme", "unknown"]
+    # Ties keep document order
+    assert [e.extraction_text for e in aggregate.ranked("character")] == ["Alice", "Bob", "Eve"]
+    assert [e.extraction_text for e in aggregate.top("character", 2)] == ["Alice", "Bob"]
+
+    top, rest = aggregate.split("character", 1)
+    assert [e.extraction_text for e in top] == ["Alice"] and len(rest) == 2
+    assert aggregate.split("character", None)[1] == []
+
+
+def test_serialized_aggregate_round_trips():
+    extractions = [_entity("finding", f"F{i}", i % 3) for i in range(10)]
+    aggregate = ExtractionAggregate(extractions, DocumentType.RESEARCH)
+    categories = aggregate.to_categories()
+
+    assert categories[0].count == 10
+    assert [extractions[i] for i in categories[0].ranked] == aggregate.ranked("finding")
+
+    restored = ExtractionAggregate.from_categories(extractions, DocumentType.RESEARCH, categories)
+    assert restored.ranked("finding") == aggregate.ranked("finding")
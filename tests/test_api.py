@@ -1,7 +1,24 @@
 """API Tests"""
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+import zipfile
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.core.config import settings
+from app.core.schemas import AnalyzeResponse, ClassificationResult, DocumentType, StageState
+from app.api.routes import analyze as analyze_routes
+from app.services import job_manager as job_manager_module
+from app.services.job_events import job_events
+from app.services.aggregation import ExtractionAggregate
+from app.services.pipeline import STAGES
+from app.services.report_generator import ReportEntity
+from app.services.report_renderer import report_request, write_report_request
+from app.utils.file_handler import job_dir
 
 client = TestClient(app)
 
@@ -27,4 +44,293 @@ def test_analyze_invalid_file_type():
     assert "Unsupported file type" in response.json()["detail"]
 
 
+@pytest.fixture
+def output_dirs(tmp_path, monkeypatch):
+    """Redirect upload and report directories to a temp dir"""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path / "reports"))
+    return tmp_path
+
+
+def test_analyze_file_too_large(output_dirs, monkeypatch):
+    """Test oversized uploads are rejected and not left on disk"""
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4096)
+    files = {"file": ("big.txt", b"x" * (1024 * 1024 + 1), "text/plain")}
+    response = client.post("/api/v1/analyze", files=files)
+    assert response.status_code == 413
+    uploads = output_dirs / "uploads"
+    assert not uploads.exists() or list(uploads.iterdir()) == []
+
+
+def test_analyze_rejects_content_length_before_reading_body(output_dirs, monkeypatch):
+    """Test a declared body over the limit gets 413 without the form being parsed"""
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+
+    def body():
+        raise AssertionError("body was read")
+        yield b""
+
+    response = client.post(
+        "/api/v1/analyze",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=x", "Content-Length": str(3 * 1024 * 1024)}
+    )
+    assert response.status_code == 413
+    assert not (output_dirs / "uploads").exists()
+
+
+def test_analyze_rejects_chunked_body_past_limit(output_dirs, monkeypatch):
+    """Test a body without Content-Length is cut off once it passes the limit"""
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+
+    def body():
+        yield b"--x\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.txt\"\r\n\r\n"
+        for _ in range(48):
+            yield b"x" * 64 * 1024
+
+    response = client.post(
+        "/api/v1/analyze",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=x"}
+    )
+    assert response.status_code == 413
+    assert not (output_dirs / "uploads").exists()
+
+
+def test_job_status_not_found():
+    """Test job status endpoint with unknown job ID"""
+    response = client.get("/api/v1/jobs/does-not-exist")
+    assert response.status_code == 404
+
+
+async def fake_run_analysis(job_id, file_path, file_ext, filename, on_stage=None, **options):
+    """Stand-in pipeline that completes every stage immediately"""
+    for stage in STAGES:
+        on_stage(stage, StageState.RUNNING)
+        on_stage(stage, StageState.COMPLETED)
+    return AnalyzeResponse(
+        job_id=job_id,
+        document_type=DocumentType.GENERAL,
+        confidence=0.9,
+        summary="ok",
+        extraction_count=0,
+        extractions=[],
+        pdf_url=f"/api/v1/report/{job_id}",
+        jsonl_url=f"/api/v1/data/{job_id}"
+    )
+
+
+def test_analyze_background_job(output_dirs, monkeypatch):
+    """Test analyze endpoint in background mode reports per-stage status"""
+    monkeypatch.setattr(job_manager_module, "run_analysis", fake_run_analysis)
+
+    with TestClient(app) as bg_client:
+        files = {"file": ("test.txt", b"some document content", "text/plain")}
+        response = bg_client.post("/api/v1/analyze?background=true", files=files)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        for _ in range(50):
+            status = bg_client.get(f"/api/v1/jobs/{job_id}").json()
+            if status["status"] == "completed":
+                break
+            time.sleep(0.05)
+
+        assert status["status"] == "completed"
+        assert all(state == "completed" for state in status["stages"].values())
+        assert status["result"]["job_id"] == job_id
+
+
+def test_finished_jobs_are_evicted(monkeypatch):
+    """Test finished jobs and batches are dropped past the retention bound"""
+    monkeypatch.setattr(job_manager_module, "run_analysis", fake_run_analysis)
+
+    async def run():
+        manager = job_manager_module.JobManager(max_workers=1, max_queue_size=10, max_finished=1)
+        await manager.submit("job-1", "a.txt", ".txt", "a.txt")
+        await manager.submit_batch("batch-1", [("job-2", "b.txt", ".txt", "b.txt"), ("job-3", "c.txt", ".txt", "c.txt")], [])
+        await manager.submit("job-4", "d.txt", ".txt", "d.txt")
+        while manager._queue.qsize() or manager.get("job-4").status != "completed":
+            await asyncio.sleep(0.01)
+        await manager.stop()
+        return manager
+
+    manager = asyncio.run(run())
+    assert manager.get("job-1") is None
+    assert manager.get("job-4").status == "completed"
+    assert manager.get_batch("batch-1").counts["completed"] == 2
+
+    manager.retention = 0
+    manager._evict(time.monotonic() + 1)
+    assert manager.get("job-4") is None
+    assert manager.get_batch("batch-1") is None
+    assert manager.get("job-2") is None
+
+
+def test_analyze_background_queue_full(output_dirs, monkeypatch):
+    """Test an upload rejected by a full queue is not left on disk"""
+    async def full(*args, **kwargs):
+        raise job_manager_module.QueueFullError("Job queue is full, try again later")
+
+    monkeypatch.setattr(job_manager_module.job_manager, "submit", full)
+    files = {"file": ("test.txt", b"some document content", "text/plain")}
+    response = client.post("/api/v1/analyze?background=true", files=files)
+    assert response.status_code == 503
+    uploads = output_dirs / "uploads"
+    assert not uploads.exists() or [p for p in uploads.rglob("*") if p.is_file()] == []
+
+
+def test_analyze_batch_with_files_and_zip(output_dirs, monkeypatch):
+    """Test batch uploads schedule one job per document, including ZIP members"""
+    monkeypatch.setattr(job_manager_module, "run_analysis", fake_run_analysis)
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("docs/one.txt", "first archived document")
+        zf.writestr("docs/two.txt", "second archived document")
+        zf.writestr("docs/image.png", "not a document")
+        zf.writestr("__MACOSX/docs/._one.txt", "metadata")
+
+    files = [
+        ("files", ("a.txt", b"plain document", "text/plain")),
+        ("files", ("bundle.zip", archive.getvalue(), "application/zip")),
+    ]
+
+    with TestClient(app) as bg_client:
+        response = bg_client.post("/api/v1/analyze/batch", files=files)
+        assert response.status_code == 202
+        body = response.json()
+        assert [d["filename"] for d in body["documents"]] == ["a.txt", "one.txt", "two.txt"]
+        assert [r["filename"] for r in body["rejected"]] == ["bundle.zip/docs/image.png"]
+
+        for _ in range(50):
+            status = bg_client.get(f"/api/v1/batches/{body['batch_id']}").json()
+            if status["counts"]["completed"] == 3:
+                break
+            time.sleep(0.05)
+
+        assert status["counts"]["completed"] == 3
+        job_id = body["documents"][1]["job_id"]
+        sha256 = hashlib.sha256(b"first archived document").hexdigest()
+        upload_path = os.path.join(job_dir(settings.UPLOAD_DIR, job_id), f"{sha256}.txt")
+        assert open(upload_path, "rb").read() == b"first archived document"
+        assert not os.path.exists(job_dir(settings.UPLOAD_DIR, body["batch_id"]))
+
+
+def test_analyze_batch_rejects_archive_expanding_past_limit(output_dirs, monkeypatch):
+    """Test the decompressed total across ZIP members is capped and nothing is kept"""
+    monkeypatch.setattr(settings, "MAX_ARCHIVE_EXPANDED_MB", 1)
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("one.txt", "a" * 600 * 1024)
+        zf.writestr("two.txt", "b" * 600 * 1024)
+
+    files = [("files", ("bundle.zip", archive.getvalue(), "application/zip"))]
+    response = client.post("/api/v1/analyze/batch", files=files)
+    assert response.status_code == 413
+    uploads = output_dirs / "uploads"
+    assert [p for p in uploads.rglob("*") if p.is_file()] == []
+
+
+def test_job_events_stream(output_dirs, monkeypatch):
+    """Test SSE stream reports stages, progress and the final result"""
+    async def run_with_progress(job_id, file_path, file_ext, filename, on_stage=None, on_event=None, **options):
+        on_event("pages", {"done": 1, "total": 1})
+        on_event("chunk", {"done": 1, "total": 1, "extractions": []})
+        return await fake_run_analysis(job_id, file_path, file_ext, filename, on_stage=on_stage)
+
+    monkeypatch.setattr(job_manager_module, "run_analysis", run_with_progress)
+
+    with TestClient(app) as bg_client:
+        files = {"file": ("test.txt", b"some document content", "text/plain")}
+        job_id = bg_client.post("/api/v1/analyze?background=true", files=files).json()["job_id"]
+
+        with bg_client.stream("GET", f"/api/v1/jobs/{job_id}/events") as response:
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = [line[len("event: "):] for line in response.iter_lines() if line.startswith("event: ")]
+
+        assert events[0] == "status"
+        assert "pages" in events and "chunk" in events
+        assert events.count("stage") == 2 * len(STAGES)
+        assert events[-1] == "completed"
+
+        resumed = bg_client.get(f"/api/v1/jobs/{job_id}/events", headers={"Last-Event-ID": "3"})
+        assert resumed.text.startswith("id: 4\n")
+
+        # Once the grace period is over only the outcome is replayed
+        monkeypatch.setattr(job_events, "grace", 0)
+        job_events.expire()
+        assert not job_events.has_history(job_id)
+        expired = bg_client.get(f"/api/v1/jobs/{job_id}/events")
+        assert expired.text.startswith("id: 1\nevent: completed\n")
+
+    assert client.get("/api/v1/jobs/unknown/events").status_code == 404
+
+
+def test_analyze_stream_emits_chunks_before_result(output_dirs, monkeypatch):
+    """Test NDJSON mode streams chunk extractions and ends with the result"""
+    async def run_with_chunks(job_id, file_path, file_ext, filename, on_stage=None, on_event=None, **options):
+        for done in (1, 2):
+            on_event("chunk", {"done": done, "total": 2, "extractions": [
+                {"extraction_class": "topic", "extraction_text": f"t{done}", "start": done, "end": done + 2, "attributes": {}}
+            ]})
+        return await fake_run_analysis(job_id, file_path, file_ext, filename, on_stage=on_stage)
+
+    monkeypatch.setattr(analyze_routes, "run_analysis", run_with_chunks)
+
+    files = {"file": ("test.txt", b"some document content", "text/plain")}
+    response = client.post("/api/v1/analyze?stream=true", files=files)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    types = [line["type"] for line in lines]
+    assert types[:2] == ["chunk", "chunk"]
+    assert lines[0]["extractions"][0]["start"] == 1
+    assert "stage" in types
+    assert types[-1] == "result"
+    assert lines[-1]["result"]["summary"] == "ok"
+
+
+def test_report_html_and_markdown_formats(output_dirs):
+    """HTML/Markdown reports come from the render request and revalidate by ETag"""
+    classification = ClassificationResult(document_type=DocumentType.STORY, confidence=0.9, reasoning="A & B")
+    extractions = [ReportEntity("character", "<Alice>", {"mention_count": 3, "role": "lead"})]
+    write_report_request(
+        job_dir(settings.REPORT_DIR, "0a1b2c3d-0000-4000-8000-000000000001"),
+        report_request("story.txt", classification, "text", ExtractionAggregate(extractions, DocumentType.STORY))
+    )
+
+    html_response = client.get("/api/v1/report/0a1b2c3d-0000-4000-8000-000000000001?format=html")
+    assert html_response.status_code == 200
+    assert html_response.headers["content-type"].startswith("text/html")
+    assert "&lt;Alice&gt; <i>(mentioned 3 times)</i>" in html_response.text
+    assert "A &amp; B" in html_response.text
+
+    md_response = client.get("/api/v1/report/0a1b2c3d-0000-4000-8000-000000000001?format=md")
+    assert "## Key Insights" in md_response.text
+    assert "- <Alice> _(mentioned 3 times)_" in md_response.text
+
+    etag = html_response.headers["etag"]
+    cached = client.get("/api/v1/report/0a1b2c3d-0000-4000-8000-000000000001?format=html", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    assert client.get("/api/v1/report/0a1b2c3d-0000-4000-8000-000000000001?format=docx").status_code == 422
+    assert client.get("/api/v1/report/0a1b2c3d-0000-4000-8000-00000000ffff?format=md").status_code == 404
+    # The PDF is still rendered lazily
+    assert not os.path.exists(os.path.join(job_dir(settings.REPORT_DIR, "0a1b2c3d-0000-4000-8000-000000000001"), "report.pdf"))
+
+
+def test_report_and_data_reject_non_job_ids(output_dirs):
+    """IDs outside the job ID alphabet get 404 before any path is built"""
+    escaped = output_dirs / "data.jsonl"
+    escaped.write_text("{}")
+    # shard_path("....") would climb two directories out of REPORT_DIR
+    for job_id in ("....", "not-a-job"):
+        assert client.get(f"/api/v1/data/{job_id}").status_code == 404
+        assert client.get(f"/api/v1/report/{job_id}?format=md").status_code == 404
+        assert client.get(f"/api/v1/report/{job_id}").status_code == 404
+
+
 # Add more tests as needed
@@ -0,0 +1,93 @@
+"""Tests for content-addressed artifact storage"""
+import hashlib
+import os
+import shutil
+
+import pytest
+
+from app.utils.artifact_store import LocalArtifactStore, S3ArtifactStore, shard_path
+
+
+def _job_file(tmp_path, job_id, data):
+    path = tmp_path / "uploads" / job_id / "upload.txt"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_shard_path_layout():
+    assert shard_path("root", "ABCDEF12") == os.path.join("root", "ab", "cd", "abcdef12")
+
+
+def test_local_store_dedupes_with_hard_links(tmp_path):
+    store = LocalArtifactStore(str(tmp_path / "artifacts"))
+    data = b"same bytes"
+    key = hashlib.sha256(data).hexdigest()
+
+    first = _job_file(tmp_path, "job-1", data)
+    second = _job_file(tmp_path, "job-2", data)
+    store.put_file(first, key)
+    store.put_file(second, key)
+
+    blob = shard_path(store.root, key)
+    assert os.stat(first).st_ino == os.stat(second).st_ino == os.stat(blob).st_ino
+    assert os.stat(blob).st_nlink == 3
+
+    # The blob survives until the last job referencing it is gone
+    os.remove(first)
+    store.release(key)
+    assert store.exists(key)
+    os.remove(second)
+    store.release(key)
+    assert not store.exists(key)
+
+
+class _NotFound(Exception):
+    response = {"Error": {"Code": "404"}}
+
+
+class _LocalS3:
+    """Stand-in for a boto3 S3 client backed by a local directory"""
+
+    def __init__(self, root):
+        self.root = root
+        self.uploads = 0
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, key)
+
+    def head_object(self, Bucket, Key):
+        if not os.path.exists(self._path(Bucket, Key)):
+            raise _NotFound()
+        return {"ContentLength": os.path.getsize(self._path(Bucket, Key))}
+
+    def upload_file(self, Filename, Bucket, Key):
+        self.uploads += 1
+        os.makedirs(os.path.dirname(self._path(Bucket, Key)), exist_ok=True)
+        shutil.copyfile(Filename, self._path(Bucket, Key))
+
+    def download_file(self, Bucket, Key, Filename):
+        if not os.path.exists(self._path(Bucket, Key)):
+            raise _NotFound()
+        shutil.copyfile(self._path(Bucket, Key), Filename)
+
+
+def test_s3_store_uploads_each_blob_once(tmp_path):
+    client = _LocalS3(str(tmp_path / "s3"))
+    store = S3ArtifactStore("bucket", prefix="uploads", client=client)
+    data = b"shared upload"
+    key = hashlib.sha256(data).hexdigest()
+
+    store.put_file(_job_file(tmp_path, "job-1", data), key)
+    store.put_file(_job_file(tmp_path, "job-2", data), key)
+
+    assert client.uploads == 1
+    assert store.object_key(key) == f"uploads/{key[:2]}/{key[2:4]}/{key}"
+
+    dest = str(tmp_path / "fetched.txt")
+    store.fetch(key, dest)
+    assert open(dest, "rb").read() == data
+
+    with pytest.raises(_NotFound):
+        store.fetch("00" * 32, str(tmp_path / "missing.txt"))
+    assert not store.exists("00" * 32)
@@ -0,0 +1,85 @@
+"""Cache Tests"""
+import os
+import langextract as lx
+from app.core.config import settings
+from app.core.schemas import AnalyzeResponse, DocumentType
+from app.services import extractor, llm_cache
+from app.services.result_cache import ResultCache, restore_cached_result
+from app.utils.cache_backend import SQLiteCacheBackend
+from app.utils.file_handler import job_dir
+
+
+def test_sqlite_backend_lru_eviction(tmp_path):
+    """Test least recently used entries are evicted past max_bytes"""
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+    backend.set("a", b"x" * 100)
+    backend.set("b", b"x" * 100)
+    assert backend.get("a") is not None  # "b" is now least recently used
+    backend.set("c", b"x" * 100)
+
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+    assert backend.get("c") is not None
+    stats = backend.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 200
+    assert stats["hits"] == 3 and stats["misses"] == 1
+
+
+def test_result_cache_roundtrip(tmp_path, monkeypatch):
+    """Test a cached analysis is restored under a new job ID"""
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path / "reports"))
+    cache = ResultCache(SQLiteCacheBackend(str(tmp_path / "results.sqlite3"), max_bytes=1024 * 1024))
+    response = AnalyzeResponse(
+        job_id="old-job",
+        document_type=DocumentType.LEGAL,
+        confidence=0.8,
+        summary="cached",
+        extraction_count=0,
+        extractions=[],
+        pdf_url="/api/v1/report/old-job",
+        jsonl_url="/api/v1/data/old-job"
+    )
+    cache.put("abc123", "gemini-test", response, b'{"filename": "a.txt"}', b'{"line": 1}\n')
+
+    assert cache.get("abc123", "other-model") is None
+    cached = cache.get("abc123", "gemini-test")
+    assert cached.report_request == b'{"filename": "a.txt"}'
+
+    restored = restore_cached_result(cached, "new-job")
+    assert restored.job_id == "new-job"
+    assert restored.cached is True
+    assert restored.pdf_url == "/api/v1/report/new-job"
+    with open(os.path.join(job_dir(settings.REPORT_DIR, "new-job"), "data.jsonl"), "rb") as f:
+        assert f.read() == b'{"line": 1}\n'
+
+
+def test_llm_cache_reuses_unchanged_chunks(tmp_path, monkeypatch):
+    """Test re-running a document only re-extracts the changed chunk"""
+    calls = []
+
+    def fake_extract(text_or_documents, **kwargs):
+        calls.append(text_or_documents)
+        return lx.data.AnnotatedDocument(text=text_or_documents, extractions=[
+            lx.data.Extraction(
+                extraction_class="topic",
+                extraction_text=text_or_documents[:10],
+                char_interval=lx.data.CharInterval(start_pos=0, end_pos=10)
+            )
+        ])
+
+    monkeypatch.setattr(extractor.lx, "extract", fake_extract)
+    monkeypatch.setattr(llm_cache, "_llm_cache", SQLiteCacheBackend(str(tmp_path / "llm.sqlite3"), max_bytes=1024 * 1024))
+    monkeypatch.setattr(settings, "EXTRACTION_CHUNK_SIZE", 200)
+    monkeypatch.setattr(settings, "EXTRACTION_CHUNK_OVERLAP", 0)
+
+    paragraphs = [f"Paragraph {i} " + "word " * 30 for i in range(4)]
+    extractor.extract_insights("\n\n".join(paragraphs), DocumentType.GENERAL)
+    first_run = len(calls)
+
+    paragraphs[2] = "Paragraph 2 was edited " + "term " * 30
+    extractor.extract_insights("\n\n".join(paragraphs), DocumentType.GENERAL)
+    assert len(calls) - first_run == 1
+
+    extractor.extract_insights("\n\n".join(paragraphs), DocumentType.GENERAL, use_cache=False)
+    assert len(calls) - first_run == 1 + first_run
@@ -0,0 +1,78 @@
+"""Classifier Tests"""
+import asyncio
+from app.core.config import settings
+from app.core.schemas import DocumentType
+from app.services import classifier
+
+TRANSCRIPT = """Weekly Sync
+Attendees: Dana (Lead), Omar, Priya
+[09:00] Dana: Let's go through the agenda. First, the release date.
+[09:02] Omar: QA needs two more days.
+[09:03] Priya: I can take the documentation action item.
+[09:05] Dana: Decision: we ship on Thursday.
+"""
+
+# Prose unlike any seed example; past-tense narration with quotes reads half like a story
+MATCH_REPORT = """United came from behind to beat City 3-2 on Saturday in a match that swung back and forth until the final whistle. The visitors took the lead after eleven minutes when Okonkwo headed in a corner at the near post, and they might have doubled it before the break had Henderson not saved well from Silva's low shot.
+
+The home side were transformed after half-time. Their manager replaced both wingers, and within five minutes of the restart Martinez equalized with a curling shot from the edge of the area. He turned provider on the hour, crossing for Baptiste to volley in at the far post, and the crowd, quiet for most of the first half, finally came to life.
+
+City were not finished. Their captain, Lindqvist, drove a free kick through the wall to make it 2-2 with fifteen minutes left, and for a while it looked as if they would go on and win it. But in the third minute of stoppage time, substitute Reyes picked up a loose ball in midfield, ran forty yards unchallenged and slipped it under the goalkeeper.
+
+"We showed character," the United manager said afterwards. "At half-time I told them we were playing too safe. They listened." The result lifts United to fourth in the table, two points behind City, who have now lost three of their last five away games."""
+
+
+def test_confident_local_prediction_skips_gemini(monkeypatch):
+    """Test an obvious transcript is classified without calling Gemini"""
+    def fail(*args, **kwargs):
+        raise AssertionError("Gemini should not be called")
+
+    monkeypatch.setattr(classifier, "cached_call", fail)
+    result = classifier.classify_document(TRANSCRIPT)
+
+    assert result.method == "local"
+    assert result.document_type == DocumentType.MEETING
+    assert result.confidence >= settings.LOCAL_CLASSIFIER_THRESHOLD
+
+
+def test_low_confidence_falls_back_to_gemini(monkeypatch):
+    """Test Gemini is used when local confidence is below the threshold"""
+    monkeypatch.setattr(settings, "LOCAL_CLASSIFIER_THRESHOLD", 1.01)
+    monkeypatch.setattr(
+        classifier,
+        "cached_call",
+        lambda *args, **kwargs: "CATEGORY: LEGAL\nCONFIDENCE: 0.9\nREASONING: contract terms"
+    )
+    result = classifier.classify_document(TRANSCRIPT)
+
+    assert result.method == "llm"
+    assert result.document_type == DocumentType.LEGAL
+
+
+def test_async_classification_uses_async_gemini_call(monkeypatch):
+    """Test classify_document_async awaits the async Gemini API"""
+    async def fake_classify(prompt):
+        return "CATEGORY: RESEARCH\nCONFIDENCE: 0.8\nREASONING: citations"
+
+    monkeypatch.setattr(settings, "LOCAL_CLASSIFIER_THRESHOLD", 1.01)
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(classifier.client_registry, "classify_async", fake_classify)
+    result = asyncio.run(classifier.classify_document_async(TRANSCRIPT))
+
+    assert result.method == "llm"
+    assert result.document_type == DocumentType.RESEARCH
+
+
+def test_out_of_domain_prose_falls_through_to_gemini(monkeypatch):
+    """Test the local model defers to Gemini on prose it was not trained on"""
+    monkeypatch.setattr(
+        classifier,
+        "cached_call",
+        lambda *args, **kwargs: "CATEGORY: GENERAL\nCONFIDENCE: 0.9\nREASONING: sports report"
+    )
+    local_result = classifier.classify_locally(MATCH_REPORT)
+    assert local_result.confidence < settings.LOCAL_CLASSIFIER_THRESHOLD
+
+    result = classifier.classify_document(MATCH_REPORT)
+    assert result.method == "llm"
+    assert result.document_type == DocumentType.GENERAL
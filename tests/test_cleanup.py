@@ -0,0 +1,62 @@
+"""Tests for scheduled cleanup"""
+import asyncio
+import os
+import time
+
+from app.core.config import settings
+from app.services.cleanup import CleanupScheduler
+from app.services.job_events import job_events
+from app.utils.expiry_index import get_expiry_index, schedule_expiry
+from app.utils.file_handler import job_dir
+
+
+def _make_job(job_id):
+    for root in (settings.UPLOAD_DIR, settings.REPORT_DIR):
+        os.makedirs(job_dir(root, job_id))
+
+
+def test_sweep_removes_only_expired_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(settings, "CLEANUP_HOURS", 1)
+
+    now = time.time()
+    expired = ["0a1b-old", "0a1c-old", "ff00-old"]
+    for job_id in expired:
+        _make_job(job_id)
+        schedule_expiry(job_id, created_at=now - 7200)
+    _make_job("0a1b-fresh")
+    schedule_expiry("0a1b-fresh", created_at=now)
+
+    removed = asyncio.run(CleanupScheduler(interval=60, batch_size=2).sweep(now))
+
+    assert removed == 3
+    for root in (settings.UPLOAD_DIR, settings.REPORT_DIR):
+        assert os.path.isdir(job_dir(root, "0a1b-fresh"))
+        assert not any(os.path.exists(job_dir(root, job_id)) for job_id in expired)
+    assert len(get_expiry_index()) == 1
+
+
+def test_first_sweep_indexes_existing_directories(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(settings, "CLEANUP_HOURS", 1)
+    # Flat layout from before sharding
+    os.makedirs(os.path.join(settings.UPLOAD_DIR, "legacy"))
+
+    scheduler = CleanupScheduler(interval=60, batch_size=10)
+    assert asyncio.run(scheduler.sweep(time.time())) == 0
+    assert asyncio.run(scheduler.sweep(time.time() + 7200)) == 1
+    assert os.listdir(settings.UPLOAD_DIR) == []
+
+
+def test_sweep_expires_finished_job_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path / "reports"))
+    job_events.publish("0a1b-events", "completed", {})
+    assert job_events.has_history("0a1b-events")
+
+    # No later publish() call; the sweep alone releases the history
+    monkeypatch.setattr(job_events, "grace", 0)
+    asyncio.run(CleanupScheduler(interval=60, batch_size=10).sweep())
+    assert not job_events.has_history("0a1b-events")
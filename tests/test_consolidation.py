@@ -0,0 +1,45 @@
+"""Tests for near-duplicate consolidation"""
+import langextract as lx
+
+from app.services.consolidation import consolidate_extractions, normalize, parse_thresholds
+
+
+def _extraction(cls, text, **attributes):
+    return lx.data.Extraction(extraction_class=cls, extraction_text=text, attributes=attributes)
+
+
+def test_name_variants_merge_into_canonical_with_aliases():
+    extractions = [
+        _extraction("character", "Dr. Sarah Chen", role="lead"),
+        _extraction("theme", "ambition"),
+        _extraction("character", "Sarah Chen", mention_count=3),
+        _extraction("character", "Chen"),
+        _extraction("character", "Bob"),
+    ]
+
+    result = consolidate_extractions(extractions, {"character": 0.7}, 0)
+
+    assert [e.extraction_text for e in result] == ["ambition", "Sarah Chen", "Bob"]
+    sarah = result[1]
+    assert sarah.attributes["mention_count"] == 5
+    assert sarah.attributes["role"] == "lead"
+    assert sarah.attributes["aliases"] == "Dr. Sarah Chen, Chen"
+
+
+def test_ambiguous_alias_and_unlisted_classes_stay_separate():
+    extractions = [
+        _extraction("character", "Sarah Chen"),
+        _extraction("character", "Wei Chen"),
+        _extraction("character", "Chen"),
+        _extraction("finding", "Revenue grew"),
+        _extraction("finding", "Revenue grew."),
+    ]
+
+    result = consolidate_extractions(extractions, {"character": 0.7}, 0)
+
+    assert len(result) == 5
+
+
+def test_threshold_parsing_and_normalization():
+    assert parse_thresholds("character=0.7, party=0.8,") == {"character": 0.7, "party": 0.8}
+    assert normalize("Prof. Ada  LOVELACE, Jr.") == "ada lovelace"
@@ -0,0 +1,97 @@
+"""Document Parser Tests"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from reportlab.pdfgen import canvas
+
+from app.core.config import settings
+from app.services.document_parser import aiter_document_text, iter_document_text, parse_document, split_page_ranges
+
+
+def test_split_page_ranges_covers_all_pages():
+    """Test page ranges are contiguous and cover every page"""
+    ranges = split_page_ranges(101, 8)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == 101
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert len(ranges) <= 8
+
+
+def test_parallel_pdf_parse_preserves_page_order(tmp_path, monkeypatch):
+    """Test page-range parsing matches serial parsing"""
+    path = str(tmp_path / "doc.pdf")
+    pdf = canvas.Canvas(path)
+    for page in range(7):
+        pdf.drawString(72, 720, f"This is page number {page + 1}")
+        pdf.showPage()
+    pdf.save()
+
+    monkeypatch.setattr(settings, "PDF_PARALLEL_PAGE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "PARSE_PROCESS_WORKERS", 2)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        parallel = parse_document(path, ".pdf", executor=pool)
+
+    assert parallel == parse_document(path, ".pdf")
+    assert parallel.index("page number 1") < parallel.index("page number 7")
+
+
+def test_iter_document_text_yields_pages_incrementally(tmp_path):
+    """Test streaming parse yields page blocks that join to the full text"""
+    path = str(tmp_path / "doc.pdf")
+    pdf = canvas.Canvas(path)
+    for page in range(3):
+        pdf.drawString(72, 720, f"Streaming page {page + 1}")
+        pdf.showPage()
+    pdf.save()
+
+    blocks = iter_document_text(path, ".pdf")
+    assert "Streaming page 1" in next(blocks)
+
+    rest = list(blocks)
+    assert len(rest) == 2
+    assert "\n\n".join(iter_document_text(path, ".pdf")) == parse_document(path, ".pdf")
+
+
+def test_parallel_pdf_parse_yields_leading_pages_first(tmp_path):
+    """Test executor parsing yields the first pages on their own, ahead of the rest"""
+    path = str(tmp_path / "doc.pdf")
+    pdf = canvas.Canvas(path)
+    for page in range(5):
+        pdf.drawString(72, 720, f"Leading page {page + 1}")
+        pdf.showPage()
+    pdf.save()
+
+    progress = []
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        blocks = list(iter_document_text(path, ".pdf", pool, lambda done, total: progress.append(done)))
+
+    assert "Leading page 1" in blocks[0] and "Leading page 2" not in blocks[0]
+    assert "Leading page 2" in blocks[1]
+    assert progress == [1, 2, 5]
+    assert "\n\n".join(blocks) == parse_document(path, ".pdf")
+
+
+def test_async_parse_awaits_ranges_on_the_loop(tmp_path):
+    """Test the async parser matches the sync one and reports progress on the loop"""
+    path = str(tmp_path / "doc.pdf")
+    pdf = canvas.Canvas(path)
+    for page in range(5):
+        pdf.drawString(72, 720, f"Async page {page + 1}")
+        pdf.showPage()
+    pdf.save()
+
+    async def collect(pool):
+        progress = []
+        blocks = [block async for block in aiter_document_text(
+            path, ".pdf", pool, lambda done, total: progress.append((done, threading.current_thread().name))
+        )]
+        return blocks, progress
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        blocks, progress = asyncio.run(collect(pool))
+
+    assert "\n\n".join(blocks) == parse_document(path, ".pdf")
+    assert [done for done, _ in progress] == [1, 2, 5]
+    assert {name for _, name in progress} == {threading.main_thread().name}
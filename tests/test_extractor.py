@@ -0,0 +1,109 @@
+"""Extraction Service Tests"""
+import asyncio
+import langextract as lx
+from app.core.config import settings
+from app.core.schemas import DocumentType
+from app.services import extractor
+from app.services.chunker import chunk_text
+
+
+def _fake_extract(text_or_documents, **kwargs):
+    """Extract every occurrence of 'Alice' with chunk-relative offsets"""
+    text = text_or_documents
+    extractions = []
+    pos = text.find("Alice")
+    while pos != -1:
+        extractions.append(lx.data.Extraction(
+            extraction_class="character",
+            extraction_text="Alice",
+            char_interval=lx.data.CharInterval(start_pos=pos, end_pos=pos + 5)
+        ))
+        pos = text.find("Alice", pos + 1)
+    return lx.data.AnnotatedDocument(text=text, extractions=extractions)
+
+
+def test_chunk_text_covers_document_on_sentence_boundaries():
+    """Test chunks end on sentence boundaries and cover the whole text"""
+    text = " ".join(f"Sentence number {i} is here." for i in range(200))
+    chunks = chunk_text(text, chunk_size=500, overlap=50)
+
+    assert len(chunks) > 1
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(text)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start <= previous.end
+        assert previous.text.rstrip().endswith(".")
+    for chunk in chunks:
+        assert len(chunk.text) <= 500
+        assert text[chunk.start:chunk.end] == chunk.text
+
+
+def test_extract_insights_keeps_whole_document_and_offsets(monkeypatch):
+    """Test long documents are fully extracted with document-space offsets"""
+    monkeypatch.setattr(extractor.lx, "extract", _fake_extract)
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "EXTRACTION_CHUNK_SIZE", 300)
+    monkeypatch.setattr(settings, "EXTRACTION_CHUNK_OVERLAP", 60)
+
+    filler = "Nothing happens in this sentence at all. " * 20
+    text = "Alice opens the story. " + filler + "Later Alice returns. " + filler + "Alice leaves."
+
+    result = extractor.extract_insights(text, DocumentType.STORY)
+
+    assert len(result.extractions) == 1
+    alice = result.extractions[0]
+    assert alice.attributes["mention_count"] == 3
+    assert text[alice.char_interval.start_pos:alice.char_interval.end_pos] == "Alice"
+
+
+def test_classify_and_extract_uses_single_fused_call(monkeypatch):
+    """Test fused mode reads the type from the first chunk's extractions"""
+    calls = []
+
+    def fake_extract(text_or_documents, prompt_description=None, **kwargs):
+        calls.append(prompt_description)
+        return lx.data.AnnotatedDocument(text=text_or_documents, extractions=[
+            lx.data.Extraction(
+                extraction_class="document_type",
+                extraction_text=text_or_documents[:10],
+                attributes={"type": "legal", "confidence": "0.85"}
+            ),
+            lx.data.Extraction(extraction_class="party", extraction_text="The Vendor"),
+            lx.data.Extraction(extraction_class="character", extraction_text="The Vendor"),
+        ])
+
+    monkeypatch.setattr(extractor.lx, "extract", fake_extract)
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LOCAL_CLASSIFIER_ENABLED", False)
+
+    classification, result = extractor.classify_and_extract("The Vendor shall deliver the goods on time. " * 5)
+
+    assert len(calls) == 1
+    assert classification.document_type == DocumentType.LEGAL
+    assert classification.method == "fused"
+    assert [e.extraction_class for e in result.extractions] == ["party"]
+
+
+def test_extract_insights_async_parses_gemini_responses(monkeypatch):
+    """Test the async path sends langextract's prompts and aligns the replies"""
+    prompts = []
+
+    async def fake_generate(model, prompt):
+        prompts.append(prompt)
+        return '```json\n{"extractions": [{"character": "Alice", "character_attributes": {"role": "lead"}}]}\n```'
+
+    monkeypatch.setattr(extractor.client_registry, "generate_async", fake_generate)
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "EXTRACTION_CHUNK_SIZE", 300)
+    monkeypatch.setattr(settings, "EXTRACTION_CHUNK_OVERLAP", 0)
+
+    filler = "Nothing happens in this sentence at all. " * 8
+    text = "Alice opens the story. " + filler + "Later Alice returns. " + filler
+
+    result = asyncio.run(extractor.extract_insights_async(text, DocumentType.STORY))
+
+    assert len(prompts) == len(extractor._split(text)) > 1
+    alice = result.extractions[0]
+    assert alice.extraction_class == "character"
+    assert alice.attributes["role"] == "lead"
+    assert text[alice.char_interval.start_pos:alice.char_interval.end_pos] == "Alice"
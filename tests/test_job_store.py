@@ -0,0 +1,97 @@
+"""Tests for the job metadata store"""
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.core.schemas import AnalyzeResponse, DocumentType, JobRecord, JobState, StageState
+from app.services import pipeline
+from app.services.pipeline import STAGES
+
+client = TestClient(app)
+
+
+def _record(job_id, content_hash="abc", created_at=None, **fields):
+    created_at = created_at or datetime.now()
+    return JobRecord(
+        job_id=job_id,
+        status=JobState.COMPLETED,
+        filename=f"{job_id}.txt",
+        content_hash=content_hash,
+        created_at=created_at,
+        updated_at=created_at,
+        **fields
+    )
+
+
+def test_store_round_trip_and_indexed_lookups(job_store):
+    now = datetime.now()
+    job_store.put(_record(
+        "a", created_at=now - timedelta(hours=2), document_type=DocumentType.LEGAL,
+        stage_timings={"parsed": 0.5}, token_usage={"prompt_tokens": 10}, report_path="/tmp/a/report.pdf"
+    ))
+    job_store.put(_record("b", created_at=now - timedelta(hours=1)))
+    job_store.put(_record("c", content_hash="other", created_at=now))
+
+    record = job_store.get("a")
+    assert record.document_type == DocumentType.LEGAL
+    assert record.stage_timings == {"parsed": 0.5}
+    assert record.token_usage == {"prompt_tokens": 10}
+
+    assert [r.job_id for r in job_store.find_by_hash("abc")] == ["b", "a"]
+    assert [r.job_id for r in job_store.list(since=now - timedelta(minutes=90))] == ["c", "b"]
+    assert job_store.stats()["by_status"] == {"completed": 3}
+
+    job_store.forget_artifacts(["a"])
+    assert job_store.get("a").report_path is None
+
+
+def test_run_analysis_records_outcome(job_store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path / "reports"))
+    upload = tmp_path / "document.txt"
+    upload.write_text("hello world")
+
+    async def fake_analyze(job_id, file_path, file_ext, filename, content_hash, use_cache, on_stage, on_event):
+        for stage in STAGES:
+            on_stage(stage, StageState.RUNNING)
+            on_stage(stage, StageState.COMPLETED)
+        return AnalyzeResponse(
+            job_id=job_id, document_type=DocumentType.MEETING, confidence=0.8, summary="ok",
+            extraction_count=2, extractions=[], pdf_url="", jsonl_url=""
+        )
+
+    monkeypatch.setattr(pipeline, "_analyze", fake_analyze)
+    asyncio.run(pipeline.run_analysis("job-1", str(upload), ".txt", "document.txt", content_hash="h1"))
+
+    record = job_store.get("job-1")
+    assert record.status == JobState.COMPLETED
+    assert record.document_type == DocumentType.MEETING
+    assert record.upload_size == len("hello world")
+    assert set(record.stage_timings) == set(STAGES)
+
+    response = client.get("/api/v1/jobs/job-1")
+    assert response.status_code == 200
+    assert response.json()["stages"] == {stage: "completed" for stage in STAGES}
+    assert [job["job_id"] for job in client.get("/api/v1/jobs?content_hash=h1").json()] == ["job-1"]
+
+
+def test_run_analysis_records_failure(job_store, tmp_path, monkeypatch):
+    upload = tmp_path / "document.txt"
+    upload.write_text("x")
+
+    async def failing_analyze(job_id, file_path, file_ext, filename, content_hash, use_cache, on_stage, on_event):
+        on_stage("parsed", StageState.RUNNING)
+        raise pipeline.DocumentTooShortError("Document appears to be empty or too short")
+
+    monkeypatch.setattr(pipeline, "_analyze", failing_analyze)
+    try:
+        asyncio.run(pipeline.run_analysis("job-2", str(upload), ".txt", "document.txt"))
+    except pipeline.DocumentTooShortError:
+        pass
+
+    record = job_store.get("job-2")
+    assert record.status == JobState.FAILED
+    assert "too short" in record.error
+    assert client.get("/api/v1/jobs/job-2").json()["stages"]["parsed"] == "failed"
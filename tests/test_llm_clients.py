@@ -0,0 +1,25 @@
+"""Gemini Client Registry Tests"""
+from app.core.config import settings
+from app.core.schemas import DocumentType
+from app.services.llm_clients import ClientRegistry
+from app.templates.extraction_templates import get_template
+
+
+def test_registry_reuses_models_and_pooled_transport(monkeypatch):
+    """Test one model per template is built and all share one HTTP pool"""
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "GEMINI_MODEL", "gemini-2.5-flash")
+    registry = ClientRegistry()
+
+    story = get_template(DocumentType.STORY)
+    legal = get_template(DocumentType.LEGAL)
+
+    story_model = registry.extraction_model(story)
+    legal_model = registry.extraction_model(legal)
+
+    assert registry.extraction_model(story) is story_model
+    assert legal_model is not story_model
+    assert story_model.http_options.httpx_client is legal_model.http_options.httpx_client
+
+    registry.close()
+    assert registry._http_client is None
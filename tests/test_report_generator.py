@@ -0,0 +1,42 @@
+"""Tests for PDF report generation"""
+import os
+
+from app.core.schemas import ClassificationResult, DocumentType
+from app.services.aggregation import ExtractionAggregate
+from app.services.report_formats import render_html, render_markdown
+from app.services.report_generator import generate_pdf_report, ReportEntity
+from app.services.report_renderer import ReportInputs
+
+
+def _entities(count):
+    return [
+        ReportEntity("finding", f"Finding {i}", {"mention_count": i % 97 + 1, "context": "section 3"})
+        for i in range(count)
+    ]
+
+
+def test_bounded_report_size_does_not_grow_with_input(tmp_path):
+    classification = ClassificationResult(document_type=DocumentType.RESEARCH, confidence=0.9, reasoning="test")
+    sizes = []
+    for count in (1000, 20000):
+        path = generate_pdf_report(
+            _entities(count), DocumentType.RESEARCH, f"job-{count}", "paper.pdf", classification,
+            output_dir=str(tmp_path / str(count)), detail_limit=25, overflow_rows=100
+        )
+        sizes.append(os.path.getsize(path))
+
+    assert sizes[1] < 300 * 1024
+    assert abs(sizes[1] - sizes[0]) < 2 * 1024
+
+
+def test_overflow_note_has_no_relative_link():
+    """Test the overflow note names the data export instead of linking a relative API path"""
+    classification = ClassificationResult(document_type=DocumentType.RESEARCH, confidence=0.9, reasoning="test")
+    inputs = ReportInputs("paper.pdf", classification, "text", ExtractionAggregate(_entities(50), DocumentType.RESEARCH))
+
+    html = "".join(render_html(inputs, "job-1", detail_limit=10, overflow_rows=20))
+    markdown = "".join(render_markdown(inputs, "job-1", detail_limit=10, overflow_rows=20))
+
+    assert "20 of 40 more in this category listed above; 20 omitted" in html
+    assert "JSONL data export of job job-1" in markdown
+    assert "/api/v1/data" not in html and "/api/v1/data" not in markdown
@@ -0,0 +1,78 @@
+"""Tests for on-demand report rendering"""
+import asyncio
+import os
+
+import langextract as lx
+import pytest
+
+from app.core.config import settings
+from app.core.schemas import ClassificationResult, DocumentType
+from app.services import pipeline, report_renderer as report_renderer_module
+from app.services.aggregation import ExtractionAggregate
+from app.services.report_generator import RenderBudgetExceeded
+from app.services.report_renderer import ReportRenderer, render_report
+from app.utils.file_handler import job_dir
+
+
+def _aggregate(document):
+    return ExtractionAggregate(document.extractions, DocumentType.STORY)
+
+
+def test_report_renders_once_on_first_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path / "reports"))
+    renders = []
+
+    async def counting_executor(name, func, *args):
+        renders.append(args)
+        await asyncio.sleep(0.05)
+        return await asyncio.to_thread(func, *args)
+
+    monkeypatch.setattr(report_renderer_module, "run_in_executor", counting_executor)
+
+    text = "Alice met Bob at the harbor to discuss the merger."
+    document = lx.data.AnnotatedDocument(text=text, extractions=[
+        lx.data.Extraction(extraction_class="character", extraction_text="Alice", attributes={"role": "lead"}),
+        lx.data.Extraction(extraction_class="character", extraction_text="Bob"),
+    ])
+    classification = ClassificationResult(document_type=DocumentType.STORY, confidence=0.9, reasoning="test")
+    report_dir = job_dir(settings.REPORT_DIR, "job-1")
+    pipeline._save_artifacts(document, _aggregate(document), classification, report_dir, "story.txt", text)
+    assert not os.path.exists(os.path.join(report_dir, "report.pdf"))
+
+    renderer = ReportRenderer()
+
+    async def main():
+        paths = await asyncio.gather(*(renderer.get("job-1") for _ in range(5)))
+        again = await renderer.get("job-1")
+        missing = await renderer.get("no-such-job")
+        return paths, again, missing
+
+    paths, again, missing = asyncio.run(main())
+
+    assert len(renders) == 1
+    assert len(set(paths)) == 1 and again == paths[0]
+    with open(paths[0], "rb") as f:
+        assert f.read(4) == b"%PDF"
+    assert missing is None
+    assert renderer.metrics.snapshot()["rendered"] == 1
+
+
+def test_render_over_budget_is_abandoned(tmp_path):
+    text = "Alice met Bob."
+    document = lx.data.AnnotatedDocument(text=text, extractions=[
+        lx.data.Extraction(extraction_class="character", extraction_text=f"Person {i}")
+        for i in range(50)
+    ])
+    classification = ClassificationResult(document_type=DocumentType.STORY, confidence=0.9, reasoning="test")
+    report_dir = str(tmp_path / "job-2")
+    pipeline._save_artifacts(document, _aggregate(document), classification, report_dir, "story.txt", text)
+
+    with open(os.path.join(report_dir, "report.json"), "rb") as f:
+        payload = f.read()
+
+    with pytest.raises(RenderBudgetExceeded):
+        render_report(payload, report_dir, "job-2", time_budget=1e-9)
+    assert sorted(os.listdir(report_dir)) == ["data.jsonl", "report.json"]
+
+    path, seconds = render_report(payload, report_dir, "job-2")
+    assert os.path.basename(path) == "report.pdf" and seconds > 0